@@ -0,0 +1,207 @@
+# async_client.py
+# Cliente REST assíncrono (httpx) para uso dentro do event loop (ex.: FastAPI)
+import asyncio
+import json
+from typing import Dict, List, Optional
+import httpx
+import requests
+import auth
+from config import API_KEY, API_SECRET, SUBSCRIPTION_KEY, USER_AGENT
+from rate_limiter import (
+    ORDERS_BUCKET, PRIORITY_DEFAULT, PRIORITY_ORDER, PRIORITY_QUOTE, REST_BUCKET, get_bucket
+)
+from rest_client import API_BASE_URL, REST_CONNECT_TIMEOUT, REST_READ_TIMEOUT
+from get_ticker_quote import normalize_tickers
+from send_order import SendLimitedOrderRequest, SendMarketOrderRequest, SendOrderResponse
+from signature import get_signer
+
+# Configurações do pool de conexões e da concorrência
+ASYNC_MAX_CONNECTIONS = 20  # Conexões simultâneas no pool
+ASYNC_MAX_KEEPALIVE_CONNECTIONS = 10  # Conexões keep-alive ociosas mantidas
+ASYNC_MAX_CONCURRENCY = 10  # Requisições em andamento ao mesmo tempo
+
+class AsyncClearClient:
+    """
+    Cliente assíncrono para autenticação, cotação, book, ordens e custódia.
+    Usa pool de conexões do httpx e limita a quantidade de requisições simultâneas.
+    """
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        auth_url: Optional[str] = None,
+        max_connections: int = ASYNC_MAX_CONNECTIONS,
+        max_keepalive_connections: int = ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+        timeout: float = REST_READ_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        rate_limited: bool = True
+    ):
+        self.auth_url = auth_url
+        self.rate_limited = rate_limited  # False apenas para stubs locais/benchmarks
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers={
+                'Ocp-Apim-Subscription-Key': SUBSCRIPTION_KEY,
+                'User-Agent': USER_AGENT
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ),
+            timeout=httpx.Timeout(timeout, connect=REST_CONNECT_TIMEOUT),
+            transport=transport
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight_quotes: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    # Autenticação ###############################################
+    async def _request_auth_token(self) -> tuple:
+        payload = {
+            'API_KEY': API_KEY,
+            'API_SECRET': API_SECRET
+        }
+        await self._acquire_rate_limit(REST_BUCKET, PRIORITY_ORDER, True)
+        async with self._semaphore:
+            response = await self._client.post(self.auth_url or auth._auth_url, json=payload)
+        if response.status_code == 200:
+            data = response.json()
+            token = data.get('access_token')
+            return token, auth._token_ttl(data, token)
+        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {response.text}")
+
+    async def get_auth_token(self) -> str:
+        """Retorna o token em cache (o mesmo cache de auth.get_auth_token)"""
+        return await auth.get_auth_token_async(self._request_auth_token)
+
+    # Requisições ################################################
+    async def _acquire_rate_limit(self, bucket: str, priority: int, block: bool):
+        if self.rate_limited:
+            await get_bucket(bucket).acquire_async(priority=priority, block=block)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        priority: int = PRIORITY_DEFAULT,
+        block: bool = True,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Executa a requisição autenticada respeitando o limite de requisições REST.
+        Com block=False, levanta RateLimitExceeded imediatamente se o limite foi atingido.
+        """
+        headers = kwargs.pop('headers', {})
+        headers['Authorization'] = f"Bearer {await self.get_auth_token()}"
+        await self._acquire_rate_limit(REST_BUCKET, priority, block)
+        async with self._semaphore:
+            return await self._client.request(method, path, headers=headers, **kwargs)
+
+    async def _get_json(self, path: str, params: Optional[dict] = None, priority: int = PRIORITY_DEFAULT, block: bool = True) -> dict:
+        response = await self._request('GET', path, params=params, priority=priority, block=block)
+        if response.status_code == 200:
+            return response.json()
+        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {response.text}")
+
+    async def get_ticker_quote(self, ticker: str, block: bool = True) -> dict:
+        return await self._get_json('/v1/marketdata/quote', params={'Ticker': ticker}, priority=PRIORITY_QUOTE, block=block)
+
+    async def get_ticker_quote_coalesced(self, ticker: str) -> dict:
+        """Chamadas simultâneas para o mesmo ticker compartilham uma única requisição"""
+        future = self._inflight_quotes.get(ticker)
+        if future is None:
+            future = asyncio.ensure_future(self.get_ticker_quote(ticker))
+            self._inflight_quotes[ticker] = future
+            future.add_done_callback(lambda _: self._inflight_quotes.pop(ticker, None))
+        return await asyncio.shield(future)
+
+    async def get_ticker_quotes(self, tickers: List[str], return_exceptions: bool = False) -> Dict[str, dict]:
+        """
+        Busca as cotações de vários tickers concorrentemente (respeitando o limite de taxa).
+        Com return_exceptions=True, tickers com erro recebem a exceção como valor.
+        """
+        tickers = normalize_tickers(tickers)
+        results = await asyncio.gather(
+            *[self.get_ticker_quote_coalesced(ticker) for ticker in tickers],
+            return_exceptions=return_exceptions
+        )
+        return dict(zip(tickers, results))
+
+    async def get_ticker_book(self, ticker: str, block: bool = True) -> dict:
+        return await self._get_json('/v1/marketdata/book', params={'Ticker': ticker}, priority=PRIORITY_QUOTE, block=block)
+
+    async def get_custody(self) -> dict:
+        return await self._get_json('/v1/custody')
+
+    async def get_orders(self) -> dict:
+        return await self._get_json('/v1/orders')
+
+    # Ordens #####################################################
+    async def _send_order(self, path: str, order_request, description: str) -> SendOrderResponse:
+        await self._acquire_rate_limit(ORDERS_BUCKET, PRIORITY_ORDER, True)
+        body = json.dumps(order_request.to_dict())
+        try:
+            body_signature = get_signer().sign(body)
+        except Exception as e:
+            raise ValueError(f"Erro ao gerar a assinatura: {str(e)}")
+
+        headers = {
+            'Content-Type': 'application/json',
+            'BODY_SIGNATURE': body_signature
+        }
+
+        try:
+            response = await self._request('POST', path, headers=headers, content=body, priority=PRIORITY_ORDER)
+        except httpx.HTTPError as e:
+            raise requests.HTTPError(f'Erro ao enviar a ordem {description}: {str(e)}')
+
+        if response.status_code >= 400:
+            if response.status_code == 500:
+                error_data = response.json()
+                error_messages = '; '.join([
+                    f"{err['code']} - {err['message']}"
+                    for err in error_data.get('errorResponse', [])
+                ])
+                raise requests.HTTPError(f'Erro interno: {error_messages}')
+
+            raise requests.HTTPError(
+                f'Erro na requisição: {response.status_code} - {response.reason_phrase}'
+            )
+
+        try:
+            data = response.json()
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Erro ao decodificar resposta JSON: {str(e)}')
+        return SendOrderResponse(data['orderId'])
+
+    async def send_limited_order(self, order_request: SendLimitedOrderRequest) -> SendOrderResponse:
+        """Envia uma ordem limitada sem bloquear o event loop"""
+        return await self._send_order('/v1/orders/send/limited', order_request, 'limitada')
+
+    async def send_market_order(self, order_request: SendMarketOrderRequest) -> SendOrderResponse:
+        """Envia uma ordem a mercado sem bloquear o event loop"""
+        return await self._send_order('/v1/orders/send/market', order_request, 'a mercado')
+
+_async_client: Optional[AsyncClearClient] = None
+
+def get_async_client() -> AsyncClearClient:
+    """Retorna o cliente assíncrono compartilhado (deve ser usado sempre no mesmo event loop)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncClearClient()
+    return _async_client
+
+async def close_async_client():
+    """Fecha o cliente assíncrono compartilhado"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
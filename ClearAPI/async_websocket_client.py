@@ -0,0 +1,277 @@
+# async_websocket_client.py
+# Cliente WebSocket asyncio (pacote websockets) que roda no event loop da aplicação
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Optional
+import websockets
+from auth import get_auth_token_async, invalidate_auth_token
+from config import USER_AGENT
+from rate_limiter import WEBSOCKET_BUCKET, get_bucket
+from signalr_framing import RecordDecoder
+from websocket_client import (
+    CONNECTION_TIMEOUT, MARKETDATA_ROUTE, ORDERS_ROUTE, MAX_RETRY_ATTEMPTS, WS_BASE_URL,
+    _backoff_delay, _define_protocol_message, _record_separator
+)
+
+# Configurações de backpressure
+ASYNC_WS_QUEUE_SIZE = 1000  # Mensagens já decodificadas aguardando o consumidor
+ASYNC_WS_MAX_FRAMES = 32  # Frames não lidos mantidos pelo websockets antes de parar de ler o socket
+
+OVERFLOW_BLOCK = 'block'  # Fila cheia: para de ler o socket (backpressure até o servidor)
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # Fila cheia: descarta a mensagem mais antiga
+
+_CLOSED = object()  # Sentinela que encerra a iteração
+
+def _subscription_message(target: str, arguments: list) -> dict:
+    return {
+        "arguments": arguments,
+        "target": target,
+        "type": 1
+    }
+
+class AsyncClearWebSocket:
+    """
+    Conexão WebSocket com a ClearAPI no event loop atual.
+
+    As mensagens decodificadas são entregues como iterador assíncrono:
+
+        feed = AsyncClearWebSocket(MARKETDATA_ROUTE)
+        await feed.start()
+        await feed.subscribe_quote('WINV25')
+        async for message in feed:
+            ...
+
+    A fila entre a leitura do socket e o consumidor é limitada: com OVERFLOW_BLOCK
+    um consumidor lento faz a leitura parar (backpressure); com OVERFLOW_DROP_OLDEST
+    as mensagens mais antigas são descartadas. A conexão é refeita automaticamente
+    (backoff + jitter) e as assinaturas ativas são reenviadas.
+    """
+    def __init__(
+        self,
+        route: str = MARKETDATA_ROUTE,
+        queue_size: int = ASYNC_WS_QUEUE_SIZE,
+        overflow: str = OVERFLOW_BLOCK,
+        url: Optional[str] = None,
+        on_open: Optional[Callable[[], None]] = None,
+        recorder=None
+    ):
+        self.route = route
+        self.url = url or f'{WS_BASE_URL}/ws/v1/{route}'
+        self.overflow = overflow
+        self.on_open = on_open
+        self.recorder = recorder  # TickRecorder opcional: grava cada frame recebido
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._subscriptions: Dict[tuple, dict] = {}
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._decoder = RecordDecoder()
+
+        # Métricas
+        self.connects = 0
+        self.reconnects = 0
+        self.received = 0
+        self.dropped = 0
+        self.blocked_seconds = 0.0
+        self.last_message_at = None
+
+    # Ciclo de vida ##############################################
+    async def start(self):
+        """Inicia a conexão (e as reconexões) em uma task do event loop atual"""
+        if self._task is not None:
+            return
+        if not get_bucket(WEBSOCKET_BUCKET).try_acquire():
+            raise ConnectionError(f"Limite de conexões WebSocket simultâneas atingido para {self.route}")
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Encerra a conexão e a iteração"""
+        self._closed = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    async def _run(self):
+        attempt = 0
+        try:
+            while not self._closed:
+                try:
+                    token = await get_auth_token_async()
+                    async with websockets.connect(
+                        self.url,
+                        extra_headers={"Authorization": f"Bearer {token}"},
+                        user_agent_header=USER_AGENT,
+                        open_timeout=CONNECTION_TIMEOUT,
+                        max_queue=ASYNC_WS_MAX_FRAMES
+                    ) as ws:
+                        await self._on_connected(ws)
+                        attempt = 0
+                        async for frame in ws:
+                            await self._on_frame(frame)
+                    print(f"🔌 Conexão WebSocket {self.route} fechada.")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ Erro no WebSocket {self.route}: {e}")
+                finally:
+                    self._ws = None
+
+                if self._closed:
+                    break
+                attempt += 1
+                if MAX_RETRY_ATTEMPTS is not None and attempt > MAX_RETRY_ATTEMPTS:
+                    print(f"❌ Máximo de tentativas de reconexão atingido para {self.route}")
+                    break
+                delay = _backoff_delay(attempt)
+                print(f"🔄 Tentativa de reconexão {attempt} para {self.route} em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                invalidate_auth_token()  # Garante um token novo na reconexão
+        finally:
+            get_bucket(WEBSOCKET_BUCKET).release()
+            self._closed = True
+            self._put_nowait_dropping(_CLOSED)
+
+    async def _on_connected(self, ws):
+        self._ws = ws
+        self._decoder.reset()  # Descarta registro incompleto da conexão anterior
+        self.connects += 1
+        if self.connects > 1:
+            self.reconnects += 1
+        print(f"✅ Conexão com WebSocket de {self.route} aberta.")
+
+        # Handshake do protocolo + assinaturas ativas
+        await self._send(_define_protocol_message)
+        for message in list(self._subscriptions.values()):
+            await self._send(message)
+
+        if self.on_open:
+            self.on_open()
+
+    # Recepção ###################################################
+    def _put_nowait_dropping(self, item):
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                self._queue.get_nowait()
+                self.dropped += 1
+
+    async def _on_frame(self, frame):
+        self.last_message_at = time.monotonic()
+        if self.recorder is not None:
+            self.recorder.record_raw(frame)
+        for message in self._decoder.feed(frame):
+            self.received += 1
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                self._put_nowait_dropping(message)
+            elif self._queue.full():
+                started = time.monotonic()
+                await self._queue.put(message)  # Backpressure: deixa de ler o socket
+                self.blocked_seconds += time.monotonic() - started
+            else:
+                self._queue.put_nowait(message)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        message = await self._queue.get()
+        if message is _CLOSED:
+            raise StopAsyncIteration
+        return message
+
+    # Envio e assinaturas ########################################
+    async def _send(self, message: dict):
+        if self._ws is None:
+            return False
+        try:
+            await self._ws.send(json.dumps(message) + _record_separator)
+            return True
+        except Exception as error:
+            print(f"Erro ao enviar mensagem: {error}")
+            return False
+
+    async def _subscribe(self, target: str, arguments: list):
+        message = _subscription_message(target, arguments)
+        self._subscriptions[(target, tuple(arguments))] = message
+        await self._send(message)  # Se desconectado, é enviada ao conectar
+
+    async def _unsubscribe(self, target: str, subscribe_target: str, arguments: list):
+        self._subscriptions.pop((subscribe_target, tuple(arguments)), None)
+        await self._send(_subscription_message(target, arguments))
+
+    async def subscribe_quote(self, ticker: str):
+        await self._subscribe('SubscribeQuote', [ticker])
+
+    async def unsubscribe_quote(self, ticker: str):
+        await self._unsubscribe('UnsubscribeQuote', 'SubscribeQuote', [ticker])
+
+    async def subscribe_book(self, ticker: str):
+        await self._subscribe('SubscribeBook', [ticker])
+
+    async def unsubscribe_book(self, ticker: str):
+        await self._unsubscribe('UnsubscribeBook', 'SubscribeBook', [ticker])
+
+    async def subscribe_orders_status(self):
+        await self._subscribe('SubscribeOrdersStatus', [])
+
+    async def unsubscribe_orders_status(self):
+        await self._unsubscribe('UnsubscribeOrdersStatus', 'SubscribeOrdersStatus', [])
+
+    def get_stats(self) -> dict:
+        return {
+            'connected': self.connected,
+            'connects': self.connects,
+            'reconnects': self.reconnects,
+            'received': self.received,
+            'dropped': self.dropped,
+            'decode_errors': self._decoder.decode_errors,
+            'skipped': self._decoder.skipped,
+            'queue_depth': self._queue.qsize(),
+            'blocked_seconds': round(self.blocked_seconds, 6),
+            'subscriptions': len(self._subscriptions)
+        }
+
+# Adaptador para a API de callbacks ############################
+async def run_with_callbacks(feed: AsyncClearWebSocket, on_message_callback, on_open_callback=None):
+    """
+    Consome o feed chamando on_message_callback(dict) para cada mensagem,
+    no mesmo formato do websocket_client baseado em threads.
+    """
+    if on_open_callback is not None:
+        feed.on_open = on_open_callback
+    try:
+        await feed.start()
+    except ConnectionError as e:
+        print(f"❌ {e}")
+        return
+    async for message in feed:
+        try:
+            on_message_callback(message)
+        except Exception as e:
+            print(f"❌ Erro no callback de mensagem: {e}")
+
+def initialize_market_data_websocket_async(on_message_callback, on_open_callback) -> AsyncClearWebSocket:
+    """Equivalente assíncrono de initialize_market_data_websocket (chamar dentro do event loop)"""
+    feed = AsyncClearWebSocket(MARKETDATA_ROUTE)
+    asyncio.get_running_loop().create_task(run_with_callbacks(feed, on_message_callback, on_open_callback))
+    return feed
+
+def initialize_orders_websocket_async(on_message_callback, on_open_callback) -> AsyncClearWebSocket:
+    """Equivalente assíncrono de initialize_orders_websocket (chamar dentro do event loop)"""
+    feed = AsyncClearWebSocket(ORDERS_ROUTE)
+    asyncio.get_running_loop().create_task(run_with_callbacks(feed, on_message_callback, on_open_callback))
+    return feed
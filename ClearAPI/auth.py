@@ -1,25 +1,70 @@
 # auth.py
+import base64
+import json
+import os
 import requests
-from config import SUBSCRIPTION_KEY, API_KEY, API_SECRET, USER_AGENT
+from config import API_KEY, API_SECRET
+from rate_limiter import PRIORITY_ORDER
+from rest_client import get_rest_client
+from token_provider import TokenProvider
 
-_auth_url = 'https://api-parceiros.xpi.com.br/variableincome-openapi-auth/v1/auth'
+try:
+    from config import AUTH_URL as _auth_url
+except ImportError:
+    _auth_url = 'https://api-parceiros.xpi.com.br/variableincome-openapi-auth/v1/auth'
+_auth_url = os.environ.get('CLEARAPI_AUTH_URL', _auth_url)
 
-def get_auth_token() -> str:
-    headers = {
-        'Content-Type': 'application/json',
-        'Ocp-Apim-Subscription-Key': SUBSCRIPTION_KEY,
-        'User-Agent': USER_AGENT
-    }
+# Validade usada quando a resposta não informa 'expires_in' nem o JWT possui 'exp'
+DEFAULT_TOKEN_TTL_SECONDS = 300
+
+def _token_ttl(data: dict, token: str) -> float:
+    """Obtém a validade do token a partir da resposta ou do próprio JWT"""
+    expires_in = data.get('expires_in')
+    if expires_in:
+        return float(expires_in)
+
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        if 'exp' in claims and 'iat' in claims:
+            return float(claims['exp']) - float(claims['iat'])
+    except (IndexError, ValueError, TypeError):
+        pass
+
+    return DEFAULT_TOKEN_TTL_SECONDS
+
+def _request_auth_token() -> tuple:
     payload = {
         'API_KEY': API_KEY,
         'API_SECRET': API_SECRET
     }
 
-    response = requests.post(_auth_url, headers=headers, json=payload)
+    # Os headers padrão (Subscription-Key e User-Agent) vêm do cliente REST
+    # Autenticação tem a prioridade mais alta: todas as outras chamadas dependem dela
+    response = get_rest_client().post(_auth_url, json=payload, priority=PRIORITY_ORDER)
     if response.status_code == 200:
         data = response.json()
         token = data.get('access_token')
-        return token
+        return token, _token_ttl(data, token)
     else:
         error_message = response.text
-        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {error_message}")
\ No newline at end of file
+        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {error_message}")
+
+_token_provider = TokenProvider(_request_auth_token)
+
+def get_auth_token() -> str:
+    """Retorna o access_token em cache, renovando-o quando necessário"""
+    return _token_provider.get_token()
+
+async def get_auth_token_async(fetch_token_async=None) -> str:
+    """Versão asyncio de get_auth_token (compartilha o mesmo cache)"""
+    return await _token_provider.get_token_async(fetch_token_async)
+
+def invalidate_auth_token():
+    """Descarta o token em cache, forçando uma nova autenticação"""
+    _token_provider.invalidate()
+
+def get_auth_token_stats() -> dict:
+    """Retorna os contadores de hit/miss/refresh do cache de token"""
+    return _token_provider.get_stats()
@@ -0,0 +1,341 @@
+# backtest.py
+# Backtest de estratégias sobre ticks gravados: modo vetorizado (NumPy) e modo por eventos (callbacks de Quote)
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from send_order import SendLimitedOrderRequest, SendMarketOrderRequest, SendOrderResponse
+from candles import CANDLE_UTC_OFFSET_SECONDS
+from signalr_framing import RecordDecoder
+from tick_recorder import KIND_MESSAGE, KIND_RAW, read_recordings, TICK_RECORDER_UTC_OFFSET_SECONDS
+from tick_store import TICK_DTYPE
+
+CANDLE_DTYPE = np.dtype([
+    ('ts', 'f8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8')
+])
+
+BACKTEST_MULTIPLIER = 1.0  # Valor financeiro de 1 ponto por contrato (ex.: WIN = 0.2, WDO = 10.0)
+BACKTEST_COMMISSION = 0.0  # Custo por contrato negociado
+BACKTEST_SLIPPAGE = 0.0  # Pontos pagos além do bid/ask nas ordens a mercado
+
+# Carga dos dados ####################################################
+
+def load_ticks(directory: str, ticker: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+    """Quotes de um ticker gravados pelo tick_recorder, como array TICK_DTYPE (ts = horário gravado)"""
+    decoder = RecordDecoder()
+    rows = []
+    for record in read_recordings(directory, start, end):
+        if KIND_RAW in record:
+            messages = decoder.feed(record[KIND_RAW])
+        elif KIND_MESSAGE in record:
+            messages = (record[KIND_MESSAGE],)
+        else:
+            continue
+        for message in messages:
+            if message.get('target') != 'Quote' or not message.get('arguments'):
+                continue
+            quote = message['arguments'][0]
+            if quote.get('ticker') != ticker or quote.get('lastPrice') is None:
+                continue
+            rows.append((
+                record['ts'],
+                quote['lastPrice'],
+                np.nan if quote.get('bid') is None else quote['bid'],
+                np.nan if quote.get('ask') is None else quote['ask'],
+                quote.get('volume') or 0
+            ))
+    return np.array(rows, dtype=TICK_DTYPE)
+
+def ticks_to_candles(ticks: np.ndarray, seconds: int, utc_offset: int = CANDLE_UTC_OFFSET_SECONDS) -> np.ndarray:
+    """Agrega ticks (ordenados por ts) em candles de `seconds` segundos; volume = incremento do acumulado"""
+    if not len(ticks):
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    ts = ticks['ts']
+    local = ts + utc_offset
+    buckets = local - np.mod(local, seconds) - utc_offset
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(ticks)])) - 1
+    last = ticks['last']
+    volume = ticks['volume'].astype(float)
+    candles = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    candles['ts'] = buckets[starts]
+    candles['open'] = last[starts]
+    candles['high'] = np.maximum.reduceat(last, starts)
+    candles['low'] = np.minimum.reduceat(last, starts)
+    candles['close'] = last[ends]
+    previous_volume = np.concatenate(([volume[0]], volume[ends[:-1]]))
+    candles['volume'] = np.maximum(volume[ends] - previous_volume, 0.0)
+    return candles
+
+def _price_columns(data: np.ndarray):
+    """(último, preço de compra, preço de venda) de ticks ou candles"""
+    if 'last' in data.dtype.names:
+        last = data['last']
+        buy = np.where(np.isnan(data['ask']), last, data['ask'])
+        sell = np.where(np.isnan(data['bid']), last, data['bid'])
+        return last, buy, sell
+    close = data['close']
+    return close, close, close
+
+def _report(equity: np.ndarray, fills: int, costs: float, final_position: float, round_trips: List[float],
+            keep_equity: bool) -> dict:
+    if len(equity):
+        drawdown = np.maximum.accumulate(np.maximum(equity, 0.0)) - equity
+        max_drawdown = float(drawdown.max())
+        net_pnl = float(equity[-1])
+    else:
+        max_drawdown = net_pnl = 0.0
+    wins = sum(1 for pnl in round_trips if pnl > 0)
+    report = {
+        'net_pnl': net_pnl,
+        'gross_pnl': net_pnl + costs,
+        'costs': costs,
+        'max_drawdown': max_drawdown,
+        'fills': fills,
+        'round_trips': len(round_trips),
+        'win_rate': wins / len(round_trips) if round_trips else 0.0,
+        'final_position': final_position,
+        'ticks': len(equity)
+    }
+    if keep_equity:
+        report['equity'] = equity
+    return report
+
+def _round_trips(executed: np.ndarray, equity: np.ndarray) -> List[float]:
+    """Resultado de cada operação: variação do patrimônio entre abrir e zerar (ou inverter) a posição"""
+    results = []
+    opened_at = None
+    previous = 0.0
+    changes = np.flatnonzero(np.diff(executed, prepend=0.0))
+    for i in changes:
+        position = executed[i]
+        if previous != 0.0 and (position == 0.0 or np.sign(position) != np.sign(previous)):
+            results.append(float(equity[i] - equity[opened_at]))
+            opened_at = None
+        if position != 0.0 and opened_at is None:
+            opened_at = i - 1 if i > 0 else 0
+        previous = position
+    return results
+
+# Modo vetorizado ####################################################
+
+def run_vectorized(
+    data: np.ndarray,
+    positions,
+    multiplier: float = BACKTEST_MULTIPLIER,
+    commission: float = BACKTEST_COMMISSION,
+    slippage: float = BACKTEST_SLIPPAGE,
+    keep_equity: bool = False
+) -> dict:
+    """
+    Backtest de uma estratégia de sinais: positions[i] é a posição desejada
+    (em contratos) após ver o tick i. Como uma ordem a mercado enviada no
+    callback do tick i, a diferença é executada no tick seguinte, comprando
+    no ask e vendendo no bid (+ slippage). O patrimônio é marcado no último preço.
+    """
+    last, buy, sell = _price_columns(data)
+    target = np.asarray(positions, dtype=float)
+    executed = np.zeros(len(target))
+    executed[1:] = target[:-1]
+    delta = np.diff(executed, prepend=0.0)
+    fill = np.where(delta > 0, buy + slippage, np.where(delta < 0, sell - slippage, 0.0))
+    traded = np.abs(delta)
+    costs = np.cumsum(traded) * commission
+    cash = -np.cumsum(delta * fill) * multiplier - costs
+    equity = cash + executed * last * multiplier
+    return _report(equity, int(np.count_nonzero(delta)), float(costs[-1]) if len(costs) else 0.0,
+                   float(executed[-1]) if len(executed) else 0.0, _round_trips(executed, equity), keep_equity)
+
+# Modo por eventos ###################################################
+
+class SimulatedBroker:
+    """
+    Recebe SendMarketOrderRequest/SendLimitedOrderRequest como as funções de
+    send_order e simula as execuções nos ticks seguintes:
+    - a mercado: executa no próximo tick (compra no ask, venda no bid, + slippage)
+    - limitada Day: fica no book até o ask (compra) ou o bid (venda) atingir o
+      preço, executando no preço limite; expira na virada do dia
+    - limitada ImmediateOrCancel/FillOrKill: só vale no próximo tick (sem
+      execução parcial, as duas se comportam igual)
+    """
+    def __init__(
+        self,
+        multiplier: float = BACKTEST_MULTIPLIER,
+        commission: float = BACKTEST_COMMISSION,
+        slippage: float = BACKTEST_SLIPPAGE,
+        utc_offset: int = TICK_RECORDER_UTC_OFFSET_SECONDS
+    ):
+        self.multiplier = multiplier
+        self.commission = commission
+        self.slippage = slippage
+        self.utc_offset = utc_offset
+        self.positions: Dict[str, float] = {}
+        self.cash = 0.0
+        self.costs = 0.0
+        self.fills: List[dict] = []
+        self.cancelled = 0
+        self._pending: List[dict] = []
+        self._ids = itertools.count(1)
+        self._day = None
+
+    def _submit(self, request, price: Optional[float]) -> SendOrderResponse:
+        order_id = f"SIM-{next(self._ids)}"
+        self._pending.append({
+            'id': order_id,
+            'ticker': request.Ticker,
+            'side': 1.0 if request.Side == 'Buy' else -1.0,
+            'quantity': float(request.Quantity),
+            'price': price,
+            'tif': request.TimeInForce,
+            'day': self._day
+        })
+        return SendOrderResponse(order_id)
+
+    def send_market_order(self, order_request: SendMarketOrderRequest) -> SendOrderResponse:
+        return self._submit(order_request, None)
+
+    def send_limited_order(self, order_request: SendLimitedOrderRequest) -> SendOrderResponse:
+        return self._submit(order_request, float(order_request.Price))
+
+    def position(self, ticker: str) -> float:
+        return self.positions.get(ticker, 0.0)
+
+    def on_tick(self, ticker: str, ts: float, last: float, buy: float, sell: float):
+        """Executa as ordens pendentes do ticker contra este tick (antes da estratégia vê-lo)"""
+        local = ts + self.utc_offset
+        self._day = local - local % 86400
+        if not self._pending:
+            return
+        remaining = []
+        for order in self._pending:
+            if order['ticker'] != ticker:
+                remaining.append(order)
+                continue
+            if order['day'] is not None and order['day'] != self._day:
+                self.cancelled += 1  # Validade do dia expirou antes de executar
+                continue
+            if order['price'] is None:
+                price = buy + self.slippage if order['side'] > 0 else sell - self.slippage
+            elif order['side'] > 0 and buy <= order['price'] or order['side'] < 0 and sell >= order['price']:
+                price = order['price']
+            else:
+                price = None
+            if price is not None:
+                self._fill(order, ts, price)
+            elif order['tif'] == 'Day':
+                remaining.append(order)
+            else:
+                self.cancelled += 1
+        self._pending = remaining
+
+    def _fill(self, order: dict, ts: float, price: float):
+        quantity = order['side'] * order['quantity']
+        self.positions[order['ticker']] = self.positions.get(order['ticker'], 0.0) + quantity
+        cost = order['quantity'] * self.commission
+        self.cash -= quantity * price * self.multiplier + cost
+        self.costs += cost
+        self.fills.append({'id': order['id'], 'ts': ts, 'ticker': order['ticker'], 'quantity': quantity, 'price': price})
+
+    def equity(self, ticker: str, last: float) -> float:
+        return self.cash + self.positions.get(ticker, 0.0) * last * self.multiplier
+
+def quote_message(ticker: str, tick) -> dict:
+    """Mensagem no formato do callback de market data (target 'Quote')"""
+    return {
+        'type': 1,
+        'target': 'Quote',
+        'arguments': [{
+            'ticker': ticker,
+            'lastPrice': float(tick['last']),
+            'bid': None if np.isnan(tick['bid']) else float(tick['bid']),
+            'ask': None if np.isnan(tick['ask']) else float(tick['ask']),
+            'volume': int(tick['volume'])
+        }]
+    }
+
+def run_events(
+    data: np.ndarray,
+    ticker: str,
+    make_strategy: Callable[[SimulatedBroker], Callable[[dict], None]],
+    multiplier: float = BACKTEST_MULTIPLIER,
+    commission: float = BACKTEST_COMMISSION,
+    slippage: float = BACKTEST_SLIPPAGE,
+    keep_equity: bool = False
+) -> dict:
+    """
+    Backtest de uma estratégia de callback: make_strategy(broker) retorna o
+    callback que recebe cada Quote (mesmo formato do market_data_callback) e
+    envia ordens por broker.send_market_order/send_limited_order.
+    """
+    broker = SimulatedBroker(multiplier, commission, slippage)
+    callback = make_strategy(broker)
+    last, buy, sell = _price_columns(data)
+    ts = data['ts']
+    equity = np.empty(len(data))
+    executed = np.empty(len(data))
+    is_ticks = 'last' in data.dtype.names
+    for i in range(len(data)):
+        broker.on_tick(ticker, ts[i], last[i], buy[i], sell[i])
+        equity[i] = broker.equity(ticker, last[i])
+        executed[i] = broker.position(ticker)
+        if is_ticks:
+            callback(quote_message(ticker, data[i]))
+        else:
+            callback({'type': 1, 'target': 'Quote', 'arguments': [{'ticker': ticker, 'lastPrice': float(last[i])}]})
+    report = _report(equity, len(broker.fills), broker.costs, broker.position(ticker),
+                     _round_trips(executed, equity), keep_equity)
+    report['cancelled'] = broker.cancelled
+    return report
+
+# Varredura de parâmetros ############################################
+
+_sweep_data = None
+
+def _init_sweep(data: np.ndarray):
+    global _sweep_data
+    _sweep_data = data
+
+def _run_params(args) -> dict:
+    strategy_cls, params, mode, options = args
+    strategy = strategy_cls(**params)
+    if mode == 'events':
+        report = run_events(_sweep_data, strategy.ticker, strategy.bind, **options)
+    else:
+        report = run_vectorized(_sweep_data, strategy.target_positions(_sweep_data), **options)
+    report['params'] = params
+    return report
+
+def sweep(
+    data: np.ndarray,
+    strategy_cls,
+    grid: Dict[str, Iterable],
+    mode: str = 'vectorized',
+    processes: Optional[int] = None,
+    **options
+) -> List[dict]:
+    """
+    Roda strategy_cls(**params) para cada combinação do grid em um pool de
+    processos (os dados são enviados uma vez por processo). strategy_cls
+    precisa ser importável (definida no nível de um módulo) e oferecer
+    target_positions(data) (modo vetorizado) ou bind(broker) e ticker (modo
+    por eventos). Retorna os relatórios ordenados pelo resultado líquido.
+    """
+    names = list(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    tasks = [(strategy_cls, params, mode, options) for params in combinations]
+    processes = processes if processes is not None else min(len(tasks), os.cpu_count() or 1)
+    if processes <= 1:
+        _init_sweep(data)
+        results = [_run_params(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_sweep, initargs=(data,)) as pool:
+            results = list(pool.map(_run_params, tasks, chunksize=max(1, len(tasks) // (processes * 4))))
+    return sorted(results, key=lambda report: report['net_pnl'], reverse=True)
@@ -0,0 +1,256 @@
+# candles.py
+# Agregação incremental de cotações em candles OHLCV, em vários timeframes ao mesmo tempo
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+try:
+    from config import CANDLE_UTC_OFFSET_SECONDS
+except ImportError:
+    CANDLE_UTC_OFFSET_SECONDS = -3 * 3600  # Horário de Brasília: o candle diário começa à meia-noite local
+
+# Timeframe -> duração em segundos
+CANDLE_TIMEFRAMES = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '1d': 86400
+}
+CANDLE_HISTORY = 500  # Candles fechados mantidos por ticker e timeframe
+CANDLE_LATE_BARS = 3  # Candles fechados que ainda aceitam ticks atrasados
+CANDLE_MAX_TICKERS = 100  # Máximo de tickers agregados (o sem ticks há mais tempo é descartado)
+
+EVENT_CLOSED = 'closed'
+EVENT_REVISED = 'revised'  # Tick atrasado alterou um candle já fechado
+
+class Bar:
+    """Um candle; o volume é a soma dos incrementos do volume acumulado do Quote"""
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume', 'ticks', 'first_ts', 'last_ts')
+
+    def __init__(self, start: float, ts: float, price: float, volume: float):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.ticks = 1
+        self.first_ts = self.last_ts = ts
+
+    def update(self, ts: float, price: float, volume: float):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        # Fora de ordem: só o tick mais novo define o fechamento (e o mais antigo a abertura)
+        if ts >= self.last_ts:
+            self.close = price
+            self.last_ts = ts
+        elif ts < self.first_ts:
+            self.open = price
+            self.first_ts = ts
+        self.volume += volume
+        self.ticks += 1
+
+    def to_dict(self) -> dict:
+        return {
+            't': self.start,
+            'o': self.open,
+            'h': self.high,
+            'l': self.low,
+            'c': self.close,
+            'v': self.volume,
+            'n': self.ticks
+        }
+
+class _Series:
+    __slots__ = ('seconds', 'current', 'closed')
+
+    def __init__(self, seconds: int, history: int):
+        self.seconds = seconds
+        self.current: Optional[Bar] = None
+        self.closed: "deque[Bar]" = deque(maxlen=history)
+
+class CandleAggregator:
+    """
+    Transforma o fluxo de Quotes em candles de vários timeframes.
+
+    Cada tick custa O(1) por timeframe: atualiza o candle aberto ou, se
+    caiu em um período posterior, fecha o candle aberto e abre outro. Ticks
+    atrasados de um dos últimos late_bars candles fechados revisam esse
+    candle; mais antigos são descartados. Candles fechados (e revisados)
+    vão para os listeners, chamados como listener(ticker, timeframe, bar,
+    evento) com bar no formato de Bar.to_dict(). close_expired(agora)
+    fecha os candles cujo período já terminou, mesmo sem novos ticks.
+    """
+    def __init__(
+        self,
+        timeframes: Optional[Dict[str, int]] = None,
+        history: int = CANDLE_HISTORY,
+        late_bars: int = CANDLE_LATE_BARS,
+        utc_offset: int = CANDLE_UTC_OFFSET_SECONDS,
+        max_tickers: int = CANDLE_MAX_TICKERS
+    ):
+        self.timeframes = dict(timeframes or CANDLE_TIMEFRAMES)
+        self.history = history
+        self.late_bars = late_bars
+        self.utc_offset = utc_offset
+        self.max_tickers = max_tickers
+        self._series: "OrderedDict[str, Dict[str, _Series]]" = OrderedDict()  # ticker -> timeframe -> série (LRU)
+        self._last_volume: Dict[str, float] = {}  # ticker -> último volume acumulado
+        self._listeners: List[Callable] = []
+        self._lock = threading.RLock()
+
+        # Métricas
+        self.ticks = 0
+        self.bars_closed = 0
+        self.late_updates = 0
+        self.late_dropped = 0
+        self.evictions = 0  # Tickers descartados (o sem ticks há mais tempo) ao passar de max_tickers
+
+    def add_listener(self, listener: Callable):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, ticker: str, timeframe: str, bar: Bar, event: str):
+        for listener in self._listeners:
+            try:
+                listener(ticker, timeframe, bar.to_dict(), event)
+            except Exception as e:
+                print(f"❌ Erro no callback de candles de {ticker}: {e}")
+
+    def _bucket(self, ts: float, seconds: int) -> float:
+        local = ts + self.utc_offset
+        return local - local % seconds - self.utc_offset
+
+    def _get_series(self, ticker: str) -> Dict[str, _Series]:
+        series = self._series.get(ticker)
+        if series is None:
+            while self._series and len(self._series) >= self.max_tickers:
+                idle, _ = self._series.popitem(last=False)
+                self._last_volume.pop(idle, None)
+                self.evictions += 1
+            series = self._series[ticker] = {
+                timeframe: _Series(seconds, self.history) for timeframe, seconds in self.timeframes.items()
+            }
+        else:
+            self._series.move_to_end(ticker)
+        return series
+
+    def on_tick(self, ticker: str, ts: float, price: float, volume: Optional[float] = None):
+        """Aplica um tick (volume = volume acumulado do dia, como no Quote)"""
+        with self._lock:
+            series = self._get_series(ticker)
+            # Incremento do volume acumulado
+            delta = 0
+            if volume is not None:
+                previous = self._last_volume.get(ticker)
+                if previous is None or volume >= previous:
+                    delta = 0 if previous is None else volume - previous
+                    self._last_volume[ticker] = volume
+                elif volume < previous / 2:
+                    self._last_volume[ticker] = volume  # Volume zerou: novo pregão
+                # Queda pequena é tick fora de ordem: mantém a referência
+            self.ticks += 1
+
+            for timeframe, s in series.items():
+                start = self._bucket(ts, s.seconds)
+                current = s.current
+                if current is None:
+                    if s.closed and start <= s.closed[-1].start:
+                        self._apply_late(ticker, timeframe, s, start, ts, price, delta)
+                    else:
+                        s.current = Bar(start, ts, price, delta)
+                elif start == current.start:
+                    current.update(ts, price, delta)
+                elif start > current.start:
+                    s.closed.append(current)
+                    self.bars_closed += 1
+                    s.current = Bar(start, ts, price, delta)
+                    self._emit(ticker, timeframe, current, EVENT_CLOSED)
+                else:
+                    self._apply_late(ticker, timeframe, s, start, ts, price, delta)
+
+    def _apply_late(self, ticker: str, timeframe: str, s: _Series, start: float, ts: float, price: float, delta: float):
+        closed = s.closed
+        for i in range(1, min(self.late_bars, len(closed)) + 1):
+            bar = closed[-i]
+            if bar.start == start:
+                bar.update(ts, price, delta)
+                self.late_updates += 1
+                self._emit(ticker, timeframe, bar, EVENT_REVISED)
+                return
+            if bar.start < start:
+                break
+        self.late_dropped += 1
+
+    def on_quote(self, ticker: str, quote: dict, ts: Optional[float] = None):
+        """Aplica um Quote da ClearAPI (ts = instante de recebimento, se omitido)"""
+        price = quote.get('lastPrice')
+        if price is not None:
+            self.on_tick(ticker, time.time() if ts is None else ts, price, quote.get('volume'))
+
+    def close_expired(self, now: Optional[float] = None) -> int:
+        """Fecha os candles cujo período terminou; retorna quantos foram fechados"""
+        now = time.time() if now is None else now
+        closed = 0
+        with self._lock:
+            for ticker, series in self._series.items():
+                for timeframe, s in series.items():
+                    current = s.current
+                    if current is not None and now >= current.start + s.seconds:
+                        s.closed.append(current)
+                        s.current = None
+                        closed += 1
+                        self.bars_closed += 1
+                        self._emit(ticker, timeframe, current, EVENT_CLOSED)
+        return closed
+
+    def get_partial(self, ticker: str, timeframe: str) -> Optional[dict]:
+        """Candle ainda aberto (None se não houver)"""
+        with self._lock:
+            s = self._series.get(ticker, {}).get(timeframe)
+            return s.current.to_dict() if s is not None and s.current is not None else None
+
+    def get_candles(self, ticker: str, timeframe: str, limit: int = CANDLE_HISTORY, include_partial: bool = True) -> List[dict]:
+        """Últimos candles do ticker, do mais antigo ao mais novo (o aberto por último)"""
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Timeframe desconhecido: {timeframe}")
+        with self._lock:
+            s = self._series.get(ticker, {}).get(timeframe)
+            if s is None:
+                return []
+            bars = list(s.closed)
+            if include_partial and s.current is not None:
+                bars.append(s.current)
+            return [bar.to_dict() for bar in bars[-limit:]] if limit > 0 else []
+
+    def tickers(self) -> List[str]:
+        return list(self._series)
+
+    def discard(self, ticker: str):
+        with self._lock:
+            self._series.pop(ticker, None)
+            self._last_volume.pop(ticker, None)
+
+    def get_stats(self) -> dict:
+        return {
+            'tickers': len(self._series),
+            'timeframes': list(self.timeframes),
+            'ticks': self.ticks,
+            'bars_closed': self.bars_closed,
+            'late_updates': self.late_updates,
+            'late_dropped': self.late_dropped,
+            'evictions': self.evictions
+        }
+
+_candle_aggregator = None
+
+def get_candle_aggregator() -> CandleAggregator:
+    """Retorna o agregador de candles compartilhado (criado no primeiro uso)"""
+    global _candle_aggregator
+    if _candle_aggregator is None:
+        _candle_aggregator = CandleAggregator()
+    return _candle_aggregator
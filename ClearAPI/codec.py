@@ -0,0 +1,160 @@
+# codec.py
+# Serialização JSON das mensagens do feed, com orjson ou msgspec opcionais
+import json
+import os
+import struct
+
+# Codec padrão: 'json' (biblioteca padrão), 'orjson' ou 'msgspec'
+# Pode ser definido em config.py (JSON_CODEC) ou pela variável de ambiente CLEARAPI_JSON_CODEC
+try:
+    from config import JSON_CODEC
+except ImportError:
+    JSON_CODEC = 'json'
+JSON_CODEC = os.environ.get('CLEARAPI_JSON_CODEC', JSON_CODEC)
+
+# Erros de decodificação/serialização do codec em uso (use em except codec.DecodeError).
+# O msgspec tem hierarquia própria (MsgspecError), então set_codec acrescenta as classes dele
+DecodeError = (ValueError,)
+EncodeError = (TypeError, ValueError)
+
+_name = 'json'
+_dumpb = None
+_loads = None
+
+def _std_dumpb(obj) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+def set_codec(name: str) -> str:
+    """Seleciona o codec; se a biblioteca não estiver instalada, usa o json padrão"""
+    global _name, _dumpb, _loads, DecodeError, EncodeError
+    DecodeError, EncodeError = (ValueError,), (TypeError, ValueError)
+    if name == 'orjson':
+        try:
+            import orjson
+            _name, _dumpb, _loads = name, orjson.dumps, orjson.loads
+            return _name
+        except ImportError:
+            print("⚠️ orjson não instalado, usando json padrão")
+    elif name == 'msgspec':
+        try:
+            import msgspec
+            _name, _dumpb, _loads = name, msgspec.json.encode, msgspec.json.decode
+            DecodeError, EncodeError = (ValueError, msgspec.DecodeError), (TypeError, ValueError, msgspec.EncodeError)
+            return _name
+        except ImportError:
+            print("⚠️ msgspec não instalado, usando json padrão")
+    elif name != 'json':
+        print(f"⚠️ Codec desconhecido '{name}', usando json padrão")
+    _name, _dumpb, _loads = 'json', _std_dumpb, json.loads
+    return _name
+
+def get_codec() -> str:
+    """Retorna o nome do codec em uso"""
+    return _name
+
+def dumpb(obj) -> bytes:
+    """Serializa para bytes UTF-8"""
+    return _dumpb(obj)
+
+def dumps(obj) -> str:
+    """Serializa para str (para frames de texto do WebSocket)"""
+    if _name == 'json':
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+    return _dumpb(obj).decode()
+
+def loads(data):
+    """Desserializa str ou bytes"""
+    return _loads(data)
+
+# MessagePack (frames binários do dashboard) #################
+def _pack(obj, out: bytearray):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xff)
+        elif 0 <= obj < 0x100:
+            out += struct.pack('>BB', 0xcc, obj)
+        elif 0 <= obj < 0x10000:
+            out += struct.pack('>BH', 0xcd, obj)
+        elif 0 <= obj < 0x100000000:
+            out += struct.pack('>BI', 0xce, obj)
+        elif 0 <= obj:
+            out += struct.pack('>BQ', 0xcf, obj)
+        elif -0x80 <= obj:
+            out += struct.pack('>Bb', 0xd0, obj)
+        elif -0x8000 <= obj:
+            out += struct.pack('>Bh', 0xd1, obj)
+        elif -0x80000000 <= obj:
+            out += struct.pack('>Bi', 0xd2, obj)
+        else:
+            out += struct.pack('>Bq', 0xd3, obj)
+    elif isinstance(obj, float):
+        out += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, str):
+        data = obj.encode()
+        size = len(data)
+        if size < 32:
+            out.append(0xa0 | size)
+        elif size < 0x100:
+            out += struct.pack('>BB', 0xd9, size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xda, size)
+        else:
+            out += struct.pack('>BI', 0xdb, size)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        size = len(obj)
+        if size < 0x100:
+            out += struct.pack('>BB', 0xc4, size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xc5, size)
+        else:
+            out += struct.pack('>BI', 0xc6, size)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 16:
+            out.append(0x90 | size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xdc, size)
+        else:
+            out += struct.pack('>BI', 0xdd, size)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 16:
+            out.append(0x80 | size)
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xde, size)
+        else:
+            out += struct.pack('>BI', 0xdf, size)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"Tipo não suportado pelo MessagePack: {type(obj)}")
+
+def _std_packb(obj) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+try:
+    import msgpack
+    _packb = lambda obj: msgpack.packb(obj, use_bin_type=True)  # noqa: E731
+except ImportError:
+    _packb = _std_packb  # Implementação própria (subconjunto usado pelo dashboard)
+
+def packb(obj) -> bytes:
+    """Serializa para MessagePack"""
+    return _packb(obj)
+
+set_codec(JSON_CODEC)
@@ -3,6 +3,12 @@ SUBSCRIPTION_KEY = "54870a6e21e14a38adbcdb27ebb5f195" # Identificador do produto
 USER_AGENT = "Smart-Trader-API Devs-Clear" # User-Agent obrigatório para todas as requisições
 API_BASE_URL = "https://variableincome-openapi-simulator.xpi.com.br/api" # URL base da API simulador
 WS_BASE_URL = "wss://variableincome-openapi-simulator.xpi.com.br" # URL base do WebSocket simulador
+AUTH_URL = "https://api-parceiros.xpi.com.br/variableincome-openapi-auth/v1/auth" # URL de autenticação (opcional)
 API_KEY = "YOUR_API_KEY_HERE" # Sua API Key - Configure com sua chave real
 API_SECRET = "YOUR_API_SECRET_HERE" # Sua API Secret - Configure com seu secret real
 PRIVATE_RSA_KEY_PATH = "ClearAPI/key_RSA.pem" # Caminho para a chave privada RSA
+JSON_CODEC = "json" # Codec das mensagens do feed: "json", "orjson" ou "msgspec" (opcional; requer o pacote instalado)
+ORDER_BOOK_MAX_LEVELS = 50 # Níveis do book de ofertas mantidos por lado (opcional)
+TICK_STORE_CAPACITY = 50000 # Ticks mantidos em memória por ticker (opcional)
+CANDLE_UTC_OFFSET_SECONDS = -10800 # Fuso dos candles (o diário começa à meia-noite local; opcional)
+TICK_RECORDER_DIR = None # Diretório para gravar o feed do web_app, ex.: "recordings" (opcional; None desliga)
@@ -0,0 +1,138 @@
+# feed_bridge.py
+# Passagem de mensagens do feed (qualquer thread) para uma única task consumidora no event loop
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+FEED_BRIDGE_MAX_SIZE = 10000  # Máximo de mensagens (ou tickers, na conflação) pendentes
+
+POLICY_DROP_OLDEST = 'drop_oldest'  # Fila cheia: descarta a mensagem mais antiga
+POLICY_CONFLATE = 'conflate'  # Mantém só a última mensagem pendente de cada chave (ticker)
+
+class FeedBridge:
+    """
+    Fila limitada entre o feed da ClearAPI e o event loop da aplicação.
+
+    publish() pode ser chamado de qualquer thread e não usa locks: as operações
+    em deque/dict são atômicas no CPython, e o consumidor só é acordado (via
+    loop.call_soon_threadsafe) quando ainda não há um despertar pendente.
+    Uma única task no loop entrega as mensagens ao handler, em lotes.
+    """
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[None]],
+        max_size: int = FEED_BRIDGE_MAX_SIZE,
+        policy: str = POLICY_CONFLATE
+    ):
+        if policy not in (POLICY_DROP_OLDEST, POLICY_CONFLATE):
+            raise ValueError(f"Política de descarte inválida: {policy}")
+        self.handler = handler
+        self.max_size = max_size
+        self.policy = policy
+        self._queue: deque = deque(maxlen=max_size)
+        self._latest: dict = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._scheduled = False
+
+        # Métricas (cada contador tem um único escritor: o produtor ou o consumidor)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    async def start(self):
+        """Inicia a task consumidora no event loop atual"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._consume())
+        if self.depth:
+            self._wakeup.set()  # Mensagens publicadas antes do start
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._latest) if self.policy == POLICY_CONFLATE else len(self._queue)
+
+    def publish(self, item: Any, key: Optional[Hashable] = None):
+        """Enfileira uma mensagem (thread-safe). Na conflação, key identifica o ticker."""
+        self.published += 1
+        if self.policy == POLICY_CONFLATE and key is not None:
+            if key in self._latest:
+                self.conflated += 1
+            elif len(self._latest) >= self.max_size:
+                self.dropped += 1
+                return
+            self._latest[key] = item
+        else:
+            if len(self._queue) == self.max_size:
+                self.dropped += 1  # deque(maxlen) descarta a mais antiga
+            self._queue.append(item)
+
+        depth = self.depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+        if not self._scheduled and self._loop is not None:
+            self._scheduled = True
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop encerrado
+
+    def _drain(self) -> list:
+        # O flag é limpo antes de esvaziar: uma publicação concorrente ou é vista
+        # aqui, ou agenda um novo despertar
+        self._scheduled = False
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.popleft())
+            except IndexError:
+                break
+        latest = []
+        while True:
+            try:
+                latest.append(self._latest.popitem()[1])
+            except KeyError:
+                break
+        latest.reverse()  # popitem é LIFO
+        return batch + latest
+
+    async def _consume(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            for item in self._drain():
+                try:
+                    await self.handler(item)
+                    self.delivered += 1
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Erro ao entregar mensagem do feed: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            'policy': self.policy,
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'max_size': self.max_size,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'errors': self.errors
+        }
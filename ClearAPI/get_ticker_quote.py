@@ -1,22 +1,94 @@
 # get_ticker_quote
+import threading
 import requests
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List
 from auth import get_auth_token
-from config import API_BASE_URL, SUBSCRIPTION_KEY, USER_AGENT
+from rate_limiter import PRIORITY_QUOTE
+from rest_client import get_rest_client
 
-def get_ticker_quote(ticker) -> dict:
-    url = f"{API_BASE_URL}/v1/marketdata/quote?Ticker={ticker}"
+# Número máximo de cotações buscadas em paralelo por get_ticker_quotes
+QUOTE_BATCH_MAX_WORKERS = 8
+
+# Requisições de cotação em andamento, por ticker (para agrupar chamadas idênticas)
+_inflight_quotes: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def get_ticker_quote(ticker, block: bool = True) -> dict:
     headers = {
-        'Ocp-Apim-Subscription-Key': SUBSCRIPTION_KEY,
         "Authorization": f"Bearer {get_auth_token()}",
-        "Content-Type": "application/json",
-        "User-Agent": USER_AGENT
+        "Content-Type": "application/json"
     }
 
-    response = requests.get(url, headers=headers)
+    response = get_rest_client().get(
+        '/v1/marketdata/quote',
+        params={'Ticker': ticker},
+        headers=headers,
+        priority=PRIORITY_QUOTE,
+        block=block
+    )
 
     if response.status_code == 200:
         return response.json()
     else:
         error_message = response.text
-        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {error_message}")
\ No newline at end of file
+        raise requests.HTTPError(f"Erro na solicitação: {response.status_code} - {error_message}")
+
+def normalize_tickers(tickers: Iterable[str]) -> List[str]:
+    """Converte para maiúsculas e remove vazios e duplicados, mantendo a ordem"""
+    seen = []
+    for ticker in tickers:
+        ticker = ticker.strip().upper()
+        if ticker and ticker not in seen:
+            seen.append(ticker)
+    return seen
+
+def get_ticker_quote_coalesced(ticker: str, block: bool = True) -> dict:
+    """
+    Igual a get_ticker_quote, mas chamadas simultâneas para o mesmo ticker
+    compartilham uma única requisição à API.
+    """
+    with _inflight_lock:
+        future = _inflight_quotes.get(ticker)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight_quotes[ticker] = future
+
+    if owner:
+        try:
+            future.set_result(get_ticker_quote(ticker, block=block))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _inflight_lock:
+                _inflight_quotes.pop(ticker, None)
+
+    return future.result()
+
+def get_ticker_quotes(tickers: List[str], return_exceptions: bool = False) -> Dict[str, dict]:
+    """
+    Busca as cotações de vários tickers em paralelo (respeitando o limite de taxa).
+
+    Args:
+        tickers: Lista de tickers.
+        return_exceptions: Se True, tickers com erro recebem a exceção como valor;
+            caso contrário, o primeiro erro é levantado após todas as buscas terminarem.
+
+    Returns:
+        Dicionário ticker -> cotação.
+    """
+    tickers = normalize_tickers(tickers)
+    if not tickers:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(len(tickers), QUOTE_BATCH_MAX_WORKERS)) as executor:
+        futures = {ticker: executor.submit(get_ticker_quote_coalesced, ticker) for ticker in tickers}
+
+    results = {}
+    for ticker, future in futures.items():
+        error = future.exception()
+        if error is not None and not return_exceptions:
+            raise error
+        results[ticker] = error if error is not None else future.result()
+    return results
@@ -0,0 +1,302 @@
+# indicators.py
+# Indicadores técnicos incrementais (O(1) por tick) e versões vetorizadas (NumPy) para séries históricas
+import math
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# As classes recebem um valor por vez e retornam o indicador atualizado (None
+# enquanto não há dados suficientes). As funções de mesmo nome em minúsculas
+# calculam a série inteira de uma vez, com NaN no aquecimento, e dão o mesmo
+# resultado (a menos de arredondamento) que as classes aplicadas tick a tick.
+# Servem direto sobre as colunas do tick_store (ex.: ema(ticks['last'], 20)).
+
+_EMA_BLOCK_DECAY = 1e-8  # Decaimento máximo dentro de um bloco da EMA vetorizada
+
+def _ema_filter(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    y[i] = (1 - alpha) * y[i-1] + alpha * x[i], com y[-1] = initial.
+
+    Em blocos onde (1 - alpha)^tamanho >= _EMA_BLOCK_DECAY a recursão tem forma
+    fechada: y = w * (anterior + alpha * cumsum(x / w)), com w = (1 - alpha)^(j+1).
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.empty(len(values))
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = max(1, int(math.log(_EMA_BLOCK_DECAY) / math.log(decay))) if decay < 1.0 else len(values) or 1
+    weights = decay ** np.arange(1, min(block, len(values)) + 1)
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        w = weights[:len(chunk)]
+        y = w * (previous + alpha * np.cumsum(chunk / w))
+        out[start:start + len(chunk)] = y
+        previous = y[-1]
+    return out
+
+def volume_increments(cumulative) -> np.ndarray:
+    """Volume por tick a partir do volume acumulado do Quote (quedas contam como zero)"""
+    cumulative = np.asarray(cumulative, dtype=float)
+    if not len(cumulative):
+        return cumulative
+    return np.maximum(np.diff(cumulative, prepend=cumulative[0]), 0.0)
+
+# Médias ##############################################################
+
+class SMA:
+    """Média simples dos últimos `period` valores"""
+    __slots__ = ('period', '_window', '_sum', 'value')
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period deve ser positivo")
+        self.period = period
+        self._window = deque()
+        self._sum = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        window = self._window
+        window.append(x)
+        self._sum += x
+        if len(window) > self.period:
+            self._sum -= window.popleft()
+        if len(window) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+def sma(values, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).mean(axis=1)
+    return out
+
+class EMA:
+    """Média exponencial com alpha = 2 / (period + 1), iniciada no primeiro valor"""
+    __slots__ = ('period', 'alpha', 'value')
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period deve ser positivo")
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+def ema(values, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return np.empty(0)
+    return _ema_filter(values, 2.0 / (period + 1), values[0])
+
+class VWAP:
+    """Preço médio ponderado pelo volume desde o início (ou desde o último reset)"""
+    __slots__ = ('_pv', '_volume', 'value')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._pv = 0.0
+        self._volume = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, price: float, volume: float) -> Optional[float]:
+        if volume > 0:
+            self._pv += price * volume
+            self._volume += volume
+            self.value = self._pv / self._volume
+        return self.value
+
+def vwap(prices, volumes) -> np.ndarray:
+    prices = np.asarray(prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    positive = volumes > 0
+    pv = np.cumsum(np.where(positive, prices * volumes, 0.0))
+    cumulative = np.cumsum(np.where(positive, volumes, 0.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(cumulative > 0, pv / cumulative, np.nan)
+
+# Volatilidade ########################################################
+
+class RollingStd:
+    """
+    Média e desvio padrão (populacional) dos últimos `period` valores.
+    Atualização de Welford para janela deslizante, sem somar quadrados
+    (que perderia precisão com preços altos e variação pequena).
+    """
+    __slots__ = ('period', '_window', '_mean', '_m2', 'mean', 'value')
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period deve ser positivo")
+        self.period = period
+        self._window = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.mean: Optional[float] = None
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        window = self._window
+        window.append(x)
+        if len(window) <= self.period:
+            delta = x - self._mean
+            self._mean += delta / len(window)
+            self._m2 += delta * (x - self._mean)
+        else:
+            old = window.popleft()
+            previous_mean = self._mean
+            self._mean += (x - old) / self.period
+            self._m2 += (x - old) * (x - self._mean + old - previous_mean)
+        if len(window) == self.period:
+            self.mean = self._mean
+            self.value = math.sqrt(max(self._m2, 0.0) / self.period)
+        return self.value
+
+def rolling_std(values, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).std(axis=1)
+    return out
+
+class Bollinger:
+    """Bandas de Bollinger: média simples ± k desvios padrão"""
+    __slots__ = ('k', '_std', 'value')
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.k = k
+        self._std = RollingStd(period)
+        self.value: Optional[Tuple[float, float, float]] = None  # (média, superior, inferior)
+
+    def update(self, x: float) -> Optional[Tuple[float, float, float]]:
+        std = self._std.update(x)
+        if std is not None:
+            mid = self._std.mean
+            self.value = (mid, mid + self.k * std, mid - self.k * std)
+        return self.value
+
+def bollinger(values, period: int = 20, k: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mid = sma(values, period)
+    std = rolling_std(values, period)
+    return mid, mid + k * std, mid - k * std
+
+class ATR:
+    """Average True Range de Wilder (um candle por update)"""
+    __slots__ = ('period', '_previous_close', '_seed', '_count', 'value')
+
+    def __init__(self, period: int = 14):
+        if period <= 0:
+            raise ValueError("period deve ser positivo")
+        self.period = period
+        self._previous_close: Optional[float] = None
+        self._seed = 0.0
+        self._count = 0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        previous = self._previous_close
+        if previous is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - previous), abs(low - previous))
+        self._previous_close = close
+        self._count += 1
+        if self._count < self.period:
+            self._seed += true_range
+        elif self._count == self.period:
+            self.value = (self._seed + true_range) / self.period
+        else:
+            self.value += (true_range - self.value) / self.period
+        return self.value
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    out = np.full(len(high), np.nan)
+    if len(high) < period:
+        return out
+    previous = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    true_range[0] = high[0] - low[0]
+    seed = true_range[:period].mean()
+    out[period - 1] = seed
+    out[period:] = _ema_filter(true_range[period:], 1.0 / period, seed)
+    return out
+
+# Momento ############################################################
+
+class RSI:
+    """Índice de força relativa de Wilder (primeiro valor após `period` variações)"""
+    __slots__ = ('period', '_previous', '_gain', '_loss', '_count', 'value')
+
+    def __init__(self, period: int = 14):
+        if period <= 0:
+            raise ValueError("period deve ser positivo")
+        self.period = period
+        self._previous: Optional[float] = None
+        self._gain = 0.0
+        self._loss = 0.0
+        self._count = 0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        previous = self._previous
+        self._previous = x
+        if previous is None:
+            return None
+        change = x - previous
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self._count += 1
+        period = self.period
+        if self._count <= period:
+            # Aquecimento: média simples das primeiras variações
+            self._gain += gain
+            self._loss += loss
+            if self._count < period:
+                return None
+            self._gain /= period
+            self._loss /= period
+        else:
+            self._gain += (gain - self._gain) / period
+            self._loss += (loss - self._loss) / period
+        self.value = _rsi_value(self._gain, self._loss)
+        return self.value
+
+def _rsi_value(gain: float, loss: float) -> float:
+    if loss == 0.0:
+        return 100.0 if gain > 0.0 else 50.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+def rsi(values, period: int = 14) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return out
+    change = np.diff(values)
+    gains = np.maximum(change, 0.0)
+    losses = np.maximum(-change, 0.0)
+    avg_gain = np.concatenate(([gains[:period].mean()],
+                               _ema_filter(gains[period:], 1.0 / period, gains[:period].mean())))
+    avg_loss = np.concatenate(([losses[:period].mean()],
+                               _ema_filter(losses[period:], 1.0 / period, losses[:period].mean())))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    result = np.where(avg_loss == 0.0, np.where(avg_gain > 0.0, 100.0, 50.0), result)
+    out[period:] = result
+    return out
@@ -5,11 +5,14 @@ from time import sleep
 from colorama import Fore, Style
 from auth import get_auth_token
 from signature import generate_body_signature
-from websocket_client import connect_websocket, send_message_to_websocket, WebSocketRequestMessage
+from websocket_client import initialize_market_data_websocket, sign_ticker_quote
 from get_ticker_quote import get_ticker_quote
+from send_order import send_market_order
+from strategies import MovingAverageCross
 
 TICKER = "WDOV25"
 IS_RUNNING = True
+SEND_ORDERS = False  # False: só mostra as ordens que a estratégia enviaria
 
 print(Fore.CYAN + f"Ticker carregado: {TICKER}" + Style.RESET_ALL)
 
@@ -22,7 +25,24 @@ body_signature = generate_body_signature({ 'teste': 'teste' })
 ticker_quote = get_ticker_quote(TICKER)
 print(Fore.GREEN + f"Último preço do {TICKER}: R$ {ticker_quote['lastPrice']:.4f}" + Style.RESET_ALL)
 
-# 3 - Conexão com websocket ##########################################
+# 3 - Estratégia ######################################################
+# A mesma classe roda no backtest (backtest.run_vectorized / run_events)
+def print_order(order):
+    print(Fore.YELLOW + f"Ordem (simulada): {order.Side} {order.Quantity} {order.Ticker} a mercado" + Style.RESET_ALL)
+
+strategy = MovingAverageCross(TICKER, fast=9, slow=21, quantity=1,
+                              send_market_order=send_market_order if SEND_ORDERS else print_order)
+
+def simple_trading_strategy(last_price):
+    try:
+        strategy.on_price(last_price)
+    except Exception as e:
+        # send_market_order levanta HTTPError, RateLimitExceeded, ValueError (assinatura/JSON) ou Exception;
+        # em todos os casos a posição só muda depois de um envio bem-sucedido
+        print(Fore.RED + f"Falha ao enviar ordem ({type(e).__name__}): {e} "
+              f"(posição mantida em {strategy.position})" + Style.RESET_ALL)
+
+# 4 - Conexão com websocket ##########################################
 def market_data_callback(message):
     print(Fore.BLUE + f"Mensagem recebida: {message}" + Style.RESET_ALL)  # Debug
     if message.get('target') == 'Quote':
@@ -0,0 +1,385 @@
+# order_book.py
+# Book de ofertas (nível 2) em memória por ticker, alimentado pelas mensagens do SubscribeBook
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple
+
+try:
+    from config import ORDER_BOOK_MAX_LEVELS
+except ImportError:
+    ORDER_BOOK_MAX_LEVELS = 50  # Níveis mantidos por lado (os piores são descartados)
+ORDER_BOOK_MAX_BOOKS = 500  # Máximo de books mantidos (LRU)
+ORDER_BOOK_SNAPSHOT_DEPTH = 10  # Níveis por lado no snapshot padrão
+
+SIDE_BID = 'bid'
+SIDE_ASK = 'ask'
+
+# Nomes de lado aceitos nas atualizações incrementais
+_SIDES = {
+    'bid': SIDE_BID, 'bids': SIDE_BID, 'buy': SIDE_BID, 'b': SIDE_BID, 'c': SIDE_BID, 'compra': SIDE_BID,
+    'ask': SIDE_ASK, 'asks': SIDE_ASK, 'sell': SIDE_ASK, 'a': SIDE_ASK, 's': SIDE_ASK, 'v': SIDE_ASK, 'venda': SIDE_ASK
+}
+
+class BookSide:
+    """
+    Um lado do book em dois arrays paralelos ordenados do melhor para o pior
+    preço: chaves (o preço, negado nas compras) e quantidades. O melhor
+    nível é sempre o índice 0, a busca de um preço é bisect (O(log n)) e a
+    quantidade de níveis é limitada a max_levels.
+    """
+    __slots__ = ('is_bid', 'max_levels', '_keys', '_sizes', 'truncated')
+
+    def __init__(self, is_bid: bool, max_levels: int = ORDER_BOOK_MAX_LEVELS):
+        self.is_bid = is_bid
+        self.max_levels = max_levels
+        self._keys = array('d')
+        self._sizes = array('d')
+        self.truncated = 0  # Níveis descartados por estarem além de max_levels
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        del self._keys[:]
+        del self._sizes[:]
+
+    def replace(self, levels: Iterable[Tuple[float, float]]):
+        """Substitui o lado inteiro (snapshot)"""
+        sign = -1.0 if self.is_bid else 1.0
+        pairs = sorted((sign * price, size) for price, size in levels if size > 0)
+        if len(pairs) > self.max_levels:
+            self.truncated += len(pairs) - self.max_levels
+            del pairs[self.max_levels:]
+        self._keys = array('d', [key for key, _ in pairs])
+        self._sizes = array('d', [size for _, size in pairs])
+
+    def set(self, price: float, size: float):
+        """Define a quantidade de um nível (size <= 0 remove o nível)"""
+        key = -price if self.is_bid else price
+        keys = self._keys
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if size > 0:
+                self._sizes[i] = size
+            else:
+                del keys[i]
+                del self._sizes[i]
+        elif size > 0:
+            if i >= self.max_levels:
+                self.truncated += 1
+                return
+            keys.insert(i, key)
+            self._sizes.insert(i, size)
+            if len(keys) > self.max_levels:
+                keys.pop()
+                self._sizes.pop()
+                self.truncated += 1
+
+    @property
+    def best_price(self) -> Optional[float]:
+        if not self._keys:
+            return None
+        return -self._keys[0] if self.is_bid else self._keys[0]
+
+    @property
+    def best_size(self) -> float:
+        return self._sizes[0] if self._sizes else 0.0
+
+    def size_at(self, price: float) -> float:
+        key = -price if self.is_bid else price
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._sizes[i]
+        return 0.0
+
+    def depth(self, n: int) -> float:
+        """Quantidade somada nos n melhores níveis"""
+        return sum(self._sizes[:n])
+
+    def levels(self, n: Optional[int] = None) -> List[Tuple[float, float]]:
+        """Os n melhores níveis como (preço, quantidade)"""
+        sign = -1.0 if self.is_bid else 1.0
+        keys = self._keys if n is None else self._keys[:n]
+        return [(sign * key, size) for key, size in zip(keys, self._sizes)]
+
+def _parse_levels(levels) -> List[Tuple[float, float]]:
+    """Aceita [{'price', 'quantity'}] ou [[preço, quantidade]]"""
+    parsed = []
+    for level in levels or ():
+        if isinstance(level, dict):
+            price = level.get('price')
+            size = level.get('quantity', level.get('size', 0))
+        else:
+            price, size = level[0], level[1]
+        if price is not None:
+            parsed.append((float(price), float(size or 0)))
+    return parsed
+
+class OrderBook:
+    """
+    Book de um ticker: snapshots substituem os dois lados, atualizações
+    incrementais alteram um nível (quantidade 0 remove). Melhor compra/venda,
+    spread e microprice são O(1); profundidade e desequilíbrio somam só os
+    n níveis pedidos. Não é thread-safe (use via OrderBookManager).
+    """
+    def __init__(self, ticker: str, max_levels: int = ORDER_BOOK_MAX_LEVELS):
+        self.ticker = ticker
+        self.bids = BookSide(True, max_levels)
+        self.asks = BookSide(False, max_levels)
+        self.sequence: Optional[int] = None
+        self.updated_at = 0.0
+        self.stale = False  # Sequência com lacuna: atualizações ignoradas até um novo snapshot
+
+        # Métricas
+        self.snapshots = 0
+        self.updates = 0
+        self.gaps = 0
+        self.ignored = 0  # Atualizações descartadas com o book desatualizado
+
+    def _side(self, side) -> Optional[BookSide]:
+        side = _SIDES.get(str(side).lower())
+        if side is None:
+            return None
+        return self.bids if side == SIDE_BID else self.asks
+
+    def _check_sequence(self, sequence) -> bool:
+        """Retorna False se a atualização não deve ser aplicada (lacuna agora ou antes)"""
+        if self.stale:
+            self.ignored += 1
+            return False
+        if sequence is None:
+            return True
+        sequence = int(sequence)
+        if self.sequence is not None and sequence != self.sequence + 1:
+            # Aplicar deltas sobre um estado com lacuna daria preços errados: espera o snapshot
+            self.gaps += 1
+            self.ignored += 1
+            self.stale = True
+            return False
+        self.sequence = sequence
+        return True
+
+    def apply_snapshot(self, bids, asks, sequence: Optional[int] = None):
+        """Substitui o book inteiro"""
+        self.bids.replace(_parse_levels(bids))
+        self.asks.replace(_parse_levels(asks))
+        self.sequence = None if sequence is None else int(sequence)
+        self.stale = False
+        self.snapshots += 1
+        self.updated_at = time.time()
+
+    def apply_update(self, side, price: float, quantity: float, sequence: Optional[int] = None) -> bool:
+        """Altera um nível; retorna False se o lado for desconhecido, sem preço ou se o book estiver desatualizado"""
+        book_side = self._side(side)
+        if book_side is None or price is None:
+            return False
+        if not self._check_sequence(sequence):
+            return False
+        book_side.set(float(price), float(quantity or 0))
+        self.updates += 1
+        self.updated_at = time.time()
+        return True
+
+    def apply_message(self, payload: dict):
+        """
+        Aplica um argumento de mensagem Book: com 'bids'/'asks' é snapshot;
+        com 'updates' (lista de {side, price, quantity}) ou com 'side' no
+        próprio payload é atualização incremental
+        """
+        updates = payload.get('updates')
+        if updates is not None:
+            if not self._check_sequence(payload.get('sequence')):
+                return
+            for update in updates:
+                book_side = self._side(update.get('side'))
+                if book_side is not None and update.get('price') is not None:
+                    book_side.set(float(update['price']), float(update.get('quantity') or 0))
+                    self.updates += 1
+            self.updated_at = time.time()
+        elif 'side' in payload:
+            self.apply_update(payload['side'], payload.get('price'), payload.get('quantity'), payload.get('sequence'))
+        else:
+            self.apply_snapshot(payload.get('bids'), payload.get('asks'), payload.get('sequence'))
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best_price
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best_price
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self.bids.best_price, self.asks.best_price
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    @property
+    def mid(self) -> Optional[float]:
+        bid, ask = self.bids.best_price, self.asks.best_price
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2
+
+    @property
+    def microprice(self) -> Optional[float]:
+        """Média dos melhores preços ponderada pela quantidade do lado oposto"""
+        bid, ask = self.bids.best_price, self.asks.best_price
+        if bid is None or ask is None:
+            return None
+        bid_size, ask_size = self.bids.best_size, self.asks.best_size
+        total = bid_size + ask_size
+        if total <= 0:
+            return (bid + ask) / 2
+        return (bid * ask_size + ask * bid_size) / total
+
+    def depth(self, side, n: int = 1) -> float:
+        book_side = self._side(side)
+        return book_side.depth(n) if book_side is not None else 0.0
+
+    def imbalance(self, n: int = 1) -> Optional[float]:
+        """(compra - venda) / (compra + venda) nos n melhores níveis, entre -1 e 1"""
+        bid_depth, ask_depth = self.bids.depth(n), self.asks.depth(n)
+        total = bid_depth + ask_depth
+        if total <= 0:
+            return None
+        return (bid_depth - ask_depth) / total
+
+    def snapshot(self, depth: int = ORDER_BOOK_SNAPSHOT_DEPTH) -> dict:
+        """Estado serializável do book (n níveis por lado e indicadores)"""
+        return {
+            'ticker': self.ticker,
+            'bids': [{'price': price, 'quantity': size} for price, size in self.bids.levels(depth)],
+            'asks': [{'price': price, 'quantity': size} for price, size in self.asks.levels(depth)],
+            'bestBid': self.best_bid,
+            'bestAsk': self.best_ask,
+            'spread': self.spread,
+            'microprice': self.microprice,
+            'imbalance': self.imbalance(depth),
+            'sequence': self.sequence,
+            'stale': self.stale,
+            'updatedAt': self.updated_at
+        }
+
+class OrderBookManager:
+    """
+    Books por ticker (LRU limitado a max_books) e callbacks de estratégia.
+
+    As mensagens chegam da thread (ou task) do feed e as leituras podem vir
+    de outra thread, então apply e snapshot usam um lock. Os listeners são
+    chamados como listener(ticker, book) dentro do lock, com o book
+    consistente, e devem ser rápidos. Os stale listeners, chamados como
+    listener(ticker) quando uma lacuna na sequência deixa o book
+    desatualizado, devem pedir um novo snapshot (reassinar o book).
+    """
+    def __init__(self, max_books: int = ORDER_BOOK_MAX_BOOKS, max_levels: int = ORDER_BOOK_MAX_LEVELS):
+        self.max_books = max_books
+        self.max_levels = max_levels
+        self._lock = threading.RLock()
+        self._books: "OrderedDict[str, OrderBook]" = OrderedDict()
+        self._listeners: List[Callable[[str, OrderBook], None]] = []
+        self._stale_listeners: List[Callable[[str], None]] = []
+
+        # Métricas
+        self.messages = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def add_listener(self, listener: Callable[[str, OrderBook], None]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, OrderBook], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_stale_listener(self, listener: Callable[[str], None]):
+        self._stale_listeners.append(listener)
+
+    def remove_stale_listener(self, listener: Callable[[str], None]):
+        if listener in self._stale_listeners:
+            self._stale_listeners.remove(listener)
+
+    def apply(self, ticker: str, payload: dict) -> Optional[OrderBook]:
+        """Aplica um snapshot ou atualização ao book do ticker"""
+        with self._lock:
+            book = self._books.get(ticker)
+            if book is None:
+                book = self._books[ticker] = OrderBook(ticker, self.max_levels)
+                while len(self._books) > self.max_books:
+                    self._books.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._books.move_to_end(ticker)
+            was_stale = book.stale
+            try:
+                book.apply_message(payload)
+            except (TypeError, ValueError, KeyError, IndexError) as e:
+                self.errors += 1
+                print(f"⚠️ Erro ao aplicar book de {ticker}: {e}")
+                return None
+            self.messages += 1
+            if book.stale and not was_stale:
+                print(f"⚠️ Lacuna na sequência do book de {ticker}: aguardando novo snapshot")
+                for listener in self._stale_listeners:
+                    try:
+                        listener(ticker)
+                    except Exception as e:
+                        print(f"❌ Erro no callback de book desatualizado de {ticker}: {e}")
+            for listener in self._listeners:
+                try:
+                    listener(ticker, book)
+                except Exception as e:
+                    print(f"❌ Erro no callback do book de {ticker}: {e}")
+            return book
+
+    def on_message(self, message: dict) -> Optional[OrderBook]:
+        """Callback para mensagens SignalR (target 'Book'); outras mensagens são ignoradas"""
+        if message.get('target') != 'Book' or not message.get('arguments'):
+            return None
+        payload = message['arguments'][0]
+        ticker = payload.get('ticker') if isinstance(payload, dict) else None
+        if not ticker:
+            return None
+        return self.apply(ticker, payload)
+
+    def get(self, ticker: str) -> Optional[OrderBook]:
+        """Book do ticker (o objeto vivo; só leia fora da thread do feed usando snapshot)"""
+        return self._books.get(ticker)
+
+    def snapshot(self, ticker: str, depth: int = ORDER_BOOK_SNAPSHOT_DEPTH) -> Optional[dict]:
+        with self._lock:
+            book = self._books.get(ticker)
+            return None if book is None else book.snapshot(depth)
+
+    def discard(self, ticker: str):
+        with self._lock:
+            self._books.pop(ticker, None)
+
+    def __len__(self):
+        return len(self._books)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'books': len(self._books),
+                'max_books': self.max_books,
+                'max_levels': self.max_levels,
+                'messages': self.messages,
+                'errors': self.errors,
+                'evictions': self.evictions,
+                'gaps': sum(book.gaps for book in self._books.values()),
+                'stale': sum(1 for book in self._books.values() if book.stale),
+                'ignored': sum(book.ignored for book in self._books.values()),
+                'truncated': sum(book.bids.truncated + book.asks.truncated for book in self._books.values())
+            }
+
+_order_book_manager = OrderBookManager()
+
+def get_order_book_manager() -> OrderBookManager:
+    """Retorna o gerenciador de books compartilhado"""
+    return _order_book_manager
@@ -0,0 +1,97 @@
+# quote_cache.py
+# Cache em memória do último valor de cada ticker (alimentado pelo WebSocket e pelas leituras REST)
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+QUOTE_CACHE_MAX_ENTRIES = 1000  # Máximo de tickers mantidos (LRU)
+QUOTE_CACHE_MAX_AGE_SECONDS = 1.0  # Idade máxima padrão para servir uma leitura do cache
+
+class QuoteCache:
+    """
+    Cache LRU do último Quote recebido por ticker.
+
+    Escritas vêm da thread do WebSocket e leituras do event loop, por isso
+    todas as operações usam um lock (seções críticas curtas).
+    """
+    def __init__(
+        self,
+        max_entries: int = QUOTE_CACHE_MAX_ENTRIES,
+        max_age: float = QUOTE_CACHE_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Métricas
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.writes = 0
+
+    def put(self, ticker: str, quote: dict, received_at: Optional[float] = None):
+        """Grava (ou substitui) o último valor de um ticker"""
+        received_at = self._clock() if received_at is None else received_at
+        with self._lock:
+            self._entries[ticker] = (received_at, quote)
+            self._entries.move_to_end(ticker)
+            self.writes += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, ticker: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """Retorna o último valor se tiver no máximo max_age segundos, senão None"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._clock() - entry[0] > max_age:
+                self.stale += 1
+                return None
+            self._entries.move_to_end(ticker)
+            self.hits += 1
+            return entry[1]
+
+    def get_age(self, ticker: str) -> Optional[float]:
+        """Idade (segundos) do último valor de um ticker, sem afetar as métricas"""
+        with self._lock:
+            entry = self._entries.get(ticker)
+            return None if entry is None else self._clock() - entry[0]
+
+    def invalidate(self, ticker: Optional[str] = None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'writes': self.writes,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
+
+_quote_cache = QuoteCache()
+
+def get_quote_cache() -> QuoteCache:
+    """Retorna o cache de cotações compartilhado"""
+    return _quote_cache
@@ -0,0 +1,254 @@
+# rate_limiter.py
+# Limitador de taxa (token bucket) para respeitar os limites documentados da API
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Limites documentados (clear_api_documentation.md - Rate Limits da API)
+REST_REQUESTS_PER_MINUTE = 100
+ORDERS_PER_MINUTE = 50
+MAX_WEBSOCKET_CONNECTIONS = 5
+
+# Rajada permitida em cada bucket. A reposição é (limite - rajada) por minuto,
+# então rajada + um minuto de reposição nunca passa do limite em qualquer janela de 60 s
+REST_BURST = 10
+ORDERS_BURST = 5
+
+# Prioridades (menor valor = atendido primeiro)
+PRIORITY_ORDER = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_QUOTE = 10
+
+# Tempo máximo padrão aguardando um token antes de desistir
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+class RateLimitExceeded(Exception):
+    """Levantada quando não há token disponível (rejeição rápida ou timeout)"""
+    pass
+
+class _Waiter:
+    __slots__ = ('priority', 'seq', 'wake')
+
+    def __init__(self, priority: int, seq: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.wake = wake
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class TokenBucket:
+    """
+    Token bucket com filas de prioridade.
+
+    - capacity: tamanho máximo da rajada
+    - refill_per_second: tokens repostos por segundo (0 = funciona como semáforo,
+      os tokens só voltam com release(); usado para conexões WebSocket)
+
+    Quem espera é atendido por ordem de prioridade e, na mesma prioridade, por ordem
+    de chegada. Funciona tanto com threads (acquire) quanto com asyncio (acquire_async).
+    """
+    def __init__(self, name: str, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._waiters = []
+        self._seq = itertools.count()
+
+        # Métricas
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.max_queue_depth = 0
+
+    # Controle interno (sempre com self._lock) ###################
+    def _refill(self):
+        now = self._clock()
+        if self.refill_per_second > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def _time_to_next_token(self) -> Optional[float]:
+        if self._tokens >= 1:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return None  # Só um release() libera um token
+        return (1 - self._tokens) / self.refill_per_second
+
+    def _try_take(self, waiter: Optional[_Waiter]) -> bool:
+        """Consome um token se houver e se for a vez deste waiter"""
+        self._refill()
+        if self._tokens < 1:
+            return False
+        if self._waiters and (waiter is None or self._waiters[0] is not waiter):
+            return False
+        if waiter is not None:
+            heapq.heappop(self._waiters)
+        self._tokens -= 1
+        self.acquired += 1
+        self._wake_head()
+        return True
+
+    def _wake_head(self):
+        if self._waiters:
+            self._waiters[0].wake()
+
+    def _enqueue(self, priority: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), wake)
+        heapq.heappush(self._waiters, waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        self._wake_head()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter):
+        """Remove da fila um waiter que desistiu (timeout ou cancelamento)"""
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self.rejected += 1
+                self._wake_head()
+
+    def _add_throttled_time(self, started: float):
+        with self._lock:
+            self.throttled_seconds += self._clock() - started
+
+    def _next_delay(self, waiter: _Waiter) -> Optional[float]:
+        """Quanto tempo este waiter deve dormir antes de tentar de novo (None = até ser acordado)"""
+        if self._waiters and self._waiters[0] is waiter:
+            return self._time_to_next_token()
+        return None
+
+    # API pública ################################################
+    def try_acquire(self) -> bool:
+        """Rejeição rápida: consome um token se houver, sem esperar"""
+        with self._lock:
+            if self._try_take(None):
+                return True
+            self.rejected += 1
+            return False
+
+    def acquire(self, priority: int = PRIORITY_DEFAULT, timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT, block: bool = True):
+        """
+        Consome um token, aguardando (bloqueante) se necessário.
+
+        Raises:
+            RateLimitExceeded: se block=False e não houver token, ou se o timeout expirar.
+        """
+        with self._lock:
+            if self._try_take(None):
+                return
+            if not block:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Limite de taxa '{self.name}' atingido")
+            event = threading.Event()
+            waiter = self._enqueue(priority, event.set)
+            self.throttled += 1
+
+        started = self._clock()
+        deadline = None if timeout is None else started + timeout
+        try:
+            while True:
+                with self._lock:
+                    if self._try_take(waiter):
+                        return
+                    delay = self._next_delay(waiter)
+                    event.clear()
+
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    raise RateLimitExceeded(f"Timeout aguardando limite de taxa '{self.name}'")
+                if delay is None or (remaining is not None and remaining < delay):
+                    delay = remaining
+                event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        finally:
+            self._add_throttled_time(started)
+
+    async def acquire_async(self, priority: int = PRIORITY_DEFAULT, timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT, block: bool = True):
+        """Versão asyncio de acquire (não bloqueia o event loop)"""
+        with self._lock:
+            if self._try_take(None):
+                return
+            if not block:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Limite de taxa '{self.name}' atingido")
+            loop = asyncio.get_running_loop()
+            event = asyncio.Event()
+            waiter = self._enqueue(priority, lambda: loop.call_soon_threadsafe(event.set))
+            self.throttled += 1
+
+        started = self._clock()
+        deadline = None if timeout is None else started + timeout
+        try:
+            while True:
+                with self._lock:
+                    if self._try_take(waiter):
+                        return
+                    delay = self._next_delay(waiter)
+                    event.clear()
+
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    raise RateLimitExceeded(f"Timeout aguardando limite de taxa '{self.name}'")
+                if delay is None or (remaining is not None and remaining < delay):
+                    delay = remaining
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        finally:
+            self._add_throttled_time(started)
+
+    def release(self):
+        """Devolve um token (usado pelos buckets de conexões)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + 1)
+            self._wake_head()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            self._refill()
+            return {
+                'available': round(self._tokens, 3),
+                'capacity': self.capacity,
+                'queue_depth': len(self._waiters),
+                'max_queue_depth': self.max_queue_depth,
+                'acquired': self.acquired,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'throttled_seconds': round(self.throttled_seconds, 6)
+            }
+
+# Buckets compartilhados #########################################
+REST_BUCKET = 'rest'
+ORDERS_BUCKET = 'orders'
+WEBSOCKET_BUCKET = 'websocket'
+
+_buckets: Dict[str, TokenBucket] = {
+    REST_BUCKET: TokenBucket(REST_BUCKET, REST_BURST, (REST_REQUESTS_PER_MINUTE - REST_BURST) / 60.0),
+    ORDERS_BUCKET: TokenBucket(ORDERS_BUCKET, ORDERS_BURST, (ORDERS_PER_MINUTE - ORDERS_BURST) / 60.0),
+    WEBSOCKET_BUCKET: TokenBucket(WEBSOCKET_BUCKET, MAX_WEBSOCKET_CONNECTIONS, 0)
+}
+
+def get_bucket(name: str) -> TokenBucket:
+    """Retorna o bucket compartilhado ('rest', 'orders' ou 'websocket')"""
+    return _buckets[name]
+
+def get_rate_limit_stats() -> dict:
+    """Retorna as métricas de todos os buckets"""
+    return {name: bucket.get_stats() for name, bucket in _buckets.items()}
@@ -0,0 +1,172 @@
+# replay.py
+# Reprodução de gravações do feed (tick_recorder) chamando os mesmos callbacks do WebSocket
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Iterator, Optional
+from signalr_framing import RecordDecoder
+from tick_recorder import KIND_RAW, KIND_MESSAGE, read_recordings
+
+# Diretório de gravações a reproduzir no web_app (no lugar do WebSocket da ClearAPI)
+REPLAY_DIR = os.environ.get('CLEARAPI_REPLAY_DIR')
+REPLAY_SPEED = float(os.environ.get('CLEARAPI_REPLAY_SPEED', '1'))  # 1 = tempo real, 0 = o mais rápido possível
+REPLAY_LOOP = os.environ.get('CLEARAPI_REPLAY_LOOP', '0') == '1'
+REPLAY_LOOP_GAP_SECONDS = 1.0  # Intervalo entre o fim de uma volta e o início da seguinte
+REPLAY_YIELD_EVERY = 100  # Mensagens entre cessões ao event loop quando speed = 0
+
+class FeedReplayer:
+    """
+    Lê gravações do feed e entrega cada registro a on_message_callback, na
+    ordem gravada. O ritmo segue os timestamps gravados divididos por speed
+    (speed = 0: sem espera). Frames brutos passam pelo mesmo RecordDecoder
+    do WebSocket, então o callback recebe os mesmos dicts que receberia ao
+    vivo. clock() retorna o horário gravado da mensagem atual, para quem
+    precisa de um relógio determinístico (candles, histórico de ticks).
+    Com loop=True a gravação é repetida, deslocando os horários a cada volta.
+    """
+    def __init__(
+        self,
+        directory: str,
+        speed: float = REPLAY_SPEED,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        loop: bool = False
+    ):
+        self.directory = directory
+        self.speed = speed
+        self.start = start
+        self.end = end
+        self.loop = loop
+        self._stop = threading.Event()
+        self._clock = start or 0.0
+        self.finished = False
+
+        # Métricas
+        self.records = 0
+        self.messages = 0
+        self.laps = 0
+        self.max_lag = 0.0  # Maior atraso em relação ao horário programado (segundos)
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+
+    def clock(self) -> float:
+        """Horário (gravado) da mensagem sendo entregue"""
+        return self._clock
+
+    def stop(self):
+        self._stop.set()
+
+    def _records(self) -> Iterator[tuple]:
+        """(horário com deslocamento da volta, registro) de todas as voltas"""
+        offset = 0.0
+        while not self._stop.is_set():
+            first = last = None
+            for record in read_recordings(self.directory, self.start, self.end):
+                ts = record['ts']
+                if first is None:
+                    first = ts
+                last = ts
+                yield ts + offset, record
+                if self._stop.is_set():
+                    return
+            self.laps += 1
+            if not self.loop or first is None:
+                return
+            offset += last - first + REPLAY_LOOP_GAP_SECONDS
+
+    def _schedule(self, ts: float) -> float:
+        """Segundos a esperar até o horário programado de ts (0 se já passou)"""
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+        self._clock = ts
+        if self.speed <= 0:
+            return 0.0
+        target = self.started_at + (ts - self.first_ts) / self.speed
+        delay = target - time.monotonic()
+        if delay < 0 and -delay > self.max_lag:
+            self.max_lag = -delay
+        return delay
+
+    def _deliver(self, record: dict, decoder: RecordDecoder, on_message_callback: Callable):
+        self.records += 1
+        if KIND_RAW in record:
+            for message in decoder.feed(record[KIND_RAW]):
+                self.messages += 1
+                on_message_callback(message)
+        elif KIND_MESSAGE in record:
+            self.messages += 1
+            on_message_callback(record[KIND_MESSAGE])
+
+    def run(self, on_message_callback: Callable, on_open_callback: Optional[Callable] = None):
+        """Reproduz na thread atual (bloqueia até o fim da gravação ou stop())"""
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        decoder = RecordDecoder()
+        if on_open_callback is not None:
+            on_open_callback()
+        for ts, record in self._records():
+            delay = self._schedule(ts)
+            if delay > 0 and self._stop.wait(delay):
+                break
+            self._deliver(record, decoder, on_message_callback)
+        self.elapsed = time.monotonic() - self.started_at
+        self.finished = True
+
+    async def run_async(self, on_message_callback: Callable, on_open_callback: Optional[Callable] = None):
+        """Reproduz no event loop (os callbacks rodam no loop, como no AsyncClearWebSocket)"""
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        decoder = RecordDecoder()
+        if on_open_callback is not None:
+            on_open_callback()
+        pending_yield = 0
+        for ts, record in self._records():
+            delay = self._schedule(ts)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                pending_yield += 1
+                if pending_yield >= REPLAY_YIELD_EVERY:
+                    pending_yield = 0
+                    await asyncio.sleep(0)  # Deixa a ponte e os clientes consumirem
+            self._deliver(record, decoder, on_message_callback)
+        self.elapsed = time.monotonic() - self.started_at
+        self.finished = True
+
+    def get_stats(self) -> dict:
+        recorded_span = (self.last_ts - self.first_ts) if self.first_ts is not None else 0.0
+        elapsed = self.elapsed if self.finished else (time.monotonic() - self.started_at if self.started_at else 0.0)
+        return {
+            'directory': self.directory,
+            'speed': self.speed,
+            'records': self.records,
+            'messages': self.messages,
+            'laps': self.laps,
+            'finished': self.finished,
+            'clock': self._clock,
+            'elapsed_seconds': elapsed,
+            'effective_speed': recorded_span / elapsed if elapsed > 0 else 0.0,
+            'messages_per_sec': self.messages / elapsed if elapsed > 0 else 0.0,
+            'max_lag_ms': self.max_lag * 1000
+        }
+
+def initialize_replay_websocket(
+    on_message_callback,
+    on_open_callback,
+    directory: str = REPLAY_DIR,
+    speed: float = REPLAY_SPEED,
+    loop: bool = REPLAY_LOOP
+) -> FeedReplayer:
+    """Equivalente ao initialize_market_data_websocket, lendo uma gravação em uma thread"""
+    if not directory:
+        raise ValueError("Informe o diretório da gravação (ou CLEARAPI_REPLAY_DIR)")
+    replayer = FeedReplayer(directory, speed=speed, loop=loop)
+    thread = threading.Thread(target=replayer.run, args=(on_message_callback, on_open_callback),
+                              name='feed-replay', daemon=True)
+    thread.start()
+    print(f"⏯️ Reproduzindo {directory} ({'máxima velocidade' if speed <= 0 else f'{speed:g}x'})")
+    return replayer
@@ -0,0 +1,100 @@
+# rest_client.py
+import os
+import threading
+from typing import Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config import API_BASE_URL, SUBSCRIPTION_KEY, USER_AGENT
+from rate_limiter import PRIORITY_DEFAULT, REST_BUCKET, get_bucket
+
+# Outro servidor (ex.: mock_server.py) sem alterar o config.py
+API_BASE_URL = os.environ.get('CLEARAPI_API_BASE_URL', API_BASE_URL)
+
+# Configurações do pool de conexões e timeouts
+REST_POOL_CONNECTIONS = 4  # Quantidade de hosts distintos mantidos no pool
+REST_POOL_MAXSIZE = 10  # Conexões keep-alive por host
+REST_CONNECT_TIMEOUT = 3.05  # Segundos para estabelecer a conexão
+REST_READ_TIMEOUT = 10  # Segundos aguardando a resposta
+
+class RestClient:
+    """
+    Cliente REST compartilhado, com pool de conexões persistentes (keep-alive),
+    timeouts por requisição e headers padrão da API já montados.
+    """
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        pool_connections: int = REST_POOL_CONNECTIONS,
+        pool_maxsize: int = REST_POOL_MAXSIZE,
+        timeout: Tuple[float, float] = (REST_CONNECT_TIMEOUT, REST_READ_TIMEOUT),
+        rate_limited: bool = True
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.rate_limited = rate_limited  # False apenas para stubs locais/benchmarks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Ocp-Apim-Subscription-Key': SUBSCRIPTION_KEY,
+            'User-Agent': USER_AGENT
+        })
+
+    def build_url(self, path: str) -> str:
+        """Monta a URL completa (caminhos relativos usam a base_url)"""
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        timeout=None,
+        priority: int = PRIORITY_DEFAULT,
+        block: bool = True,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Executa a requisição respeitando o limite de requisições REST.
+        Com block=False, levanta RateLimitExceeded imediatamente se o limite foi atingido.
+        """
+        if self.rate_limited:
+            get_bucket(REST_BUCKET).acquire(priority=priority, block=block)
+        return self.session.request(
+            method,
+            self.build_url(path),
+            timeout=timeout if timeout is not None else self.timeout,
+            **kwargs
+        )
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+_rest_client: Optional[RestClient] = None
+_rest_client_lock = threading.Lock()
+
+def get_rest_client() -> RestClient:
+    """Retorna o cliente REST compartilhado (criado na primeira chamada)"""
+    global _rest_client
+    if _rest_client is None:
+        with _rest_client_lock:
+            if _rest_client is None:
+                _rest_client = RestClient()
+    return _rest_client
+
+def configure_rest_client(**kwargs) -> RestClient:
+    """Substitui o cliente compartilhado (ex.: para alterar pool, timeouts ou base_url)"""
+    global _rest_client
+    with _rest_client_lock:
+        if _rest_client is not None:
+            _rest_client.close()
+        _rest_client = RestClient(**kwargs)
+    return _rest_client
@@ -4,6 +4,8 @@ import json
 from typing import Dict, Any, Literal
 from signature import generate_body_signature # Usar exemplo 'Gerar BODY_SIGNATURE'
 from auth import get_auth_token # Usar exemplo 'Obter um token de acesso'
+from rate_limiter import ORDERS_BUCKET, PRIORITY_ORDER, RateLimitExceeded, get_bucket
+from rest_client import get_rest_client
 
 # Tipos para os parâmetros da ordem
 ModuleType = Literal['Default', 'DayTrade', 'SwingTrade']  # atualmente somente 'DayTrade' está disponível
@@ -96,26 +98,27 @@ def send_limited_order(
     
     Raises:
         requests.HTTPError: Erro caso a requisição falhe ou a API retorne um erro.
+        RateLimitExceeded: Limite de ordens ou de requisições atingido.
     """
-    url = 'https://variableincome-openapi-simulator.xpi.com.br/api/v1/orders/send/limited'
+    path = '/v1/orders/send/limited'
+    get_bucket(ORDERS_BUCKET).acquire(priority=PRIORITY_ORDER)
     body = json.dumps(order_request.to_dict())
     body_signature = generate_body_signature(body)
     
     headers = {
         'Content-Type': 'application/json',
         'Authorization': f'Bearer {get_auth_token()}',
-        'User-Agent': 'Smart-Trader-API Devs-Clear',
         'BODY_SIGNATURE': body_signature
     }
 
     try:
-        response = requests.post(url, headers=headers, data=body)
+        response = get_rest_client().post(path, headers=headers, data=body, priority=PRIORITY_ORDER)
         
         if not response.ok:
             if response.status_code == 500:
                 error_data = response.json()
                 error_messages = '; '.join([
-                    f'{err['code']} - {err['message']}'
+                    f"{err['code']} - {err['message']}"
                     for err in error_data.get('errorResponse', [])
                 ])
                 raise requests.HTTPError(f'Erro interno: {error_messages}')
@@ -131,6 +134,8 @@ def send_limited_order(
         raise requests.HTTPError(f'Erro ao enviar a ordem limitada: {str(e)}')
     except json.JSONDecodeError as e:
         raise ValueError(f'Erro ao decodificar resposta JSON: {str(e)}')
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         raise Exception(f'Erro inesperado: {str(e)}')
 
@@ -148,26 +153,27 @@ def send_market_order(
     
     Raises:
         requests.HTTPError: Erro caso a requisição falhe ou a API retorne um erro.
+        RateLimitExceeded: Limite de ordens ou de requisições atingido.
     """
-    url = 'https://variableincome-openapi-simulator.xpi.com.br/api/v1/orders/send/market'
+    path = '/v1/orders/send/market'
+    get_bucket(ORDERS_BUCKET).acquire(priority=PRIORITY_ORDER)
     body = json.dumps(order_request.to_dict())
     body_signature = generate_body_signature(body)
     
     headers = {
         'Content-Type': 'application/json',
         'Authorization': f'Bearer {get_auth_token()}',
-        'User-Agent': 'Smart-Trader-API Devs-Clear',
         'BODY_SIGNATURE': body_signature
     }
 
     try:
-        response = requests.post(url, headers=headers, data=body)
+        response = get_rest_client().post(path, headers=headers, data=body, priority=PRIORITY_ORDER)
         
         if not response.ok:
             if response.status_code == 500:
                 error_data = response.json()
                 error_messages = '; '.join([
-                    f'{err['code']} - {err['message']}'
+                    f"{err['code']} - {err['message']}"
                     for err in error_data.get('errorResponse', [])
                 ])
                 raise requests.HTTPError(f'Erro interno: {error_messages}')
@@ -183,5 +189,7 @@ def send_market_order(
         raise requests.HTTPError(f'Erro ao enviar a ordem a mercado: {str(e)}')
     except json.JSONDecodeError as e:
         raise ValueError(f'Erro ao decodificar resposta JSON: {str(e)}')
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         raise Exception(f'Erro inesperado: {str(e)}')
\ No newline at end of file
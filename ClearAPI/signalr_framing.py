@@ -0,0 +1,149 @@
+# signalr_framing.py
+# Decodificador incremental dos registros SignalR (JSON separado por \u001e)
+import json
+import re
+from typing import Callable, Iterable, List, Optional
+import codec
+
+RECORD_SEPARATOR = '\u001e'
+
+# Tipos de mensagem SignalR
+MESSAGE_INVOCATION = 1
+MESSAGE_STREAM_ITEM = 2
+MESSAGE_COMPLETION = 3
+MESSAGE_PING = 6
+MESSAGE_CLOSE = 7
+
+DEFAULT_SKIP_TYPES = (MESSAGE_COMPLETION, MESSAGE_PING)  # Descartados sem decodificar
+
+_WHITESPACE = ' \t\n\r'
+_std_decoder = json.JSONDecoder()
+_TYPE_PATTERN = re.compile(r'"type"\s*:\s*(\d+)')
+_TARGET_PATTERN = re.compile(r'"target"\s*:\s*"([^"]*)"')
+
+class RecordDecoder:
+    """
+    Recebe frames do WebSocket e devolve os registros JSON completos.
+
+    Registros podem chegar divididos entre frames: o trecho incompleto fica
+    guardado e é completado no próximo feed(). Com o codec json padrão cada
+    registro é decodificado direto do frame (raw_decode com índice, sem
+    fatiar a string). Registros cujo type ou target esteja nas listas de
+    descarte são pulados lendo só o cabeçalho, sem decodificar o JSON.
+    """
+    def __init__(
+        self,
+        skip_types: Iterable[int] = DEFAULT_SKIP_TYPES,
+        skip_targets: Iterable[str] = (),
+        loads: Optional[Callable] = None
+    ):
+        self.skip_types = frozenset(skip_types)
+        self.skip_targets = frozenset(skip_targets)
+        self._loads = loads
+        self._tail = ''
+
+        # Métricas
+        self.frames = 0
+        self.records = 0
+        self.skipped = 0
+        self.decode_errors = 0
+        self.split_records = 0
+
+    def reset(self):
+        """Descarta o trecho pendente (usar ao reconectar)"""
+        self._tail = ''
+
+    @property
+    def pending(self) -> int:
+        """Caracteres aguardando o fim do registro"""
+        return len(self._tail)
+
+    def _should_skip(self, data: str, start: int, end: int) -> bool:
+        # Caminho rápido para a serialização compacta do servidor: {"type":N,...
+        if start + 9 < end and data.startswith('{"type":', start, end) and data[start + 9] in ',}':
+            message_type = data[start + 8]
+            if message_type.isdigit() and int(message_type) in self.skip_types:
+                return True
+            if not self.skip_targets:
+                return False
+
+        # Só o trecho antes de "arguments" é cabeçalho; o resto pode conter as mesmas chaves
+        arguments = data.find('"arguments"', start, end)
+        header_end = end if arguments < 0 else arguments
+        if self.skip_types:
+            match = _TYPE_PATTERN.search(data, start, header_end)
+            if match is not None and int(match.group(1)) in self.skip_types:
+                return True
+        if self.skip_targets:
+            match = _TARGET_PATTERN.search(data, start, header_end)
+            if match is not None and match.group(1) in self.skip_targets:
+                return True
+        return False
+
+    def feed(self, data: str) -> List[dict]:
+        """Processa um frame e retorna os registros completos decodificados"""
+        self.frames += 1
+        if isinstance(data, bytes):
+            data = data.decode()
+        records = []
+        start = 0
+        if self._tail:
+            end = data.find(RECORD_SEPARATOR)
+            if end < 0:
+                self._tail += data  # Registro ainda incompleto
+                return records
+            # Só o registro dividido é copiado; o resto é decodificado direto do frame
+            self._scan(self._tail + data[:end + 1], 0, records)
+            self._tail = ''
+            self.split_records += 1
+            start = end + 1
+        self._scan(data, start, records)
+        return records
+
+    def _scan(self, data: str, start: int, records: List[dict]):
+        loads = self._loads
+        raw_decode = _std_decoder.raw_decode if loads is None and codec.get_codec() == 'json' else None
+        loads = loads or codec.loads
+        skipping = bool(self.skip_types or self.skip_targets)
+        find = data.find
+        size = len(data)
+        while start < size:
+            end = find(RECORD_SEPARATOR, start)
+            if end < 0:
+                if data[start:].strip():
+                    self._tail = data[start:]
+                break
+            # Ignora espaços iniciais e registros vazios
+            while start < end and data[start] in _WHITESPACE:
+                start += 1
+            if start == end:
+                start = end + 1
+                continue
+
+            self.records += 1
+            if skipping and self._should_skip(data, start, end):
+                self.skipped += 1
+            else:
+                try:
+                    if raw_decode is not None:
+                        # Decodifica direto do frame, sem fatiar o registro
+                        obj, stop = raw_decode(data, start)
+                        if stop != end and data[stop:end].strip():
+                            raise ValueError(f"Dados extras após o registro JSON (posição {stop})")
+                    else:
+                        obj = loads(data[start:end])
+                    records.append(obj)
+                except codec.DecodeError as e:
+                    self.decode_errors += 1
+                    print(f"Erro ao decodificar mensagem JSON: {e}")
+            start = end + 1
+
+    def get_stats(self) -> dict:
+        return {
+            'frames': self.frames,
+            'records': self.records,
+            'skipped': self.skipped,
+            'decode_errors': self.decode_errors,
+            'split_records': self.split_records,
+            'pending_chars': len(self._tail)
+        }
@@ -1,28 +1,92 @@
 # signature.py
 import json
 import base64
+import os
+import threading
+import time
+from typing import Iterable, List, Optional
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from config import PRIVATE_RSA_KEY_PATH
 
-def generate_body_signature(body: str | dict) -> str:
-    try:
-        # Converte o corpo para string, se necessário
-        body_string = body if isinstance(body, str) else json.dumps(body)
+# Intervalo mínimo entre verificações do mtime do arquivo da chave
+KEY_MTIME_CHECK_INTERVAL = 1.0
+
+class BodySigner:
+    """
+    Assina corpos de requisição com a chave privada RSA.
+
+    A chave é carregada uma única vez e mantida em memória; o arquivo só é
+    lido novamente quando seu mtime muda.
+    """
+    def __init__(self, key_path: str = PRIVATE_RSA_KEY_PATH, check_interval: float = KEY_MTIME_CHECK_INTERVAL):
+        self.key_path = key_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._private_key = None
+        self._key_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.loads = 0
 
-        # Carrega a chave privada RSA
-        with open(PRIVATE_RSA_KEY_PATH, 'rb') as key_file:
-                rsa_private_key = load_pem_private_key(key_file.read(), password=None)
+    def _load_key(self):
+        mtime = os.stat(self.key_path).st_mtime
+        with open(self.key_path, 'rb') as key_file:
+            self._private_key = load_pem_private_key(key_file.read(), password=None)
+        self._key_mtime = mtime
+        self.loads += 1
 
-        # Gera a assinatura
+    def _get_key(self):
+        now = time.monotonic()
+        if self._private_key is not None and now < self._next_check:
+            return self._private_key
+
+        with self._lock:
+            if self._private_key is None or os.stat(self.key_path).st_mtime != self._key_mtime:
+                self._load_key()
+            self._next_check = now + self.check_interval
+            return self._private_key
+
+    @staticmethod
+    def _sign_with(rsa_private_key, body: str | dict) -> str:
+        # Converte o corpo para string, se necessário
+        body_string = body if isinstance(body, str) else json.dumps(body)
         signature = rsa_private_key.sign(
             body_string.encode(),
             padding.PKCS1v15(),
             hashes.SHA256()
         )
-
-        # Retorna a assinatura em base64
         return base64.b64encode(signature).decode()
+
+    def sign(self, body: str | dict) -> str:
+        """Gera a assinatura base64 de um corpo"""
+        return self._sign_with(self._get_key(), body)
+
+    def sign_batch(self, bodies: Iterable[str | dict]) -> List[str]:
+        """Gera as assinaturas de vários corpos com uma única consulta à chave"""
+        rsa_private_key = self._get_key()
+        return [self._sign_with(rsa_private_key, body) for body in bodies]
+
+_default_signer = None
+_default_signer_lock = threading.Lock()
+
+def get_signer() -> BodySigner:
+    """Retorna o assinador compartilhado (criado na primeira chamada)"""
+    global _default_signer
+    if _default_signer is None:
+        with _default_signer_lock:
+            if _default_signer is None:
+                _default_signer = BodySigner()
+    return _default_signer
+
+def generate_body_signature(body: str | dict) -> str:
+    try:
+        return get_signer().sign(body)
+    except Exception as e:
+        raise ValueError(f"Erro ao gerar a assinatura: {str(e)}")
+
+def generate_body_signatures(bodies: Iterable[str | dict]) -> List[str]:
+    try:
+        return get_signer().sign_batch(bodies)
     except Exception as e:
-        raise ValueError(f"Erro ao gerar a assinatura: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Erro ao gerar as assinaturas: {str(e)}")
@@ -0,0 +1,89 @@
+# strategies.py
+# Estratégias de exemplo: a mesma regra em versão de callback (Quote a Quote) e vetorizada (backtest)
+from typing import Callable, Optional
+
+import numpy as np
+
+from indicators import EMA, ema
+from send_order import SendMarketOrderRequest
+
+STRATEGY_TICKER = "WDOV25"
+STRATEGY_MODULE = 'DayTrade'
+
+class MovingAverageCross:
+    """
+    Comprado quando a EMA rápida está acima da lenta, vendido quando está
+    abaixo (zerado enquanto estão a menos de `band` pontos uma da outra).
+
+    on_message recebe as mensagens do market data (como o
+    market_data_callback) e envia ordens a mercado pela função
+    send_market_order recebida (a de send_order ao vivo, a do
+    SimulatedBroker no backtest). target_positions calcula a posição
+    desejada em todos os ticks de uma vez; as duas versões geram as mesmas
+    ordens, então o backtest vetorizado vale para a versão ao vivo.
+    """
+    def __init__(
+        self,
+        ticker: str = STRATEGY_TICKER,
+        fast: int = 9,
+        slow: int = 21,
+        quantity: int = 1,
+        band: float = 0.0,
+        module: str = STRATEGY_MODULE,
+        send_market_order: Optional[Callable] = None
+    ):
+        if fast >= slow:
+            raise ValueError("fast deve ser menor que slow")
+        self.ticker = ticker
+        self.fast = fast
+        self.slow = slow
+        self.quantity = quantity
+        self.band = band
+        self.module = module
+        self.send_market_order = send_market_order
+        self.position = 0  # Posição pedida (ordens enviadas)
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+
+    def _target(self, gap: float, reference: float) -> int:
+        threshold = self.band + 1e-9 * abs(reference)  # Ignora diferenças de arredondamento
+        if gap > threshold:
+            return self.quantity
+        if gap < -threshold:
+            return -self.quantity
+        return 0
+
+    def on_price(self, last_price: float) -> Optional[SendMarketOrderRequest]:
+        """Atualiza as médias e, se a posição desejada mudou, envia a ordem da diferença"""
+        slow = self._slow.update(last_price)
+        target = self._target(self._fast.update(last_price) - slow, slow)
+        difference = target - self.position
+        if not difference:
+            return None
+        order = SendMarketOrderRequest(self.module, self.ticker, 'Buy' if difference > 0 else 'Sell',
+                                       abs(difference), 'Day')
+        if self.send_market_order is not None:
+            self.send_market_order(order)  # Se falhar, a posição fica como estava e o próximo preço tenta de novo
+        self.position = target
+        return order
+
+    def on_message(self, message: dict):
+        if message.get('target') != 'Quote' or not message.get('arguments'):
+            return
+        quote = message['arguments'][0]
+        last_price = quote.get('lastPrice')
+        if last_price is not None and quote.get('ticker', self.ticker) == self.ticker:
+            self.on_price(last_price)
+
+    def bind(self, broker) -> Callable[[dict], None]:
+        """Callback para backtest.run_events, enviando as ordens ao broker simulado"""
+        self.send_market_order = broker.send_market_order
+        return self.on_message
+
+    def target_positions(self, data: np.ndarray) -> np.ndarray:
+        """Posição desejada após cada tick (ou candle), de uma vez"""
+        prices = data['last'] if 'last' in data.dtype.names else data['close']
+        slow = ema(prices, self.slow)
+        gap = ema(prices, self.fast) - slow
+        threshold = self.band + 1e-9 * np.abs(slow)
+        return np.where(gap > threshold, self.quantity, np.where(gap < -threshold, -self.quantity, 0))
@@ -0,0 +1,290 @@
+# tick_recorder.py
+# Gravação das mensagens do feed em segmentos comprimidos (gzip), só de acréscimo, com índice de tempo
+import gzip
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+import codec
+
+# Diretório das gravações; None desliga a gravação no web_app
+# Pode ser definido em config.py (TICK_RECORDER_DIR) ou pela variável de ambiente CLEARAPI_RECORD_DIR
+try:
+    from config import TICK_RECORDER_DIR
+except ImportError:
+    TICK_RECORDER_DIR = None
+TICK_RECORDER_DIR = os.environ.get('CLEARAPI_RECORD_DIR', TICK_RECORDER_DIR)
+
+TICK_RECORDER_SEGMENT_MAX_BYTES = 64 * 1024 * 1024  # Tamanho (comprimido) que abre um novo segmento
+TICK_RECORDER_FLUSH_SECONDS = 0.5  # Intervalo entre gravações em disco
+TICK_RECORDER_QUEUE_MAX = 200000  # Mensagens aguardando gravação (acima disso são descartadas)
+TICK_RECORDER_MEMBER_MAX = 2000  # Mensagens por membro gzip
+TICK_RECORDER_INDEX_SECONDS = 1.0  # Intervalo mínimo entre entradas do índice
+TICK_RECORDER_UTC_OFFSET_SECONDS = -3 * 3600  # O dia do pregão vira à meia-noite de Brasília
+TICK_RECORDER_COMPRESS_LEVEL = 6
+
+SEGMENT_PREFIX = 'feed'
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx'
+_INDEX_ENTRY = struct.Struct('<dQ')  # (timestamp do primeiro registro do membro, offset no arquivo)
+_SEGMENT_PATTERN = re.compile(re.escape(SEGMENT_PREFIX) + r'-(\d{8})-(\d{4})' + re.escape(SEGMENT_SUFFIX) + '$')
+
+KIND_RAW = 'raw'  # Frame como chegou do WebSocket
+KIND_MESSAGE = 'msg'  # Registro já decodificado
+
+def trading_day(ts: float, utc_offset: int = TICK_RECORDER_UTC_OFFSET_SECONDS) -> str:
+    return time.strftime('%Y%m%d', time.gmtime(ts + utc_offset))
+
+class TickRecorder:
+    """
+    Grava mensagens do feed em arquivos feed-AAAAMMDD-NNNN.jsonl.gz.
+
+    record() só coloca a mensagem em uma fila (nunca espera o disco); uma
+    thread grava a fila a cada flush_interval, em membros gzip independentes
+    (uma linha JSON por mensagem: {"ts", "raw"} ou {"ts", "msg"}). O arquivo
+    .idx ao lado guarda, no máximo a cada index_interval segundos, o
+    timestamp e o offset do início de um membro, para o leitor pular direto
+    a um horário. Um novo segmento é aberto ao passar de segment_max_bytes
+    ou quando muda o dia do pregão.
+    """
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = TICK_RECORDER_SEGMENT_MAX_BYTES,
+        flush_interval: float = TICK_RECORDER_FLUSH_SECONDS,
+        max_queue: int = TICK_RECORDER_QUEUE_MAX,
+        index_interval: float = TICK_RECORDER_INDEX_SECONDS,
+        compress_level: int = TICK_RECORDER_COMPRESS_LEVEL,
+        utc_offset: int = TICK_RECORDER_UTC_OFFSET_SECONDS
+    ):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.index_interval = index_interval
+        self.compress_level = compress_level
+        self.utc_offset = utc_offset
+        self._queue: deque = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._index = None
+        self._day: Optional[str] = None
+        self._last_index_ts = float('-inf')
+        self.segment_path: Optional[str] = None
+
+        # Métricas
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.bytes_raw = 0
+        self.bytes_compressed = 0
+        self.segments = 0
+        self.last_flush_ms = 0.0
+
+    # Produtor (thread do feed) ##################################
+    def record(self, message, ts: Optional[float] = None, kind: Optional[str] = None):
+        """Enfileira uma mensagem (str = frame bruto, dict = registro decodificado; não altere depois)"""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        if kind is None:
+            kind = KIND_RAW if isinstance(message, (str, bytes)) else KIND_MESSAGE
+        self._queue.append((time.time() if ts is None else ts, kind, message))
+        self.recorded += 1
+
+    def record_raw(self, frame, ts: Optional[float] = None):
+        self.record(frame.decode() if isinstance(frame, bytes) else frame, ts, KIND_RAW)
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    # Thread de gravação #########################################
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-recorder', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Grava o que estiver na fila e fecha o segmento"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        else:
+            self.flush()
+        self._close_segment()
+
+    def _run(self):
+        while True:
+            stopping = self._stop.wait(self.flush_interval)
+            self.flush()
+            if stopping:
+                break
+
+    def flush(self):
+        """Grava a fila atual (chamado pela thread de gravação)"""
+        if not self._queue:
+            return
+        started = time.perf_counter()
+        queue = self._queue
+        member: List[bytes] = []
+        member_ts = None
+        while queue:
+            ts, kind, payload = queue.popleft()
+            day = trading_day(ts, self.utc_offset)
+            if day != self._day or (self._file is not None and self._file.tell() >= self.segment_max_bytes):
+                self._write_member(member, member_ts)
+                member, member_ts = [], None
+                self._open_segment(day)
+            if member_ts is None:
+                member_ts = ts
+            try:
+                member.append(codec.dumpb({'ts': ts, kind: payload}) + b'\n')
+            except codec.EncodeError as e:
+                self.errors += 1
+                print(f"⚠️ Mensagem não serializável descartada pelo gravador: {e}")
+            if len(member) >= TICK_RECORDER_MEMBER_MAX:
+                self._write_member(member, member_ts)
+                member, member_ts = [], None
+        self._write_member(member, member_ts)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def _write_member(self, lines: List[bytes], first_ts: Optional[float]):
+        if not lines or self._file is None:
+            return
+        data = b''.join(lines)
+        try:
+            compressed = gzip.compress(data, compresslevel=self.compress_level, mtime=0)
+            offset = self._file.tell()
+            self._file.write(compressed)
+            self._file.flush()
+            if first_ts - self._last_index_ts >= self.index_interval:
+                self._index.write(_INDEX_ENTRY.pack(first_ts, offset))
+                self._index.flush()
+                self._last_index_ts = first_ts
+        except OSError as e:
+            self.errors += 1
+            print(f"❌ Erro ao gravar {self.segment_path}: {e}")
+            return
+        self.written += len(lines)
+        self.bytes_raw += len(data)
+        self.bytes_compressed += len(compressed)
+
+    def _open_segment(self, day: str):
+        self._close_segment()
+        os.makedirs(self.directory, exist_ok=True)
+        sequence = max((seq for d, seq, _ in list_segments(self.directory) if d == day), default=-1) + 1
+        self.segment_path = os.path.join(self.directory, f"{SEGMENT_PREFIX}-{day}-{sequence:04d}{SEGMENT_SUFFIX}")
+        self._file = open(self.segment_path, 'ab')
+        self._index = open(self.segment_path + INDEX_SUFFIX, 'ab')
+        self._day = day
+        self._last_index_ts = float('-inf')
+        self.segments += 1
+
+    def _close_segment(self):
+        for f in (self._file, self._index):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._file = self._index = None
+        self._day = None
+
+    def get_stats(self) -> dict:
+        return {
+            'directory': self.directory,
+            'segment': self.segment_path,
+            'queue_depth': len(self._queue),
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'written': self.written,
+            'errors': self.errors,
+            'bytes_raw': self.bytes_raw,
+            'bytes_compressed': self.bytes_compressed,
+            'compression_ratio': self.bytes_raw / self.bytes_compressed if self.bytes_compressed else 0.0,
+            'segments': self.segments,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+# Leitura ############################################################
+
+def list_segments(directory: str) -> List[Tuple[str, int, str]]:
+    """Segmentos do diretório como (dia, sequência, caminho), em ordem cronológica"""
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for name in os.listdir(directory):
+        match = _SEGMENT_PATTERN.match(name)
+        if match:
+            segments.append((match.group(1), int(match.group(2)), os.path.join(directory, name)))
+    return sorted(segments)
+
+def read_index(path: str) -> List[Tuple[float, int]]:
+    """Entradas (timestamp, offset) do índice de um segmento"""
+    try:
+        with open(path + INDEX_SUFFIX, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    usable = len(data) - len(data) % _INDEX_ENTRY.size  # Ignora entrada parcial (gravação interrompida)
+    return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+def read_segment(path: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[dict]:
+    """
+    Registros de um segmento com start <= ts < end, em ordem de gravação.
+    O arquivo é lido por mmap (sem uma chamada de sistema por bloco); com
+    start, a leitura começa no membro indicado pelo índice.
+    """
+    offset = 0
+    if start is not None:
+        index = read_index(path)
+        i = bisect_right([ts for ts, _ in index], start) - 1
+        if i >= 0:
+            offset = index[i][1]
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            mapped.seek(offset)
+            try:
+                with gzip.GzipFile(fileobj=mapped, mode='rb') as gz:
+                    for line in gz:
+                        record = codec.loads(line)
+                        ts = record['ts']
+                        if start is not None and ts < start:
+                            continue
+                        if end is not None and ts >= end:
+                            return
+                        yield record
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                # Último membro incompleto (gravação interrompida): para no que foi gravado inteiro
+                return
+
+def read_recordings(directory: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[dict]:
+    """Registros de todos os segmentos do diretório no intervalo [start, end)"""
+    segments = list_segments(directory)
+    first_ts = []
+    for _, _, path in segments:
+        index = read_index(path)
+        first_ts.append(index[0][0] if index else None)
+    for i, (_, _, path) in enumerate(segments):
+        following = next((ts for ts in first_ts[i + 1:] if ts is not None), None)
+        if start is not None and following is not None and following <= start:
+            continue  # O segmento inteiro é anterior ao início
+        if end is not None and first_ts[i] is not None and first_ts[i] >= end:
+            break
+        yield from read_segment(path, start, end)
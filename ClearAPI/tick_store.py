@@ -0,0 +1,186 @@
+# tick_store.py
+# Histórico de ticks por ticker em buffers circulares colunares (NumPy), com capacidade fixa
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    from config import TICK_STORE_CAPACITY
+except ImportError:
+    TICK_STORE_CAPACITY = 50000  # Ticks mantidos por ticker (os mais antigos são sobrescritos)
+TICK_STORE_MAX_TICKERS = 100  # Máximo de tickers com buffer (o parado há mais tempo é descartado)
+
+# Uma linha por tick; o volume é o acumulado informado pela cotação
+TICK_DTYPE = np.dtype([
+    ('ts', 'f8'),
+    ('last', 'f8'),
+    ('bid', 'f8'),
+    ('ask', 'f8'),
+    ('volume', 'i8')
+])
+
+class TickRing:
+    """
+    Buffer circular de ticks de um ticker.
+
+    O array tem o dobro da capacidade e cada tick é gravado em duas posições
+    (i e i + capacity), então os últimos `capacity` ticks estão sempre
+    contíguos: leituras são views (sem cópia) e o append não aloca.
+    As views apontam para o buffer e são sobrescritas pelos appends seguintes;
+    use .copy() para guardar um trecho.
+    """
+    __slots__ = ('capacity', '_buffer', '_count', '_last_ts', 'appended', 'out_of_order')
+
+    def __init__(self, capacity: int = TICK_STORE_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity deve ser positiva")
+        self.capacity = capacity
+        self._buffer = np.zeros(2 * capacity, dtype=TICK_DTYPE)
+        self._count = 0  # Total de ticks já gravados
+        self._last_ts = float('-inf')
+        self.appended = 0
+        self.out_of_order = 0  # Ticks com timestamp menor que o anterior (gravados com o anterior)
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def append(self, ts: float, last: float, bid: float = np.nan, ask: float = np.nan, volume: int = 0):
+        if ts < self._last_ts:
+            # Mantém o eixo de tempo ordenado (as buscas usam searchsorted)
+            ts = self._last_ts
+            self.out_of_order += 1
+        self._last_ts = ts
+        count = self._count
+        pos = count % self.capacity
+        row = (ts, last, bid, ask, volume)
+        self._buffer[pos] = row
+        self._buffer[pos + self.capacity] = row
+        self._count = count + 1
+        self.appended += 1
+
+    def view(self) -> np.ndarray:
+        """Todos os ticks mantidos, do mais antigo ao mais novo (view)"""
+        size = len(self)
+        start = (self._count - size) % self.capacity
+        return self._buffer[start:start + size]
+
+    def last(self, n: int) -> np.ndarray:
+        """Os n ticks mais recentes (view)"""
+        data = self.view()
+        return data[max(0, len(data) - n):]
+
+    def window(self, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Ticks com start <= ts < end (view; None = sem limite)"""
+        data = self.view()
+        ts = data['ts']
+        i = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        j = len(data) if end is None else int(np.searchsorted(ts, end, side='left'))
+        return data[i:j]
+
+    def clear(self):
+        self._count = 0
+        self._last_ts = float('-inf')
+
+    @property
+    def last_ts(self) -> float:
+        """Timestamp do tick mais recente (-inf se vazio)"""
+        return self._last_ts
+
+    @property
+    def nbytes(self) -> int:
+        return self._buffer.nbytes
+
+class TickStore:
+    """
+    Buffers de ticks por ticker (criados no primeiro tick, até max_tickers;
+    além disso o buffer do ticker parado há mais tempo é descartado).
+
+    O append vem da thread (ou task) do feed; as leituras devolvem views,
+    então quem lê em outra thread deve copiar o trecho que for guardar.
+    """
+    def __init__(self, capacity: int = TICK_STORE_CAPACITY, max_tickers: int = TICK_STORE_MAX_TICKERS):
+        self.capacity = capacity
+        self.max_tickers = max_tickers
+        self._rings: Dict[str, TickRing] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0  # Buffers descartados para abrir espaço a um ticker novo
+
+    def get_ring(self, ticker: str, create: bool = False) -> Optional[TickRing]:
+        ring = self._rings.get(ticker)
+        if ring is None and create:
+            with self._lock:
+                ring = self._rings.get(ticker)
+                if ring is None:
+                    while self._rings and len(self._rings) >= self.max_tickers:
+                        # Só roda na criação; o append do feed não paga por isso
+                        idle = min(self._rings, key=lambda name: self._rings[name].last_ts)
+                        del self._rings[idle]
+                        self.evictions += 1
+                    ring = self._rings[ticker] = TickRing(self.capacity)
+        return ring
+
+    def append(self, ticker: str, ts: float, last: float, bid=None, ask=None, volume=None):
+        ring = self.get_ring(ticker, create=True)
+        ring.append(
+            ts, last,
+            np.nan if bid is None else bid,
+            np.nan if ask is None else ask,
+            0 if volume is None else volume
+        )
+
+    def append_quote(self, ticker: str, quote: dict, ts: Optional[float] = None):
+        """Grava um Quote da ClearAPI (ts = instante de recebimento, se omitido)"""
+        last = quote.get('lastPrice')
+        if last is None:
+            return
+        self.append(ticker, time.time() if ts is None else ts, last,
+                    quote.get('bid'), quote.get('ask'), quote.get('volume'))
+
+    def window(self, ticker: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        ring = self._rings.get(ticker)
+        return ring.window(start, end) if ring is not None else np.empty(0, dtype=TICK_DTYPE)
+
+    def last(self, ticker: str, n: int) -> np.ndarray:
+        ring = self._rings.get(ticker)
+        return ring.last(n) if ring is not None else np.empty(0, dtype=TICK_DTYPE)
+
+    def tickers(self):
+        return list(self._rings)
+
+    def discard(self, ticker: str):
+        with self._lock:
+            self._rings.pop(ticker, None)
+
+    def get_stats(self) -> dict:
+        rings = list(self._rings.values())
+        return {
+            'tickers': len(rings),
+            'max_tickers': self.max_tickers,
+            'capacity': self.capacity,
+            'ticks': sum(len(ring) for ring in rings),
+            'appended': sum(ring.appended for ring in rings),
+            'out_of_order': sum(ring.out_of_order for ring in rings),
+            'evictions': self.evictions,
+            'memory_bytes': sum(ring.nbytes for ring in rings)
+        }
+
+def to_columns(ticks: np.ndarray) -> dict:
+    """Converte um trecho em listas por coluna, serializáveis em JSON (NaN vira None)"""
+    columns = {}
+    for name in ticks.dtype.names:
+        values = ticks[name].tolist()
+        if ticks.dtype[name].kind == 'f':
+            values = [None if value != value else value for value in values]
+        columns[name] = values
+    return columns
+
+_tick_store = None
+
+def get_tick_store() -> TickStore:
+    """Retorna o histórico de ticks compartilhado (criado no primeiro uso)"""
+    global _tick_store
+    if _tick_store is None:
+        _tick_store = TickStore()
+    return _tick_store
@@ -0,0 +1,152 @@
+# token_provider.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional, Tuple
+
+# Configurações de cache do token
+TOKEN_REFRESH_MARGIN_SECONDS = 60  # Renova o token este tempo antes de expirar
+TOKEN_MIN_REFRESH_RATIO = 0.5  # Nunca renova antes de metade da validade do token
+TOKEN_REFRESH_RETRY_SECONDS = 5  # Intervalo entre tentativas se a renovação em segundo plano falhar
+
+# Função que busca um novo token e retorna (access_token, validade_em_segundos)
+FetchTokenFunc = Callable[[], Tuple[str, float]]
+AsyncFetchTokenFunc = Callable[[], Awaitable[Tuple[str, float]]]
+
+
+class TokenProvider:
+    """
+    Mantém o access_token em cache até pouco antes de expirar.
+
+    - Seguro para threads e para asyncio (get_token / get_token_async)
+    - Renova o token em segundo plano quando entra na margem de renovação
+    - Chamadas concorrentes durante uma renovação compartilham a mesma requisição
+    """
+    def __init__(
+        self,
+        fetch_token: FetchTokenFunc,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._fetch_token = fetch_token
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._inflight: Optional[Future] = None
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.errors = 0
+
+    # Controle interno ###########################################
+    def _acquire(self) -> Tuple[Optional[str], Optional[Future], bool]:
+        """
+        Retorna (token em cache, future da renovação, se quem chamou deve executar a renovação).
+        Quando há token válido mas próximo de expirar, dispara a renovação em segundo plano.
+        """
+        now = self._clock()
+        with self._lock:
+            if self._token is not None and now < self._expires_at:
+                self.hits += 1
+                if now >= self._refresh_at and self._inflight is None:
+                    self._inflight = Future()
+                    self.background_refreshes += 1
+                    threading.Thread(target=self._run_refresh, args=(self._inflight,), daemon=True).start()
+                return self._token, None, False
+
+            self.misses += 1
+            if self._inflight is not None:
+                return None, self._inflight, False
+            self._inflight = Future()
+            return None, self._inflight, True
+
+    def _store(self, future: Future, token: str, expires_in: float):
+        now = self._clock()
+        expires_in = max(float(expires_in), 0.0)
+        with self._lock:
+            self._token = token
+            self._expires_at = now + expires_in
+            self._refresh_at = now + max(expires_in - self._refresh_margin, expires_in * TOKEN_MIN_REFRESH_RATIO)
+            self._inflight = None
+            self.refreshes += 1
+        future.set_result(token)
+
+    def _fail(self, future: Future, error: BaseException):
+        with self._lock:
+            self._inflight = None
+            self.errors += 1
+            # Mantém o token atual (se ainda válido) e agenda nova tentativa
+            self._refresh_at = self._clock() + TOKEN_REFRESH_RETRY_SECONDS
+        future.set_exception(error)
+
+    def _run_refresh(self, future: Future):
+        try:
+            token, expires_in = self._fetch_token()
+        except BaseException as e:
+            self._fail(future, e)
+            return
+        self._store(future, token, expires_in)
+
+    async def _run_refresh_async(self, future: Future, fetch_token_async: AsyncFetchTokenFunc):
+        try:
+            token, expires_in = await fetch_token_async()
+        except asyncio.CancelledError as e:
+            self._fail(future, e)
+            raise
+        except Exception as e:
+            self._fail(future, e)
+            return
+        self._store(future, token, expires_in)
+
+    # API pública ################################################
+    def get_token(self) -> str:
+        """Retorna o token em cache ou busca um novo (bloqueante)"""
+        token, future, owner = self._acquire()
+        if token is not None:
+            return token
+        if owner:
+            self._run_refresh(future)
+        return future.result()
+
+    async def get_token_async(self, fetch_token_async: Optional[AsyncFetchTokenFunc] = None) -> str:
+        """
+        Versão asyncio de get_token. Se fetch_token_async não for informado,
+        a busca síncrona roda em um executor para não bloquear o event loop.
+        """
+        token, future, owner = self._acquire()
+        if token is not None:
+            return token
+        if owner:
+            if fetch_token_async is not None:
+                await self._run_refresh_async(future, fetch_token_async)
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, self._run_refresh, future)
+        return await asyncio.wrap_future(future)
+
+    def invalidate(self):
+        """Descarta o token em cache (ex.: após receber 401)"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            self._refresh_at = 0.0
+
+    def get_stats(self) -> dict:
+        """Retorna os contadores de uso do cache"""
+        with self._lock:
+            remaining = max(self._expires_at - self._clock(), 0.0) if self._token else 0.0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'background_refreshes': self.background_refreshes,
+                'errors': self.errors,
+                'refresh_in_flight': self._inflight is not None,
+                'expires_in': remaining
+            }
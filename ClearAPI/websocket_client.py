@@ -1,15 +1,30 @@
 # websocket_client.py
 import json
+import random
 import threading
 import websocket  
 import time
 import socket
-from auth import get_auth_token
+import os
+from urllib.parse import urlparse
+from auth import get_auth_token, invalidate_auth_token
 from config import WS_BASE_URL, USER_AGENT
+from rate_limiter import WEBSOCKET_BUCKET, get_bucket
+from signalr_framing import RecordDecoder
+
+# Outro servidor (ex.: mock_server.py) sem alterar o config.py
+WS_BASE_URL = os.environ.get('CLEARAPI_WS_BASE_URL', WS_BASE_URL)
 
 _ws_connections = {}
 _connection_status = {}
 _retry_counts = {}
+_supervisors = {}  # Um supervisor de reconexão por rota
+_active_subscriptions = {}  # rota -> {(target, argumentos): mensagem} assinaturas ativas
+_sent_subscriptions = {}  # rota -> assinaturas já enviadas na conexão atual
+_ready_routes = set()  # Rotas com handshake e reassinaturas enviados (aceitam novas assinaturas)
+_subscriptions_lock = threading.Lock()
+_default_record_decoder = RecordDecoder()  # Usado quando on_message é chamado sem conexão
+_feed_recorder = None  # TickRecorder opcional (set_feed_recorder)
 _define_protocol_message = {
     "protocol": "json",
     "version": 1
@@ -19,8 +34,9 @@ MARKETDATA_ROUTE = 'marketdata'
 ORDERS_ROUTE = 'orders'
 
 # Configurações de retry e timeout
-MAX_RETRY_ATTEMPTS = 5
-RETRY_DELAY_SECONDS = 2
+MAX_RETRY_ATTEMPTS = None  # None = tenta reconectar indefinidamente
+RETRY_DELAY_SECONDS = 2  # Base do backoff exponencial
+RETRY_MAX_DELAY_SECONDS = 60  # Teto do backoff
 CONNECTION_TIMEOUT = 10
 PING_TIMEOUT = 5
 
@@ -49,8 +65,9 @@ def diagnose_connection_issues(route):
     print(f"🔍 Diagnosticando problemas de conexão para {route}...")
     
     # Teste básico de conectividade
-    host = "variableincome-openapi-simulator.xpi.com.br"
-    if test_network_connectivity(host):
+    url = urlparse(WS_BASE_URL)
+    host = url.hostname
+    if test_network_connectivity(host, url.port or (443 if url.scheme == 'wss' else 80)):
         print(f"✅ Conectividade básica com {host} OK")
     else:
         print(f"❌ Falha na conectividade básica com {host}")
@@ -78,6 +95,16 @@ def reset_connection_retry(route):
     """Reseta o contador de retry para uma rota"""
     _retry_counts[route] = 0
 
+def get_reconnect_stats(route):
+    """Retorna as métricas de reconexão de uma rota"""
+    supervisor = _supervisors.get(route)
+    return supervisor.get_stats() if supervisor else None
+
+def _backoff_delay(attempt):
+    """Backoff exponencial com jitter (metade fixa + metade aleatória)"""
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_DELAY_SECONDS * (2 ** max(attempt - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
 # Funções para enviar mensagens para o WebSocket ###############
 def send_message_to_websocket(route, message):
     ws = _ws_connections.get(route)
@@ -87,10 +114,67 @@ def send_message_to_websocket(route, message):
         try:
             ws.send(msg)
             print(f"Mensagem enviada com sucesso: {msg}")
+            return True
         except Exception as error:
             print(f"Erro ao enviar mensagem: {error}")
     else:
         print("WebSocket não está conectado.")
+    return False
+
+def _is_connected(route):
+    ws = _ws_connections.get(route)
+    return bool(route in _ready_routes and ws and ws.sock and ws.sock.connected)
+
+def _subscribe(route, message):
+    """
+    Registra a assinatura (para ser refeita após reconexões) e a envia
+    se a conexão estiver aberta e ela ainda não tiver sido enviada.
+    """
+    key = (message['target'], tuple(message['arguments']))
+    with _subscriptions_lock:
+        _active_subscriptions.setdefault(route, {})[key] = message
+        sent = _sent_subscriptions.setdefault(route, set())
+        if key in sent or not _is_connected(route):
+            should_send = False
+        else:
+            sent.add(key)
+            should_send = True
+
+    if should_send:
+        send_message_to_websocket(route, message)
+    elif not _is_connected(route):
+        print(f"⏳ {message['target']} {message['arguments']} será enviada quando {route} conectar")
+
+def _unsubscribe(route, message, subscribe_target):
+    """Remove a assinatura do registro e envia o cancelamento se conectado"""
+    key = (subscribe_target, tuple(message['arguments']))
+    with _subscriptions_lock:
+        _active_subscriptions.get(route, {}).pop(key, None)
+        _sent_subscriptions.get(route, set()).discard(key)
+
+    if _is_connected(route):
+        send_message_to_websocket(route, message)
+
+def _replay_subscriptions(route):
+    """
+    Reenvia todas as assinaturas ativas (usado ao abrir/reabrir a conexão, após o handshake).
+    A rota passa a aceitar envios diretos no mesmo lock, então nenhuma assinatura
+    feita durante a abertura é perdida nem enviada duas vezes.
+    """
+    with _subscriptions_lock:
+        subscriptions = dict(_active_subscriptions.get(route, {}))
+        _sent_subscriptions[route] = set(subscriptions)
+        _ready_routes.add(route)
+
+    if subscriptions:
+        print(f"📝 Reassinando {len(subscriptions)} assinatura(s) em {route}...")
+    for message in subscriptions.values():
+        send_message_to_websocket(route, message)
+
+def get_active_subscriptions(route):
+    """Retorna as assinaturas ativas de uma rota"""
+    with _subscriptions_lock:
+        return list(_active_subscriptions.get(route, {}).values())
 
 def sign_ticker_quote(ticker):
     subscribe_message = {
@@ -98,7 +182,7 @@ def sign_ticker_quote(ticker):
         "target": 'SubscribeQuote',
         "type": 1
     }
-    send_message_to_websocket(MARKETDATA_ROUTE, subscribe_message)
+    _subscribe(MARKETDATA_ROUTE, subscribe_message)
 
 def sign_ticker_book(ticker):
     subscribe_message = {
@@ -106,7 +190,7 @@ def sign_ticker_book(ticker):
         "target": 'SubscribeBook',
         "type": 1
     }
-    send_message_to_websocket(MARKETDATA_ROUTE, subscribe_message)    
+    _subscribe(MARKETDATA_ROUTE, subscribe_message)
 
 def sign_orders_update_status():
     subscribe_message = {
@@ -114,7 +198,7 @@ def sign_orders_update_status():
         "target": 'SubscribeOrdersStatus',
         "type": 1
     }
-    send_message_to_websocket(ORDERS_ROUTE, subscribe_message)
+    _subscribe(ORDERS_ROUTE, subscribe_message)
 
 def unsign_ticker_quote(ticker):
     message = {
@@ -122,7 +206,7 @@ def unsign_ticker_quote(ticker):
         "target": "UnsubscribeQuote",
         "type": 1
     }
-    send_message_to_websocket(MARKETDATA_ROUTE, message)
+    _unsubscribe(MARKETDATA_ROUTE, message, 'SubscribeQuote')
 
 def unsign_ticker_book(ticker):
     message = {
@@ -130,7 +214,7 @@ def unsign_ticker_book(ticker):
         "target": "UnsubscribeBook",
         "type": 1
     }
-    send_message_to_websocket(MARKETDATA_ROUTE, message)
+    _unsubscribe(MARKETDATA_ROUTE, message, 'SubscribeBook')
 
 def unsign_orders_update_status():
     message = {
@@ -138,34 +222,47 @@ def unsign_orders_update_status():
         "target": "UnsubscribeOrdersStatus",
         "type": 1
     }
-    send_message_to_websocket(ORDERS_ROUTE, message)
+    _unsubscribe(ORDERS_ROUTE, message, 'SubscribeOrdersStatus')
 
 # Funções de callback para o WebSocket #########################
 def on_open(ws, route, on_open_callback):
     print(f"✅ Conexão com WebSocket de {route} aberta.")
+    _ready_routes.discard(route)  # Até o handshake sair, assinaturas novas só são registradas
     _ws_connections[route] = ws
+    send_message_to_websocket(route, _define_protocol_message)
+    _replay_subscriptions(route)  # Refaz as assinaturas ativas (reconexão)
+
     _connection_status[route] = {'connected': True, 'last_error': None}
     reset_connection_retry(route)  # Resetar contador de retry em caso de sucesso
-    
-    send_message_to_websocket(route, _define_protocol_message)
+    supervisor = _supervisors.get(route)
+    if supervisor:
+        supervisor.on_connected()
     on_open_callback()
+
+def _get_record_decoder(ws) -> RecordDecoder:
+    # Um decodificador por conexão (registros podem vir divididos entre entregas)
+    if ws is None:
+        return _default_record_decoder
+    decoder = getattr(ws, 'record_decoder', None)
+    if decoder is None:
+        decoder = RecordDecoder()
+        ws.record_decoder = decoder
+    return decoder
+
+def set_feed_recorder(recorder):
+    """Grava os frames recebidos por todas as conexões (None desliga)"""
+    global _feed_recorder
+    _feed_recorder = recorder
+
 def on_message(ws, message, on_message_callback):
-    # Divide as mensagens pelo separador de registro
-    # Podem haver várias mensagens em uma única entrega
-    messages = message.split(_record_separator)
-    # Remove mensagens vazias 
-    # (pode ocorrer se a mensagem terminar com o separador e houver espaços em branco)
-    messages = [msg for msg in messages if msg.strip()]
-
-    for msg in messages:
-        try:
-            message_dict = json.loads(msg)  # Converte a string JSON em um dicionário
-            on_message_callback(message_dict)
-        except json.JSONDecodeError as e:
-            print(f"Erro ao decodificar mensagem JSON: {e}")
+    if _feed_recorder is not None:
+        _feed_recorder.record_raw(message)
+    # Registros separados por \u001e; pings e completions são descartados sem decodificar
+    for message_dict in _get_record_decoder(ws).feed(message):
+        on_message_callback(message_dict)
 
 def on_error(ws, error, route=None):
-    """Tratamento avançado de erros do WebSocket"""
+    """Tratamento de erros do WebSocket (a reconexão fica a cargo do supervisor da rota)"""
     error_msg = str(error)
     print(f"❌ Erro no WebSocket {route}: {error_msg}")
     
@@ -175,17 +272,11 @@ def on_error(ws, error, route=None):
     
     # Tratamento específico para WinError 10060 (timeout)
     if "10060" in error_msg or "timeout" in error_msg.lower():
-        print("🔄 Erro de timeout detectado - tentando diagnóstico...")
-        if route and diagnose_connection_issues(route):
-            print("🔄 Tentando reconexão automática...")
-            threading.Thread(target=lambda: retry_connection(route), daemon=True).start()
+        print("🔄 Erro de timeout detectado - a conexão será refeita automaticamente")
     
     # Outros erros de rede
     elif any(code in error_msg for code in ["10061", "10054", "10053"]):
         print("🌐 Erro de rede detectado - servidor pode estar indisponível")
-        if route:
-            print(f"🔄 Agendando retry para {route} em {RETRY_DELAY_SECONDS} segundos...")
-            threading.Thread(target=lambda: retry_connection(route), daemon=True).start()
 
 def on_close(ws, close_status_code, close_msg, route=None):
     """Tratamento de fechamento de conexão"""
@@ -194,42 +285,168 @@ def on_close(ws, close_status_code, close_msg, route=None):
     # Atualizar status
     if route:
         _connection_status[route] = {'connected': False, 'last_error': f"Closed: {close_status_code}"}
-    
-    # Se foi fechamento inesperado, tentar reconectar
-    if close_status_code not in [1000, 1001]:  # 1000=normal, 1001=going away
-        print(f"🔄 Fechamento inesperado detectado para {route}")
-        if route:
-            threading.Thread(target=lambda: retry_connection(route), daemon=True).start()
+        if _ws_connections.get(route) is ws:
+            _ws_connections.pop(route, None)
+            _ready_routes.discard(route)
 
 def retry_connection(route, original_callback=None, original_on_open=None):
-    """Tenta reconectar automaticamente"""
-    if route not in _retry_counts:
-        _retry_counts[route] = 0
-    
-    if _retry_counts[route] >= MAX_RETRY_ATTEMPTS:
-        print(f"❌ Máximo de tentativas de reconexão atingido para {route}")
+    """Força a reconexão imediata de uma rota (o supervisor refaz a conexão e as assinaturas)"""
+    supervisor = _supervisors.get(route)
+    if supervisor is None:
+        print(f"❌ Nenhuma conexão supervisionada para {route}")
         return False
-    
-    _retry_counts[route] += 1
-    print(f"🔄 Tentativa de reconexão {_retry_counts[route]}/{MAX_RETRY_ATTEMPTS} para {route}")
-    
-    time.sleep(RETRY_DELAY_SECONDS * _retry_counts[route])  # Backoff exponencial
-    
-    try:
-        # Tentar reconectar (seria necessário armazenar os callbacks originais)
-        print(f"🔄 Executando reconexão para {route}...")
-        # Aqui implementaríamos a lógica de reconexão
+
+    print(f"🔄 Executando reconexão para {route}...")
+    supervisor.reconnect_now()
+    return True
+
+# Supervisor de reconexão ######################################
+class _RouteSupervisor:
+    """
+    Mantém a conexão de uma rota viva: conecta, e quando a conexão cai,
+    aguarda com backoff exponencial + jitter, obtém um token novo e reconecta.
+    O handshake e as assinaturas ativas são refeitos em on_open.
+    """
+    def __init__(self, route, on_message_callback, on_open_callback, run_kwargs=None):
+        self.route = route
+        self.on_message_callback = on_message_callback
+        self.on_open_callback = on_open_callback
+        self.run_kwargs = run_kwargs or {}
+        self._stop_event = threading.Event()
+        self._ws = None
+        self._thread = None
+
+        # Métricas
+        self.connects = 0
+        self.reconnects = 0
+        self.disconnected_at = None
+        self.last_reconnect_seconds = None
+        self.max_reconnect_seconds = 0.0
+        self.last_message_at = None
+        self.last_message_gap_seconds = None
+        self.max_message_gap_seconds = 0.0
+        self._awaiting_first_message = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._ws:
+            self._ws.close()
+
+    def reconnect_now(self):
+        """Fecha a conexão atual; o loop do supervisor reconecta em seguida"""
+        _retry_counts[self.route] = 0
+        if self._ws:
+            self._ws.close()
+
+    def _connect_once(self):
+        token = get_auth_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "User-Agent": USER_AGENT
+        }
+        route = self.route
+        self._ws = websocket.WebSocketApp(
+            f'{WS_BASE_URL}/ws/v1/{route}',
+            header=headers,
+            on_open=lambda ws: on_open(ws, route, self.on_open_callback),
+            on_message=lambda ws, message: self._on_message(ws, message),
+            on_error=lambda ws, error: on_error(ws, error, route),
+            on_close=lambda ws, code, msg: on_close(ws, code, msg, route)
+        )
+        self._ws.run_forever(**self.run_kwargs)
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    self._connect_once()
+                except Exception as e:
+                    print(f"❌ Erro na execução do WebSocket {self.route}: {e}")
+                self._ws = None
+
+                if self._stop_event.is_set():
+                    break
+                if self.disconnected_at is None:
+                    self.disconnected_at = time.monotonic()
+
+                attempt = _retry_counts.get(self.route, 0) + 1
+                _retry_counts[self.route] = attempt
+                if MAX_RETRY_ATTEMPTS is not None and attempt > MAX_RETRY_ATTEMPTS:
+                    print(f"❌ Máximo de tentativas de reconexão atingido para {self.route}")
+                    break
+
+                delay = _backoff_delay(attempt)
+                print(f"🔄 Tentativa de reconexão {attempt} para {self.route} em {delay:.1f}s")
+                if self._stop_event.wait(delay):
+                    break
+                invalidate_auth_token()  # Garante um token novo na reconexão
+        finally:
+            _supervisors.pop(self.route, None)
+            get_bucket(WEBSOCKET_BUCKET).release()
+
+    def _on_message(self, ws, message):
+        now = time.monotonic()
+        if self._awaiting_first_message:
+            self._awaiting_first_message = False
+            if self.last_message_at is not None:
+                self.last_message_gap_seconds = now - self.last_message_at
+                self.max_message_gap_seconds = max(self.max_message_gap_seconds, self.last_message_gap_seconds)
+        self.last_message_at = now
+        on_message(ws, message, self.on_message_callback)
+
+    def on_connected(self):
+        self.connects += 1
+        self._awaiting_first_message = True
+        if self.disconnected_at is not None:
+            self.reconnects += 1
+            self.last_reconnect_seconds = time.monotonic() - self.disconnected_at
+            self.max_reconnect_seconds = max(self.max_reconnect_seconds, self.last_reconnect_seconds)
+            self.disconnected_at = None
+            print(f"✅ {self.route} reconectado em {self.last_reconnect_seconds:.2f}s")
+
+    def get_stats(self):
+        return {
+            'connected': get_connection_status(self.route)['connected'],
+            'connects': self.connects,
+            'reconnects': self.reconnects,
+            'retry_attempt': _retry_counts.get(self.route, 0),
+            'last_reconnect_seconds': self.last_reconnect_seconds,
+            'max_reconnect_seconds': self.max_reconnect_seconds,
+            'last_message_gap_seconds': self.last_message_gap_seconds,
+            'max_message_gap_seconds': self.max_message_gap_seconds
+        }
+
+def _start_supervisor(route, on_message_callback, on_open_callback, run_kwargs=None):
+    if route in _supervisors:
+        print(f"⚠️ WebSocket de {route} já está em execução")
         return True
-    except Exception as e:
-        print(f"❌ Falha na reconexão: {e}")
+
+    # Respeita o limite de conexões WebSocket simultâneas
+    if not get_bucket(WEBSOCKET_BUCKET).try_acquire():
+        print(f"❌ Limite de conexões WebSocket simultâneas atingido para {route}")
         return False
 
+    supervisor = _RouteSupervisor(route, on_message_callback, on_open_callback, run_kwargs)
+    _supervisors[route] = supervisor
+    supervisor.start()
+    return True
+
+def close_websocket(route):
+    """Encerra a conexão de uma rota e para as reconexões automáticas"""
+    supervisor = _supervisors.get(route)
+    if supervisor:
+        supervisor.stop()
+
 # Inicialização dos WebSockets #################################
 def initialize_market_data_websocket(on_message_callback, on_open_callback):
-    """Inicializa WebSocket de Market Data com tratamento de erro robusto"""
+    """Inicializa WebSocket de Market Data com reconexão automática"""
     route = MARKETDATA_ROUTE
     
-    print(f"🚀 Iniciando WebSocket para {route} com tratamento de erro WinError 10060...")
+    print(f"🚀 Iniciando WebSocket para {route} com reconexão automática...")
     
     try:
         # Diagnóstico inicial
@@ -239,34 +456,13 @@ def initialize_market_data_websocket(on_message_callback, on_open_callback):
         
         # Resetar contador de retry
         reset_connection_retry(route)
-        
-        token = get_auth_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "User-Agent": USER_AGENT
-        }
 
         # Configurar timeout
         websocket.setdefaulttimeout(CONNECTION_TIMEOUT)
-        
-        ws_marketdata = websocket.WebSocketApp(
-            f'{WS_BASE_URL}/ws/v1/{route}',
-            header=headers,
-            on_open=lambda ws: on_open(ws, route, on_open_callback),
-            on_message=lambda ws, message: on_message(ws, message, on_message_callback),
-            on_error=lambda ws, error: on_error(ws, error, route),
-            on_close=lambda ws, code, msg: on_close(ws, code, msg, route)
-        )
-
-        # Executar em thread separada
-        def run_with_timeout():
-            try:
-                ws_marketdata.run_forever(ping_timeout=PING_TIMEOUT)
-            except Exception as e:
-                print(f"❌ Erro na execução do WebSocket: {e}")
 
-        thread = threading.Thread(target=run_with_timeout, daemon=True)
-        thread.start()
+        # Executar em thread separada (supervisionada)
+        if not _start_supervisor(route, on_message_callback, on_open_callback, {'ping_timeout': PING_TIMEOUT}):
+            return False
         
         print(f"🚀 WebSocket de Market Data iniciado em thread separada.")
         return True
@@ -276,22 +472,10 @@ def initialize_market_data_websocket(on_message_callback, on_open_callback):
         return False
 
 def initialize_orders_websocket(on_message_callback, on_open_callback):
-    token = get_auth_token()
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "User-Agent": USER_AGENT
-    }
+    reset_connection_retry(ORDERS_ROUTE)
 
-    ws_orders = websocket.WebSocketApp(
-        f'{WS_BASE_URL}/ws/v1/{ORDERS_ROUTE}',
-        header=headers,
-        on_open=lambda ws: on_open(ws, ORDERS_ROUTE, on_open_callback),
-        on_message=lambda ws, message: on_message(ws, message, on_message_callback),
-        on_error=on_error,
-        on_close=on_close
-    )
-
-    # Executa o WebSocket em uma thread separada
-    thread = threading.Thread(target=ws_orders.run_forever, daemon=True)
-    thread.start()
-    print(f"WebSocket de Orders iniciado em uma thread separada.")
\ No newline at end of file
+    # Executa o WebSocket em uma thread separada (supervisionada)
+    if not _start_supervisor(ORDERS_ROUTE, on_message_callback, on_open_callback):
+        return False
+    print(f"WebSocket de Orders iniciado em uma thread separada.")
+    return True
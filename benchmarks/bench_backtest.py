@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark do backtest: a mesma estratégia (cruzamento de EMAs) no modo
+vetorizado e no modo por eventos, e uma varredura de parâmetros em série
+versus em um pool de processos
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from bench_utils import ROOT_DIR  # noqa: F401 (ajusta o sys.path)
+
+import backtest  # pylint: disable=import-error
+from strategies import MovingAverageCross  # pylint: disable=import-error
+from tick_store import TICK_DTYPE  # pylint: disable=import-error
+
+
+def build_ticks(count: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    prices = 5000.0 + np.cumsum(rng.choice([-0.5, 0.0, 0.5], size=count))
+    ticks = np.zeros(count, dtype=TICK_DTYPE)
+    ticks['ts'] = 1792260000.0 + np.arange(count) * 0.05
+    ticks['last'] = prices
+    ticks['bid'] = prices - 0.25
+    ticks['ask'] = prices + 0.25
+    ticks['volume'] = np.arange(count)
+    return ticks
+
+
+def run(ticks: int = 1000000, event_ticks: int = 200000, processes: int = 0) -> dict:
+    data = build_ticks(ticks)
+    options = {'multiplier': 10.0, 'commission': 1.0}
+
+    strategy = MovingAverageCross(fast=20, slow=200)
+    start = time.perf_counter()
+    vectorized = backtest.run_vectorized(data, strategy.target_positions(data), **options)
+    vectorized_elapsed = time.perf_counter() - start
+
+    subset = data[:event_ticks]
+    start = time.perf_counter()
+    events = backtest.run_events(subset, strategy.ticker, MovingAverageCross(fast=20, slow=200).bind, **options)
+    events_elapsed = time.perf_counter() - start
+    check = backtest.run_vectorized(subset, strategy.target_positions(subset), **options)
+
+    grid = {'fast': [5, 10, 20, 50], 'slow': [100, 200, 400, 800]}
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+    backtest.sweep(data, MovingAverageCross, grid, processes=1, **options)
+    serial_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    best = backtest.sweep(data, MovingAverageCross, grid, processes=processes, **options)[0]
+    pool_elapsed = time.perf_counter() - start
+
+    return {
+        'ticks': ticks,
+        'vectorized_ticks_per_sec': ticks / vectorized_elapsed,
+        'vectorized_fills': vectorized['fills'],
+        'event_ticks': event_ticks,
+        'events_ticks_per_sec': event_ticks / events_elapsed,
+        'events_match_vectorized': bool(events['fills'] == check['fills']
+                                        and abs(events['net_pnl'] - check['net_pnl']) < 1e-6),
+        'sweep_combinations': len(grid['fast']) * len(grid['slow']),
+        'sweep_serial_seconds': serial_elapsed,
+        'sweep_pool_seconds': pool_elapsed,
+        'sweep_processes': processes,
+        'sweep_speedup': serial_elapsed / pool_elapsed if pool_elapsed > 0 else 0.0,
+        'best_params': best['params'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do backtest vetorizado e por eventos")
+    parser.add_argument('--ticks', type=int, default=1000000)
+    parser.add_argument('--event-ticks', type=int, default=200000)
+    parser.add_argument('--processes', type=int, default=0, help="0 = número de CPUs")
+    args = parser.parse_args()
+
+    print(f"📈 Backtest: {args.ticks} ticks (eventos: {args.event_ticks})")
+    result = run(args.ticks, args.event_ticks, args.processes)
+    print(f"   Vetorizado: {result['vectorized_ticks_per_sec']:,.0f} ticks/s ({result['vectorized_fills']} execuções)")
+    print(f"   Por eventos: {result['events_ticks_per_sec']:,.0f} ticks/s "
+          f"(mesmo resultado do vetorizado: {'sim' if result['events_match_vectorized'] else 'NÃO'})")
+    print(f"   Varredura de {result['sweep_combinations']} combinações: "
+          f"{result['sweep_serial_seconds']:.2f}s em série, {result['sweep_pool_seconds']:.2f}s "
+          f"com {result['sweep_processes']} processos ({result['sweep_speedup']:.1f}x)")
+    print(f"   Melhor: {result['best_params']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do fan-out de cotações no ConnectionManager: broadcast para todos
+os clientes versus envio apenas aos clientes que assinaram o ticker
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from bench_utils import ROOT_DIR, summarize, print_summary
+
+sys.path.append(ROOT_DIR)
+os.chdir(ROOT_DIR)  # web_app monta frontend/static com caminho relativo
+from web_app import ConnectionManager  # noqa: E402
+
+
+class FakeWebSocket:
+    """Conexão que só conta as mensagens enviadas"""
+    def __init__(self):
+        self.sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def noop_upstream(ticker: str):
+    pass
+
+
+async def build_manager(clients: int, tickers: int, per_client: int, seed: int):
+    rng = random.Random(seed)
+    manager = ConnectionManager(subscribe_upstream=noop_upstream, unsubscribe_upstream=noop_upstream)
+    universe = [f"TICK{i:03d}" for i in range(tickers)]
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    for ws in sockets:
+        await manager.connect(ws)
+        for ticker in rng.sample(universe, per_client):
+            await manager.subscribe_ticker(ws, ticker)
+    return manager, sockets, universe
+
+
+async def measure(manager, send, sockets, universe, ticks: int, seed: int):
+    """Tempo de publicação por tick; as tasks de escrita rodam entre os ticks"""
+    rng = random.Random(seed)
+    message = '{"type":"quote_update"}'
+    for ws in sockets:
+        ws.sent = 0
+    samples = []
+    wall_start = time.perf_counter()
+    for _ in range(ticks):
+        ticker = rng.choice(universe)
+        start = time.perf_counter()
+        await send(ticker, message)
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+    while any(client.get_stats()['pending'] for client in manager.clients.values()):
+        await asyncio.sleep(0)
+    wall = time.perf_counter() - wall_start
+    sent = sum(ws.sent for ws in sockets)
+    return dict(summarize(samples), sends_per_tick=sent / ticks, ticks_per_sec=ticks / wall)
+
+
+async def run_async(clients: int, tickers: int, per_client: int, ticks: int) -> dict:
+    manager, sockets, universe = await build_manager(clients, tickers, per_client, seed=1)
+    return {
+        'broadcast_all': await measure(manager, lambda ticker, message: manager.broadcast(message),
+                                       sockets, universe, ticks, seed=2),
+        'routed_by_ticker': await measure(manager, manager.publish, sockets, universe, ticks, seed=2)
+    }
+
+
+def run(clients: int = 500, tickers: int = 200, per_client: int = 10, ticks: int = 5000) -> dict:
+    return asyncio.run(run_async(clients, tickers, per_client, ticks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--tickers', type=int, default=200)
+    parser.add_argument('--per-client', type=int, default=10, help='Tickers assinados por cliente')
+    parser.add_argument('--ticks', type=int, default=5000)
+    args = parser.parse_args()
+
+    print("📡 Benchmark de fan-out de cotações")
+    results = run(args.clients, args.tickers, args.per_client, args.ticks)
+    print(f"{args.clients} clientes x {args.tickers} tickers ({args.per_client} por cliente), {args.ticks} ticks")
+    for name, summary in results.items():
+        print_summary(name, summary)
+        print(f"{'':<32} envios/tick={summary['sends_per_tick']:.1f} ticks/s={summary['ticks_per_sec']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark do caminho completo de uma cotação: frame SignalR ->
+websocket_client.on_message -> web_app.on_clear_message -> ponte -> fan-out
+para os clientes do frontend, com cada codec JSON disponível
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from bench_utils import ROOT_DIR
+
+sys.path.append(ROOT_DIR)
+os.chdir(ROOT_DIR)  # web_app monta frontend/static com caminho relativo
+import codec  # pylint: disable=import-error # noqa: E402
+import web_app  # noqa: E402
+from websocket_client import on_message, _record_separator  # pylint: disable=import-error # noqa: E402
+
+CODECS = ['json', 'orjson', 'msgspec']
+
+
+class FakeWebSocket:
+    """Conexão que só conta as mensagens enviadas"""
+    def __init__(self):
+        self.sent = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.sent += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def build_frames(count: int, tickers: list, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    frames = []
+    for i in range(count):
+        price = round(100 + rng.random(), 2)
+        quote = {
+            'ticker': rng.choice(tickers), 'lastPrice': price, 'bid': price - 0.01, 'ask': price + 0.01,
+            'volume': 1000 + i, 'change': 0.5, 'changePercent': 0.42, 'high': 101.0, 'low': 99.0
+        }
+        frames.append(codec.dumps({'type': 1, 'target': 'Quote', 'arguments': [quote]}) + _record_separator)
+    return frames
+
+
+async def run_codec(frames: list, sockets: list) -> dict:
+    for ws in sockets:
+        ws.sent = 0
+    bridge = web_app.quote_bridge
+    delivered_before = bridge.delivered
+
+    start = time.perf_counter()
+    for frame in frames:
+        on_message(None, frame, web_app.on_clear_message)
+        await asyncio.sleep(0)  # Ponte e tasks de escrita
+    while bridge.depth or any(client.get_stats()['pending'] for client in web_app.manager.clients.values()):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'msgs_per_sec': len(frames) / elapsed,
+        'delivered_ticks': bridge.delivered - delivered_before,
+        'client_sends': sum(ws.sent for ws in sockets)
+    }
+
+
+async def run_async(messages: int, clients: int, tickers: int) -> dict:
+    universe = [f"TICK{i:03d}" for i in range(tickers)]
+    frames = build_frames(messages, universe)
+
+    await web_app.quote_bridge.start()
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    rng = random.Random(2)
+    for ws in sockets:
+        await web_app.manager.connect(ws)
+        for ticker in rng.sample(universe, min(10, tickers)):
+            await web_app.manager.subscribe_ticker(ws, ticker, max_rate=0)  # Sem limite por ticker
+
+    results = {}
+    for name in CODECS:
+        if codec.set_codec(name) != name:
+            continue
+        results[name] = await run_codec(frames, sockets)
+    await web_app.quote_bridge.stop()
+    return results
+
+
+def run(messages: int = 20000, clients: int = 50, tickers: int = 50) -> dict:
+    return asyncio.run(run_async(messages, clients, tickers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--tickers', type=int, default=50)
+    args = parser.parse_args()
+
+    print("⚡ Benchmark on_message -> fan-out")
+    results = run(args.messages, args.clients, args.tickers)
+    for name, result in results.items():
+        print(f"{name:<10} {result['msgs_per_sec']:10.0f} msgs/s  "
+              f"ticks entregues={result['delivered_ticks']}  envios={result['client_sends']}")
+
+
+if __name__ == "__main__":
+    main()
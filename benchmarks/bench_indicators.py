@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos indicadores sobre um milhão de ticks: atualização incremental
+(por tick) versus cálculo vetorizado da série inteira, com a maior
+diferença entre os dois
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from bench_utils import summarize  # noqa: F401 (ajusta o sys.path)
+
+import indicators  # pylint: disable=import-error
+
+
+def build_series(ticks: int, seed: int = 1) -> dict:
+    rng = np.random.default_rng(seed)
+    prices = 130000.0 + np.cumsum(rng.choice([-5.0, 0.0, 5.0], size=ticks))
+    return {
+        'prices': prices,
+        'volumes': rng.integers(1, 50, size=ticks).astype(float),
+        'high': prices + 10.0,
+        'low': prices - 10.0
+    }
+
+
+def run(ticks: int = 1000000) -> dict:
+    series = build_series(ticks)
+    prices, volumes, high, low = series['prices'], series['volumes'], series['high'], series['low']
+    cases = {
+        'SMA(20)': (lambda: indicators.SMA(20), (prices,), lambda: indicators.sma(prices, 20)),
+        'EMA(20)': (lambda: indicators.EMA(20), (prices,), lambda: indicators.ema(prices, 20)),
+        'VWAP': (indicators.VWAP, (prices, volumes), lambda: indicators.vwap(prices, volumes)),
+        'RollingStd(20)': (lambda: indicators.RollingStd(20), (prices,), lambda: indicators.rolling_std(prices, 20)),
+        'RSI(14)': (lambda: indicators.RSI(14), (prices,), lambda: indicators.rsi(prices, 14)),
+        'ATR(14)': (lambda: indicators.ATR(14), (high, low, prices), lambda: indicators.atr(high, low, prices, 14)),
+    }
+
+    results = {}
+    for name, (factory, columns, batch) in cases.items():
+        rows = list(zip(*(column.tolist() for column in columns)))
+        indicator = factory()
+        update = indicator.update
+        streamed = np.empty(ticks)
+        start = time.perf_counter()
+        for i, row in enumerate(rows):
+            value = update(*row)
+            streamed[i] = np.nan if value is None else value
+        stream_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = batch()
+        batch_elapsed = time.perf_counter() - start
+
+        valid = ~np.isnan(vectorized)
+        results[name] = {
+            'stream_ticks_per_sec': ticks / stream_elapsed,
+            'stream_us_per_tick': stream_elapsed / ticks * 1e6,
+            'batch_ms': batch_elapsed * 1000,
+            'max_abs_diff': float(np.max(np.abs(streamed[valid] - vectorized[valid]))) if valid.any() else 0.0
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=1000000)
+    args = parser.parse_args()
+
+    print("📈 Benchmark dos indicadores")
+    for name, result in run(args.ticks).items():
+        print(f"{name:<16} incremental {result['stream_ticks_per_sec']:10.0f} ticks/s "
+              f"({result['stream_us_per_tick']:.2f} us)  vetorizado {result['batch_ms']:8.1f} ms  "
+              f"diferença máx {result['max_abs_diff']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark do book de ofertas: atualizações incrementais por segundo em
+fluxos sintéticos (random walk do preço em torno do topo do book), leituras
+de topo/microprice/desequilíbrio e o caminho completo via OrderBookManager
+"""
+
+import argparse
+import random
+import time
+
+from bench_utils import summarize, print_summary
+
+from order_book import OrderBook, OrderBookManager  # pylint: disable=import-error
+
+
+def build_stream(updates: int, levels: int, tick: float = 0.5, seed: int = 1) -> tuple:
+    """Snapshot inicial e atualizações concentradas perto do topo (20% removendo níveis)"""
+    rng = random.Random(seed)
+    mid = 130000.0
+    snapshot = {
+        'bids': [{'price': mid - tick * (i + 1), 'quantity': rng.randint(1, 500)} for i in range(levels)],
+        'asks': [{'price': mid + tick * (i + 1), 'quantity': rng.randint(1, 500)} for i in range(levels)]
+    }
+    stream = []
+    for _ in range(updates):
+        if rng.random() < 0.01:
+            mid += rng.choice((-tick, tick))
+        side = rng.choice(('bid', 'ask'))
+        distance = int(rng.expovariate(0.3)) + 1
+        price = mid - tick * distance if side == 'bid' else mid + tick * distance
+        quantity = 0 if rng.random() < 0.2 else rng.randint(1, 500)
+        stream.append((side, price, quantity))
+    return snapshot, stream
+
+
+def run(updates: int = 200000, levels: int = 20, max_levels: int = 50) -> dict:
+    snapshot, stream = build_stream(updates, levels)
+    results = {}
+
+    book = OrderBook('WINV25', max_levels)
+    book.apply_message(snapshot)
+    start = time.perf_counter()
+    for side, price, quantity in stream:
+        book.apply_update(side, price, quantity)
+    elapsed = time.perf_counter() - start
+    results['apply_update'] = {'per_sec': updates / elapsed}
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        book.microprice
+        book.imbalance(5)
+    elapsed = time.perf_counter() - start
+    results['microprice+imbalance(5)'] = {'per_sec': updates / elapsed}
+
+    manager = OrderBookManager(max_levels=max_levels)
+    manager.add_listener(lambda ticker, book: book.microprice)  # Estratégia mínima
+    manager.apply('WINV25', snapshot)
+    messages = [{'type': 1, 'target': 'Book', 'arguments': [{'ticker': 'WINV25', 'side': side, 'price': price, 'quantity': quantity}]}
+                for side, price, quantity in stream]
+    latencies = []
+    start = time.perf_counter()
+    for message in messages:
+        t0 = time.perf_counter()
+        manager.on_message(message)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    results['manager.on_message'] = {'per_sec': updates / elapsed, 'latency': summarize(latencies)}
+
+    start = time.perf_counter()
+    for _ in range(updates // 100):
+        manager.snapshot('WINV25', 10)
+    elapsed = time.perf_counter() - start
+    results['snapshot(10)'] = {'per_sec': (updates // 100) / elapsed}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--updates', type=int, default=200000)
+    parser.add_argument('--levels', type=int, default=20, help='Níveis por lado no snapshot inicial')
+    parser.add_argument('--max-levels', type=int, default=50)
+    args = parser.parse_args()
+
+    print("📚 Benchmark do book de ofertas")
+    for name, result in run(args.updates, args.levels, args.max_levels).items():
+        print(f"{name:<26} {result['per_sec']:12.0f} ops/s")
+        if 'latency' in result:
+            print_summary(f"  latência {name}", result['latency'])
+
+
+if __name__ == "__main__":
+    main()
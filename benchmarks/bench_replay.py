@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark da reprodução de gravações: leitura dos segmentos (mmap + gzip),
+reprodução só com o decodificador e reprodução de ponta a ponta no web_app
+(on_clear_message -> ponte -> clientes), sem rede, na velocidade máxima
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from bench_utils import ROOT_DIR
+
+sys.path.append(ROOT_DIR)
+os.chdir(ROOT_DIR)  # web_app monta frontend/static com caminho relativo
+import web_app  # noqa: E402
+from replay import FeedReplayer  # pylint: disable=import-error # noqa: E402
+from tick_recorder import TickRecorder, read_recordings  # pylint: disable=import-error # noqa: E402
+from bench_feed_pipeline import FakeWebSocket  # noqa: E402
+
+
+def record_corpus(directory: str, frames: int, tickers: list, seed: int = 1):
+    rng = random.Random(seed)
+    recorder = TickRecorder(directory)
+    base = 1792260000.0
+    for i in range(frames):
+        price = round(100 + rng.random(), 2)
+        recorder.record_raw('{"type":1,"target":"Quote","arguments":[{"ticker":"%s","lastPrice":%s,"bid":%s,'
+                            '"ask":%s,"volume":%d}]}\x1e' % (rng.choice(tickers), price, price - 0.01, price + 0.01, i),
+                            ts=base + i * 0.01)
+        if i % 5000 == 4999:
+            recorder.flush()
+    recorder.stop()
+
+
+async def replay_web_app(directory: str, clients: int, tickers: list) -> dict:
+    replayer = FeedReplayer(directory, speed=0)
+    web_app.feed_time = replayer.clock
+    await web_app.quote_bridge.start()
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    rng = random.Random(2)
+    for ws in sockets:
+        await web_app.manager.connect(ws)
+        for ticker in rng.sample(tickers, min(10, len(tickers))):
+            await web_app.manager.subscribe_ticker(ws, ticker, max_rate=0)
+
+    start = time.perf_counter()
+    await replayer.run_async(web_app.on_clear_message, web_app.on_clear_open)
+    while web_app.quote_bridge.depth or any(c.get_stats()['pending'] for c in web_app.manager.clients.values()):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    for ws in sockets:
+        await web_app.manager.disconnect(ws)
+    await web_app.quote_bridge.stop()
+    return {'msgs_per_sec': replayer.messages / elapsed, 'client_sends': sum(ws.sent for ws in sockets)}
+
+
+def run(frames: int = 100000, clients: int = 20, tickers: int = 50) -> dict:
+    universe = [f"TICK{i:03d}" for i in range(tickers)]
+    directory = tempfile.mkdtemp(prefix='bench_replay_')
+    try:
+        record_corpus(directory, frames, universe)
+        results = {}
+
+        start = time.perf_counter()
+        count = sum(1 for _ in read_recordings(directory))
+        results['read_segments'] = {'msgs_per_sec': count / (time.perf_counter() - start)}
+
+        replayer = FeedReplayer(directory, speed=0)
+        start = time.perf_counter()
+        replayer.run(lambda message: None)
+        results['replay_decode'] = {'msgs_per_sec': replayer.messages / (time.perf_counter() - start)}
+
+        results['replay_web_app'] = asyncio.run(replay_web_app(directory, clients, universe))
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--tickers', type=int, default=50)
+    args = parser.parse_args()
+
+    print("⏯️ Benchmark da reprodução de gravações")
+    for name, result in run(args.frames, args.clients, args.tickers).items():
+        extra = f"  envios={result['client_sends']}" if 'client_sends' in result else ''
+        print(f"{name:<16} {result['msgs_per_sec']:10.0f} msgs/s{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark da camada REST: requests sem sessão (nova conexão TCP por chamada)
+versus o RestClient compartilhado com pool keep-alive, contra um stub local
+"""
+
+import argparse
+import time
+
+import requests
+from bench_utils import summarize, print_summary
+from stub_server import start_stub_server
+
+import auth  # pylint: disable=import-error
+import rest_client  # pylint: disable=import-error
+from get_ticker_quote import get_ticker_quote  # pylint: disable=import-error
+
+
+def run(iterations: int = 500) -> dict:
+    server, base_url = start_stub_server()
+    quote_url = f"{base_url}/api/v1/marketdata/quote?Ticker=WDOV25"
+
+    try:
+        bare = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            requests.get(quote_url, timeout=5)
+            bare.append(time.perf_counter() - start)
+
+        client = rest_client.RestClient(base_url=f"{base_url}/api", rate_limited=False)
+        pooled = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            client.get('/v1/marketdata/quote', params={'Ticker': 'WDOV25'})
+            pooled.append(time.perf_counter() - start)
+        client.close()
+
+        # Fluxo completo de get_ticker_quote (token em cache + sessão compartilhada)
+        auth._auth_url = f"{base_url}/v1/auth"
+        rest_client.configure_rest_client(base_url=f"{base_url}/api", rate_limited=False)
+        get_ticker_quote('WDOV25')
+        full = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            get_ticker_quote('WDOV25')
+            full.append(time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+    return {
+        'rest_bare_requests': summarize(bare),
+        'rest_pooled_session': summarize(pooled),
+        'get_ticker_quote_pooled': summarize(full)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    print("🌐 Benchmark de latência REST (stub local)")
+    results = run(args.iterations)
+    for name, summary in results.items():
+        print_summary(name, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark do parsing de frames SignalR: split + strip + json.loads (antigo
+on_message) versus o RecordDecoder incremental, sobre um corpus de mensagens
+(gerado, ou gravado com --corpus: um frame por linha, em JSON)
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bench_utils import summarize  # noqa: F401 (ajusta o sys.path)
+
+import codec  # pylint: disable=import-error
+from signalr_framing import RecordDecoder, RECORD_SEPARATOR  # pylint: disable=import-error
+
+
+def generate_corpus(frames: int, seed: int = 1) -> list:
+    """Mistura típica do feed: cotações, book, pings e completions, às vezes vários por frame"""
+    rng = random.Random(seed)
+    tickers = ['WINV25', 'WDOV25', 'PETR4', 'VALE3', 'ITUB4', 'BBDC4']
+    corpus = []
+    for i in range(frames):
+        records = []
+        for _ in range(rng.choice((1, 1, 1, 2, 3))):
+            kind = rng.random()
+            if kind < 0.75:
+                price = round(rng.uniform(10, 130000), 2)
+                records.append({'type': 1, 'target': 'Quote', 'arguments': [{
+                    'ticker': rng.choice(tickers), 'lastPrice': price, 'bid': price - 1, 'ask': price + 1,
+                    'volume': rng.randint(1, 10 ** 7), 'change': 0.5, 'changePercent': 0.12,
+                    'high': price + 10, 'low': price - 10}]})
+            elif kind < 0.85:
+                levels = [{'price': round(rng.uniform(10, 100), 2), 'quantity': rng.randint(1, 1000)} for _ in range(10)]
+                records.append({'type': 1, 'target': 'Book', 'arguments': [{
+                    'ticker': rng.choice(tickers), 'bids': levels, 'asks': levels}]})
+            elif kind < 0.95:
+                records.append({'type': 6})
+            else:
+                records.append({'type': 3, 'invocationId': str(i)})
+        corpus.append(''.join(json.dumps(r, separators=(',', ':')) + RECORD_SEPARATOR for r in records))
+    return corpus
+
+
+def legacy_parse(frame: str) -> list:
+    """Implementação antiga do websocket_client.on_message"""
+    out = []
+    messages = frame.split(RECORD_SEPARATOR)
+    messages = [msg for msg in messages if msg.strip()]
+    for msg in messages:
+        out.append(json.loads(msg))
+    return out
+
+
+def rechunk(corpus: list, chunk: int) -> list:
+    """Recorta o fluxo em frames de tamanho fixo (registros divididos entre frames)"""
+    stream = ''.join(corpus)
+    return [stream[i:i + chunk] for i in range(0, len(stream), chunk)]
+
+
+def measure(name: str, frames: list, parse_factory, records_hint: int, repeat: int = 3) -> dict:
+    """Melhor de `repeat` passadas (um parser novo por passada)"""
+    elapsed = float('inf')
+    for _ in range(repeat):
+        parse = parse_factory()
+        start = time.perf_counter()
+        count = 0
+        for frame in frames:
+            count += len(parse(frame))
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return {'name': name, 'records_out': count, 'records_per_sec': records_hint / elapsed, 'mb_per_sec': sum(map(len, frames)) / elapsed / 1e6}
+
+
+def run(frames: int = 50000, corpus_path: str = None) -> list:
+    if corpus_path:
+        with open(corpus_path, encoding='utf-8') as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+    else:
+        corpus = generate_corpus(frames)
+    total = sum(frame.count(RECORD_SEPARATOR) for frame in corpus)
+
+    results = [measure('legacy_split_loads', corpus, lambda: legacy_parse, total)]
+    for name in ('json', 'orjson'):
+        if codec.set_codec(name) != name:
+            continue
+        results.append(measure(f'decoder_{name}', corpus, lambda: RecordDecoder(skip_types=()).feed, total))
+        results.append(measure(f'decoder_{name}_skip_ping', corpus, lambda: RecordDecoder().feed, total))
+        results.append(measure(f'decoder_{name}_skip_book', corpus, lambda: RecordDecoder(skip_targets=('Book',)).feed, total))
+        results.append(measure(f'decoder_{name}_512b_chunks', rechunk(corpus, 512), lambda: RecordDecoder().feed, total))
+    codec.set_codec(codec.JSON_CODEC)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=50000)
+    parser.add_argument('--corpus', help='Arquivo com um frame por linha (string JSON)')
+    args = parser.parse_args()
+
+    print("🧩 Benchmark do parsing de frames SignalR")
+    for result in run(args.frames, args.corpus):
+        print(f"{result['name']:<28} {result['records_per_sec']:10.0f} registros/s "
+              f"{result['mb_per_sec']:7.1f} MB/s  (entregues: {result['records_out']})")
+
+
+if __name__ == "__main__":
+    main()
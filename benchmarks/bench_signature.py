@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da assinatura do body: carregamento da chave a cada ordem (frio)
+versus chave mantida em memória pelo BodySigner (quente)
+"""
+
+import argparse
+import json
+import os
+import time
+
+from bench_utils import ROOT_DIR, summarize, print_summary
+
+os.chdir(ROOT_DIR)  # PRIVATE_RSA_KEY_PATH é relativo à raiz do projeto
+
+from cryptography.hazmat.primitives.asymmetric import padding  # noqa: E402
+from cryptography.hazmat.primitives import hashes  # noqa: E402
+from cryptography.hazmat.primitives.serialization import load_pem_private_key  # noqa: E402
+from signature import BodySigner  # pylint: disable=import-error # noqa: E402
+from config import PRIVATE_RSA_KEY_PATH  # pylint: disable=import-error # noqa: E402
+
+ORDER_BODY = json.dumps({
+    'Module': 'DayTrade',
+    'Ticker': 'WDOV25',
+    'Side': 'Buy',
+    'Price': 5432.5,
+    'Quantity': 1,
+    'TimeInForce': 'Day'
+})
+
+
+def sign_cold(body: str) -> bytes:
+    """Comportamento anterior: lê e interpreta o PEM a cada assinatura"""
+    with open(PRIVATE_RSA_KEY_PATH, 'rb') as key_file:
+        rsa_private_key = load_pem_private_key(key_file.read(), password=None)
+    return rsa_private_key.sign(body.encode(), padding.PKCS1v15(), hashes.SHA256())
+
+
+def run(iterations: int = 500, batch_size: int = 50) -> dict:
+    cold = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        sign_cold(ORDER_BODY)
+        cold.append(time.perf_counter() - start)
+
+    signer = BodySigner(PRIVATE_RSA_KEY_PATH)
+    signer.sign(ORDER_BODY)  # Aquece a chave
+    warm = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        signer.sign(ORDER_BODY)
+        warm.append(time.perf_counter() - start)
+
+    batch = []
+    for _ in range(max(iterations // batch_size, 1)):
+        start = time.perf_counter()
+        signer.sign_batch([ORDER_BODY] * batch_size)
+        batch.append((time.perf_counter() - start) / batch_size)
+
+    return {
+        'sign_cold': summarize(cold),
+        'sign_warm': summarize(warm),
+        'sign_batch_per_order': summarize(batch)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=50)
+    args = parser.parse_args()
+
+    print("🔏 Benchmark de assinatura por ordem")
+    results = run(args.iterations, args.batch_size)
+    for name, summary in results.items():
+        print_summary(name, summary)
+
+    speedup = results['sign_cold']['p50_ms'] / results['sign_warm']['p50_ms']
+    print(f"⚡ Ganho no p50 (frio/quente): {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark do gravador do feed: custo de record() na thread do feed com a
+thread de gravação ativa, taxa de compressão e leitura a partir de um
+horário (usando o índice) versus ler o segmento do início
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bench_utils import summarize, print_summary
+
+from tick_recorder import TickRecorder, list_segments, read_recordings  # pylint: disable=import-error
+
+
+def build_frames(count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    tickers = ['WINV25', 'WDOV25', 'PETR4', 'VALE3']
+    frames = []
+    for _ in range(count):
+        price = round(rng.uniform(10, 130000), 1)
+        frames.append('{"type":1,"target":"Quote","arguments":[{"ticker":"%s","lastPrice":%s,"bid":%s,"ask":%s,'
+                      '"volume":%d}]}\x1e' % (rng.choice(tickers), price, price - 5, price + 5, rng.randint(1, 10 ** 7)))
+    return frames
+
+
+def run(messages: int = 200000, rate: float = 0.0) -> dict:
+    frames = build_frames(messages)
+    directory = tempfile.mkdtemp(prefix='bench_recorder_')
+    try:
+        recorder = TickRecorder(directory)
+        recorder.start()
+        base = time.time()
+        latencies = []
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            t0 = time.perf_counter()
+            recorder.record_raw(frame, ts=base + i * 0.001)
+            latencies.append(time.perf_counter() - t0)
+            if rate:
+                time.sleep(1 / rate)
+        produce_elapsed = time.perf_counter() - start
+        recorder.stop()
+        drain_elapsed = time.perf_counter() - start
+        stats = recorder.get_stats()
+
+        middle = base + messages * 0.001 / 2
+        start = time.perf_counter()
+        seeked = sum(1 for _ in read_recordings(directory, middle, middle + 1))
+        seek_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        scanned = sum(1 for record in read_recordings(directory) if middle <= record['ts'] < middle + 1)
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            'record': summarize(latencies),
+            'produce_msgs_per_sec': messages / produce_elapsed,
+            'written_msgs_per_sec': stats['written'] / drain_elapsed,
+            'compression_ratio': stats['compression_ratio'],
+            'bytes_per_msg': stats['bytes_compressed'] / max(1, stats['written']),
+            'dropped': stats['dropped'],
+            'segments': len(list_segments(directory)),
+            'seek_ms': seek_ms, 'scan_ms': scan_ms, 'seek_records': seeked, 'scan_records': scanned,
+            'disk_bytes': sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--rate', type=float, default=0.0, help='Mensagens/s do produtor (0 = sem pausa)')
+    args = parser.parse_args()
+
+    print("💾 Benchmark do gravador do feed")
+    result = run(args.messages, args.rate)
+    print_summary("record() na thread do feed", result['record'])
+    print(f"produção {result['produce_msgs_per_sec']:.0f} msgs/s, gravação {result['written_msgs_per_sec']:.0f} msgs/s, "
+          f"descartadas={result['dropped']}")
+    print(f"compressão {result['compression_ratio']:.1f}x ({result['bytes_per_msg']:.1f} bytes/msg), "
+          f"{result['segments']} segmento(s), {result['disk_bytes'] / 1e6:.1f} MB")
+    print(f"1 s a partir do meio: índice {result['seek_ms']:.1f} ms ({result['seek_records']} registros) "
+          f"vs leitura completa {result['scan_ms']:.1f} ms ({result['scan_records']})")
+
+
+if __name__ == "__main__":
+    main()
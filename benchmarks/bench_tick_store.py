@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark do histórico de ticks: custo do append, leitura de janelas de
+tempo (views) e memória ao longo de um pregão simulado (a memória alocada
+deve ficar estável depois que os buffers são criados)
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from bench_utils import summarize, print_summary
+
+from tick_store import TickStore  # pylint: disable=import-error
+
+
+def run(ticks: int = 1000000, tickers: int = 20, capacity: int = 50000) -> dict:
+    rng = random.Random(1)
+    universe = [f"TICK{i:03d}" for i in range(tickers)]
+    store = TickStore(capacity=capacity, max_tickers=tickers)
+    for ticker in universe:
+        store.append(ticker, 0.0, 100.0)  # Cria os buffers antes de medir
+
+    # Pregão de ~7h: timestamps crescentes espalhados no dia
+    step = 7 * 3600 / (2 * ticks)  # As duas passadas abaixo cobrem o dia
+    quotes = [(rng.choice(universe), {'lastPrice': 100 + rng.random(), 'bid': 99.9, 'ask': 100.1, 'volume': i})
+              for i in range(min(ticks, 100000))]
+
+    start = time.perf_counter()
+    for i in range(ticks):
+        ticker, quote = quotes[i % len(quotes)]
+        store.append_quote(ticker, quote, ts=i * step)
+    elapsed = time.perf_counter() - start
+
+    # Segunda passada (mais lenta, com tracemalloc) só para medir a memória alocada
+    tracemalloc.start()
+    base_memory = tracemalloc.get_traced_memory()[0]
+    checkpoints = []
+    for i in range(ticks):
+        ticker, quote = quotes[i % len(quotes)]
+        store.append_quote(ticker, quote, ts=(ticks + i) * step)
+        if i % (ticks // 10 or 1) == 0:
+            checkpoints.append(tracemalloc.get_traced_memory()[0] - base_memory)
+    tracemalloc.stop()
+
+    latencies = []
+    now = 2 * ticks * step
+    for _ in range(1000):
+        t0 = time.perf_counter()
+        window = store.window(rng.choice(universe), now - 300, now)
+        window['last'].mean()
+        latencies.append(time.perf_counter() - t0)
+
+    return {
+        'appends_per_sec': ticks / elapsed,
+        'us_per_append': elapsed / ticks * 1e6,
+        'memory_growth_bytes': checkpoints,
+        'buffer_bytes': store.get_stats()['memory_bytes'],
+        'window_5min': summarize(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=1000000)
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--capacity', type=int, default=50000)
+    args = parser.parse_args()
+
+    print("🗃️ Benchmark do histórico de ticks")
+    result = run(args.ticks, args.tickers, args.capacity)
+    print(f"append: {result['appends_per_sec']:.0f} ticks/s ({result['us_per_append']:.2f} us/tick)")
+    print(f"buffers: {result['buffer_bytes'] / 1e6:.1f} MB")
+    print(f"memória alocada durante o pregão (bytes, a cada 10%): {result['memory_growth_bytes']}")
+    print_summary("janela de 5 min + média", result['window_5min'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# bench_utils.py
+# Funções auxiliares compartilhadas pelos benchmarks
+
+import os
+import sys
+from typing import Dict, List
+
+# Adiciona o diretório ClearAPI ao path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'ClearAPI'))
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Percentil (interpolação linear) de uma lista já ordenada"""
+    if not sorted_samples:
+        return float('nan')
+    k = (len(sorted_samples) - 1) * pct / 100.0
+    f = int(k)
+    c = min(f + 1, len(sorted_samples) - 1)
+    return sorted_samples[f] + (sorted_samples[c] - sorted_samples[f]) * (k - f)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Resume amostras de latência (em segundos) em milissegundos"""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'mean_ms': (sum(ordered) / len(ordered)) * 1000 if ordered else float('nan'),
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000 if ordered else float('nan')
+    }
+
+
+def print_summary(name: str, summary: Dict[str, float]):
+    """Imprime uma linha com o resumo das latências"""
+    print(f"{name:<32} n={summary['count']:<6} "
+          f"p50={summary['p50_ms']:8.3f}ms p95={summary['p95_ms']:8.3f}ms "
+          f"p99={summary['p99_ms']:8.3f}ms max={summary['max_ms']:8.3f}ms")
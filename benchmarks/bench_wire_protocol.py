@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark do protocolo do /ws: bytes e tempo de codificação por tick no
+protocolo completo (quote_update) versus o compacto (deltas, JSON ou MessagePack)
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from bench_utils import ROOT_DIR
+
+sys.path.append(ROOT_DIR)
+os.chdir(ROOT_DIR)  # web_app monta frontend/static com caminho relativo
+import codec  # pylint: disable=import-error # noqa: E402
+from web_app import CompactQuoteEncoder, format_timestamp  # noqa: E402
+
+
+def build_ticks(count: int, tickers: int, seed: int = 1) -> list:
+    """Fluxo sintético: na maioria dos ticks só o preço e o volume mudam"""
+    rng = random.Random(seed)
+    state = {f"TICK{i:03d}": {'lastPrice': 100.0, 'bid': 99.99, 'ask': 100.01, 'volume': 0,
+                              'change': 0.0, 'changePercent': 0.0} for i in range(tickers)}
+    ticks = []
+    for _ in range(count):
+        ticker = rng.choice(list(state))
+        quote = state[ticker]
+        quote['lastPrice'] = round(quote['lastPrice'] + rng.choice((-0.01, 0.0, 0.01)), 2)
+        quote['volume'] += rng.randint(1, 50)
+        if rng.random() < 0.3:
+            quote['bid'] = round(quote['lastPrice'] - 0.01, 2)
+            quote['ask'] = round(quote['lastPrice'] + 0.01, 2)
+        if rng.random() < 0.1:
+            quote['change'] = round(quote['lastPrice'] - 100.0, 2)
+            quote['changePercent'] = round(quote['change'], 2)
+        ticks.append(dict(quote, ticker=ticker, timestamp=format_timestamp()))
+    return ticks
+
+
+def run(ticks: int = 20000, tickers: int = 20, batch: int = 1) -> dict:
+    stream = build_ticks(ticks, tickers)
+    results = {}
+
+    start = time.perf_counter()
+    size = sum(len(codec.dumps({'type': 'quote_update', 'data': data}).encode()) for data in stream)
+    results['full_json'] = {'bytes_per_tick': size / ticks, 'us_per_tick': (time.perf_counter() - start) / ticks * 1e6}
+
+    for encoding in ('json', 'msgpack'):
+        encoder = CompactQuoteEncoder(encoding)
+        size = 0
+        start = time.perf_counter()
+        for i in range(0, ticks, batch):
+            frame = encoder.encode([(data['ticker'], data) for data in stream[i:i + batch]])
+            if frame is not None:
+                size += len(frame.encode() if isinstance(frame, str) else frame)
+        results[f'compact_{encoding}'] = {'bytes_per_tick': size / ticks,
+                                          'us_per_tick': (time.perf_counter() - start) / ticks * 1e6}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=20000)
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=1, help='Ticks por frame no protocolo compacto')
+    args = parser.parse_args()
+
+    print("📦 Benchmark do protocolo do /ws")
+    for name, result in run(args.ticks, args.tickers, args.batch).items():
+        print(f"{name:<16} {result['bytes_per_tick']:8.1f} bytes/tick {result['us_per_tick']:8.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks de ponta a ponta contra o mock_server (sem rede):
+autenticação, assinatura, cotação REST, envio de ordem, parse do feed em
+websocket_client.on_message e latência tick -> navegador pelo web_app com N
+clientes do dashboard. Grava um JSON com p50/p95/p99 de cada métrica, e
+--compare aponta as regressões entre duas execuções.
+
+    python benchmarks/run_suite.py --output resultados/base.json
+    python benchmarks/run_suite.py --output resultados/novo.json --clients 100
+    python benchmarks/run_suite.py --compare resultados/base.json resultados/novo.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from bench_utils import ROOT_DIR, summarize, print_summary
+
+INVOCATION_DIR = os.getcwd()  # Caminhos de --output e --compare são relativos a ele
+sys.path.append(ROOT_DIR)
+os.chdir(ROOT_DIR)
+
+import websockets  # noqa: E402
+
+from mock_server import MockSettings, SyntheticMarket, RECORD_SEPARATOR, start_mock_server  # noqa: E402
+
+SCENARIOS = ['auth', 'signing', 'quote', 'order', 'ws_parse', 'tick_to_browser']
+SUITE_TICKERS = ['WDOV25', 'WINV25', 'PETR4', 'VALE3']
+REGRESSION_THRESHOLD_PCT = 10.0  # Piora percentual que conta como regressão
+REGRESSION_MIN_DELTA_MS = 0.05  # Diferenças menores que isso são ruído (latências)
+LATENCY_FIELDS = ('p50_ms', 'p95_ms', 'p99_ms')
+WEB_APP_START_TIMEOUT = 30.0
+SUMMARY_KEYS = set(summarize([0.0]))
+
+
+def timed(fn, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def configure_clients(mock):
+    """Aponta os módulos da ClearAPI já importados para o mock, sem limites de taxa"""
+    import auth  # pylint: disable=import-error
+    import rate_limiter  # pylint: disable=import-error
+    import rest_client  # pylint: disable=import-error
+    auth._auth_url = mock.auth_url
+    auth.invalidate_auth_token()
+    rest_client.configure_rest_client(base_url=mock.api_base_url, rate_limited=False)
+    # 50 ordens/minuto mediriam o limitador e não o caminho da ordem
+    rate_limiter._buckets[rate_limiter.ORDERS_BUCKET] = rate_limiter.TokenBucket(rate_limiter.ORDERS_BUCKET, 1e9, 1e9)
+
+
+# Cenários ###########################################################
+
+def bench_auth(mock, iterations: int) -> dict:
+    import auth  # pylint: disable=import-error
+    fetch = timed(auth._request_auth_token, iterations)
+    auth.get_auth_token()
+    return {
+        'auth_token_fetch': summarize(fetch),
+        'auth_token_cached': summarize(timed(auth.get_auth_token, iterations))
+    }
+
+
+def bench_signing(mock, iterations: int) -> dict:
+    from signature import get_signer  # pylint: disable=import-error
+    signer = get_signer()
+    body = json.dumps({'Module': 'DayTrade', 'Ticker': 'WDOV25', 'Side': 'Buy', 'Price': 5400.0, 'Quantity': 1,
+                       'TimeInForce': 'Day'})
+    signer.sign(body)  # Carrega a chave
+    return {'sign_body': summarize(timed(lambda: signer.sign(body), iterations))}
+
+
+def bench_quote(mock, iterations: int) -> dict:
+    from get_ticker_quote import get_ticker_quote  # pylint: disable=import-error
+    get_ticker_quote('WDOV25')  # Conexão e token
+    return {'quote_rest_round_trip': summarize(timed(lambda: get_ticker_quote('WDOV25'), iterations))}
+
+
+def bench_order(mock, iterations: int) -> dict:
+    from send_order import SendMarketOrderRequest, send_market_order  # pylint: disable=import-error
+    order = SendMarketOrderRequest('DayTrade', 'WDOV25', 'Buy', 1, 'Day')
+    send_market_order(order)
+    return {'order_submit_round_trip': summarize(timed(lambda: send_market_order(order), iterations))}
+
+
+def bench_ws_parse(mock, messages: int) -> dict:
+    """websocket_client.on_message sobre frames no formato do mock (Quotes e Books, alguns agrupados)"""
+    import websocket_client  # pylint: disable=import-error
+    market = SyntheticMarket(seed=3)
+    records = []
+    for i in range(messages):
+        quote, update = market.step(SUITE_TICKERS[i % len(SUITE_TICKERS)])
+        target, payload = ('Book', update) if i % 4 == 3 else ('Quote', quote)
+        records.append(json.dumps({'type': 1, 'target': target, 'arguments': [payload]}) + RECORD_SEPARATOR)
+    frames = []
+    i = 0
+    while i < len(records):
+        size = 3 if len(frames) % 10 == 0 else 1  # Um frame em cada dez com três registros
+        frames.append(''.join(records[i:i + size]))
+        i += size
+    received = []
+    callback = received.append
+    on_message = websocket_client.on_message
+    samples = []
+    start = time.perf_counter()
+    for frame in frames:
+        frame_start = time.perf_counter()
+        on_message(None, frame, callback)
+        samples.append(time.perf_counter() - frame_start)
+    elapsed = time.perf_counter() - start
+    return {'ws_on_message_frame': dict(summarize(samples), msgs_per_sec=len(received) / elapsed)}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_web_app(mock, port: int) -> subprocess.Popen:
+    env = dict(os.environ, **mock.env())
+    for name in ('CLEARAPI_REPLAY_DIR', 'CLEARAPI_RECORD_DIR'):
+        env.pop(name, None)
+    log = tempfile.TemporaryFile()  # Um pipe não lido poderia travar o web_app
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'web_app:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=log
+    )
+    deadline = time.monotonic() + WEB_APP_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"web_app encerrou: {log.read().decode(errors='replace')[-2000:]}")
+        try:
+            stats = requests.get(f'http://127.0.0.1:{port}/api/stats', timeout=1).json()['data']
+            if stats.get('clear_websocket', {}).get('connected'):
+                return process
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.1)
+    process.kill()
+    log.seek(0)
+    raise RuntimeError(f"web_app não conectou ao mock a tempo: {log.read().decode(errors='replace')[-2000:]}")
+
+
+async def _dashboard_client(port: int, tickers: list, sent: dict, samples: list, stop_at: float, counts: list):
+    async with websockets.connect(f'ws://127.0.0.1:{port}/ws', max_queue=None) as ws:
+        for ticker in tickers:
+            await ws.send(json.dumps({'type': 'subscribe', 'ticker': ticker, 'maxRate': 0}))  # 0 = o máximo aceito
+        received = 0
+        while True:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                raw = await asyncio.wait_for(ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                break
+            now = time.time()
+            message = json.loads(raw)
+            if message.get('type') != 'quote_update':
+                continue
+            data = message['data']
+            generated = sent.get((data['ticker'], data['volume']))
+            if generated is not None:
+                samples.append(now - generated)
+                received += 1
+        counts.append(received)
+
+
+def bench_tick_to_browser(mock, clients: int, seconds: float, tick_rate: float) -> dict:
+    """Do Quote gerado no mock até o quote_update recebido por cada cliente do dashboard"""
+    port = _free_port()
+    sent = {}
+    listener = lambda quote: sent.__setitem__((quote['ticker'], quote['volume']), time.time())  # noqa: E731
+    process = _start_web_app(mock, port)
+    mock.mock.tick_listeners.append(listener)
+    mock.settings.update(tick_rate=tick_rate)
+    ticks_before = mock.mock.stats['ticks']
+    samples, counts = [], []
+    try:
+        async def run():
+            stop_at = time.monotonic() + seconds
+            await asyncio.gather(*(
+                _dashboard_client(port, SUITE_TICKERS, sent, samples, stop_at, counts) for _ in range(clients)
+            ))
+        started = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - started
+    finally:
+        mock.mock.tick_listeners.remove(listener)
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    generated = mock.mock.stats['ticks'] - ticks_before
+    return {'tick_to_browser': dict(
+        summarize(samples),
+        clients=clients,
+        ticks_generated=generated,
+        deliveries_per_sec=len(samples) / elapsed,
+        min_client_deliveries=min(counts) if counts else 0
+    )}
+
+
+# Execução e comparação ##############################################
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run(scenarios=None, iterations: int = 300, messages: int = 20000, clients: int = 20, seconds: float = 5.0,
+        tick_rate: float = 200.0, latency_ms: float = 0.0, jitter_ms: float = 0.0) -> dict:
+    scenarios = scenarios or SCENARIOS
+    mock = start_mock_server(seed=1, **MockSettings(latency_ms=latency_ms, jitter_ms=jitter_ms).to_dict())
+    metrics = {}
+    try:
+        configure_clients(mock)
+        for name in scenarios:
+            print(f"▶️ {name}...")
+            if name == 'ws_parse':
+                metrics.update(bench_ws_parse(mock, messages))
+            elif name == 'tick_to_browser':
+                metrics.update(bench_tick_to_browser(mock, clients, seconds, tick_rate))
+            else:
+                metrics.update(globals()[f'bench_{name}'](mock, iterations))
+    finally:
+        mock.stop()
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'parameters': {'scenarios': scenarios, 'iterations': iterations, 'messages': messages,
+                           'clients': clients, 'seconds': seconds, 'tick_rate': tick_rate,
+                           'latency_ms': latency_ms, 'jitter_ms': jitter_ms}
+        },
+        'metrics': metrics
+    }
+
+
+def compare(base: dict, current: dict, threshold_pct: float = REGRESSION_THRESHOLD_PCT,
+            min_delta_ms: float = REGRESSION_MIN_DELTA_MS) -> list:
+    """
+    Compara as métricas em comum: latências (p50/p95/p99) pioram quando
+    sobem, vazões (*_per_sec) quando caem. Retorna uma linha por valor
+    comparado: (métrica, campo, base, atual, variação %, regressão?)
+    """
+    rows = []
+    for metric, base_values in base.get('metrics', {}).items():
+        current_values = current.get('metrics', {}).get(metric)
+        if current_values is None:
+            continue
+        for field in LATENCY_FIELDS + tuple(f for f in base_values if f.endswith('_per_sec')):
+            old, new = base_values.get(field), current_values.get(field)
+            if old is None or new is None or old != old or new != new:  # Ausente ou NaN
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            if field.endswith('_per_sec'):
+                regression = change < -threshold_pct
+            else:
+                regression = change > threshold_pct and new - old > min_delta_ms
+            rows.append((metric, field, old, new, change, regression))
+    return rows
+
+
+def print_comparison(rows: list, threshold_pct: float = REGRESSION_THRESHOLD_PCT) -> int:
+    regressions = 0
+    for metric, field, old, new, change, regression in rows:
+        flag = '❌ REGRESSÃO' if regression else ('✅' if abs(change) < threshold_pct else '⬆️' if (
+            change > 0) == field.endswith('_per_sec') else '⬇️')
+        regressions += regression
+        print(f"{metric:<26} {field:<20} {old:14.3f} -> {new:14.3f} ({change:+7.1f}%) {flag}")
+    print(f"{'❌' if regressions else '✅'} {regressions} regressão(ões) em {len(rows)} valores comparados")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks de ponta a ponta contra o mock_server")
+    parser.add_argument('--output', help="Arquivo JSON com os resultados")
+    parser.add_argument('--only', help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument('--iterations', type=int, default=300, help="Repetições dos cenários REST e de assinatura")
+    parser.add_argument('--messages', type=int, default=20000, help="Registros do cenário ws_parse")
+    parser.add_argument('--clients', type=int, default=20, help="Clientes do dashboard no tick_to_browser")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Duração do tick_to_browser")
+    parser.add_argument('--tick-rate', type=float, default=200.0, help="Ticks/s por ticker no tick_to_browser")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Latência simulada pelo mock")
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'ATUAL'), help="Compara dois arquivos de resultado")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD_PCT, help="Piora %% que é regressão")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(os.path.join(INVOCATION_DIR, args.compare[0])) as f:
+            base = json.load(f)
+        with open(os.path.join(INVOCATION_DIR, args.compare[1])) as f:
+            current = json.load(f)
+        print(f"📊 {base['meta'].get('commit') or args.compare[0]} -> {current['meta'].get('commit') or args.compare[1]}")
+        base_parameters, current_parameters = base['meta'].get('parameters', {}), current['meta'].get('parameters', {})
+        for name in sorted(set(base_parameters) | set(current_parameters)):
+            if base_parameters.get(name) != current_parameters.get(name):
+                print(f"⚠️ Parâmetro diferente entre as execuções: {name} "
+                      f"{base_parameters.get(name)} -> {current_parameters.get(name)}")
+        rows = compare(base, current, args.threshold)
+        sys.exit(1 if print_comparison(rows, args.threshold) else 0)
+
+    scenarios = [s.strip() for s in args.only.split(',')] if args.only else SCENARIOS
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Cenário(s) desconhecido(s): {', '.join(sorted(unknown))}")
+
+    print(f"🏁 Suíte de benchmarks contra o mock_server ({', '.join(scenarios)})")
+    results = run(scenarios, args.iterations, args.messages, args.clients, args.seconds, args.tick_rate,
+                  args.latency_ms, args.jitter_ms)
+    for name, summary in results['metrics'].items():
+        print_summary(name, summary)
+        extra = {k: v for k, v in summary.items() if k not in SUMMARY_KEYS}
+        if extra:
+            print(' ' * 33 + '  '.join(f"{k}={v:,.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in extra.items()))
+    if args.output:
+        output = os.path.join(INVOCATION_DIR, args.output)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Resultados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# stub_server.py
+# Servidor HTTP local mínimo que imita os endpoints REST usados pelos benchmarks
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Necessário para keep-alive
+    disable_nagle_algorithm = True  # Evita atraso de ACK entre headers e body
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith('/v1/marketdata/quote'):
+            ticker = parse_qs(url.query).get('Ticker', ['WDOV25'])[0]
+            self._send_json(200, {'ticker': ticker, 'lastPrice': 5432.5, 'bid': 5432.0, 'ask': 5433.0})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if self.path.endswith('/v1/auth'):
+            self._send_json(200, {'access_token': 'stub-token', 'expires_in': 3600})
+        elif '/v1/orders/send/' in self.path:
+            self._send_json(200, {'orderId': str(time.time_ns())})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0):
+    """Inicia o servidor em uma thread e retorna (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
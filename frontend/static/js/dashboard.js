@@ -3,6 +3,83 @@
  * Gerencia WebSocket, interface e dados em tempo real
  */
 
+/**
+ * Decodificador MessagePack mínimo (tipos usados pelo protocolo compacto do /ws)
+ */
+function decodeMsgpack(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(buffer);
+    const textDecoder = new TextDecoder();
+    let offset = 0;
+
+    const readStr = (size) => {
+        const value = textDecoder.decode(bytes.subarray(offset, offset + size));
+        offset += size;
+        return value;
+    };
+    const readBin = (size) => {
+        const value = bytes.slice(offset, offset + size);
+        offset += size;
+        return value;
+    };
+    const readArray = (size) => {
+        const value = new Array(size);
+        for (let i = 0; i < size; i++) value[i] = read();
+        return value;
+    };
+    const readMap = (size) => {
+        const value = {};
+        for (let i = 0; i < size; i++) {
+            const key = read();
+            value[key] = read();
+        }
+        return value;
+    };
+    const readNumber = (getter, size) => {
+        const value = view[getter](offset);
+        offset += size;
+        return typeof value === 'bigint' ? Number(value) : value;
+    };
+
+    function read() {
+        const type = bytes[offset++];
+        if (type < 0x80) return type;
+        if (type < 0x90) return readMap(type & 0x0f);
+        if (type < 0xa0) return readArray(type & 0x0f);
+        if (type < 0xc0) return readStr(type & 0x1f);
+        if (type >= 0xe0) return type - 0x100;
+        switch (type) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xc4: return readBin(readNumber('getUint8', 1));
+            case 0xc5: return readBin(readNumber('getUint16', 2));
+            case 0xc6: return readBin(readNumber('getUint32', 4));
+            case 0xca: return readNumber('getFloat32', 4);
+            case 0xcb: return readNumber('getFloat64', 8);
+            case 0xcc: return readNumber('getUint8', 1);
+            case 0xcd: return readNumber('getUint16', 2);
+            case 0xce: return readNumber('getUint32', 4);
+            case 0xcf: return readNumber('getBigUint64', 8);
+            case 0xd0: return readNumber('getInt8', 1);
+            case 0xd1: return readNumber('getInt16', 2);
+            case 0xd2: return readNumber('getInt32', 4);
+            case 0xd3: return readNumber('getBigInt64', 8);
+            case 0xd9: return readStr(readNumber('getUint8', 1));
+            case 0xda: return readStr(readNumber('getUint16', 2));
+            case 0xdb: return readStr(readNumber('getUint32', 4));
+            case 0xdc: return readArray(readNumber('getUint16', 2));
+            case 0xdd: return readArray(readNumber('getUint32', 4));
+            case 0xde: return readMap(readNumber('getUint16', 2));
+            case 0xdf: return readMap(readNumber('getUint32', 4));
+            default:
+                throw new Error(`Tipo MessagePack não suportado: 0x${type.toString(16)}`);
+        }
+    }
+
+    return read();
+}
+
 class TradingDashboard {
     constructor() {
         this.ws = null;
@@ -13,6 +90,12 @@ class TradingDashboard {
         this.subscribedTickers = new Set();
         this.quotesData = new Map();
         this.updateCount = 0;
+
+        // Protocolo do /ws: 'compact' envia só os campos alterados (deltas)
+        // e 'msgpack' usa frames binários
+        this.wireProtocol = { protocol: 'compact', encoding: 'msgpack' };
+        this.compactFields = null; // id curto -> nome do campo (recebido no hello_ack)
+        this.maxUpdateRate = 10; // Atualizações por segundo por ticker (limitadas no servidor)
         
         this.initializeElements();
         this.attachEventListeners();
@@ -85,6 +168,8 @@ class TradingDashboard {
             const wsUrl = `${protocol}//${window.location.host}/ws`;
             
             this.ws = new WebSocket(wsUrl);
+            this.ws.binaryType = 'arraybuffer';
+            this.compactFields = null;
 
             this.ws.onopen = () => {
                 console.log('WebSocket conectado');
@@ -93,6 +178,13 @@ class TradingDashboard {
                 this.updateConnectionStatus(true);
                 this.showLoading(false);
                 this.showToast('Conectado ao servidor', 'success');
+
+                // Negocia o protocolo compacto
+                this.sendMessage({
+                    type: 'hello',
+                    protocol: this.wireProtocol.protocol,
+                    encoding: this.wireProtocol.encoding
+                });
                 
                 // Solicita lista de tickers já subscritos
                 this.sendMessage({
@@ -102,7 +194,9 @@ class TradingDashboard {
 
             this.ws.onmessage = (event) => {
                 try {
-                    const message = JSON.parse(event.data);
+                    const message = typeof event.data === 'string'
+                        ? JSON.parse(event.data)
+                        : decodeMsgpack(event.data);
                     this.handleMessage(message);
                 } catch (error) {
                     console.error('Erro ao processar mensagem:', error);
@@ -151,10 +245,17 @@ class TradingDashboard {
     }
 
     handleMessage(message) {
+        if (message.t === 'q') {
+            this.handleCompactQuotes(message);
+            return;
+        }
         switch (message.type) {
             case 'quote_update':
                 this.handleQuoteUpdate(message.data);
                 break;
+            case 'hello_ack':
+                this.compactFields = message.protocol === 'compact' ? message.fields : null;
+                break;
             case 'subscription_confirmed':
                 this.handleSubscriptionConfirmed(message.ticker);
                 break;
@@ -183,6 +284,21 @@ class TradingDashboard {
         }
     }
 
+    handleCompactQuotes(frame) {
+        // Cada item: [ticker, snapshot (1) ou delta (0), {id curto: valor}]
+        if (!this.compactFields) return;
+        for (const [ticker, snapshot, values] of frame.q) {
+            const previous = this.quotesData.get(ticker);
+            if (!snapshot && !previous) continue; // Delta sem base: aguarda o próximo snapshot
+            const data = snapshot ? { ticker } : { ...previous };
+            for (const id in values) {
+                data[this.compactFields[id]] = values[id];
+            }
+            data.timestamp = frame.ts;
+            this.handleQuoteUpdate(data);
+        }
+    }
+
     handleSubscriptionConfirmed(ticker) {
         this.subscribedTickers.add(ticker);
         this.updateActiveTickersList();
@@ -221,7 +337,8 @@ class TradingDashboard {
         // Envia solicitação de subscrição
         this.sendMessage({
             type: 'subscribe',
-            ticker: ticker
+            ticker: ticker,
+            maxRate: this.maxUpdateRate
         });
 
         // Limpa o input
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita o simulador da ClearAPI: REST (auth, cotação, book,
+envio de ordens) e os WebSockets SignalR de market data e ordens (registros
+JSON terminados em \\u001e), com ticks sintéticos em taxa configurável,
+latência simulada e injeção de falhas (HTTP 500, respostas lentas e quedas
+de conexão). Permite rodar testes e benchmarks sem acesso à XP:
+
+    python mock_server.py --port 8001 --tick-rate 50
+
+    CLEARAPI_API_BASE_URL=http://127.0.0.1:8001/api \\
+    CLEARAPI_WS_BASE_URL=ws://127.0.0.1:8001 \\
+    CLEARAPI_AUTH_URL=http://127.0.0.1:8001/v1/auth python web_app.py
+
+Em testes, start_mock_server() sobe o servidor em uma thread e retorna as URLs.
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Set
+
+import uvicorn
+from fastapi import APIRouter, FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+
+RECORD_SEPARATOR = '\u001e'
+
+# Tickers conhecidos: preço inicial e tamanho do tick (outros começam em 100,00)
+MOCK_TICKERS = {
+    'WDOV25': (5400.0, 0.5),
+    'WINV25': (130000.0, 5.0),
+    'PETR4': (38.0, 0.01),
+    'VALE3': (61.0, 0.01)
+}
+MOCK_DEFAULT_TICKER = (100.0, 0.01)
+MOCK_BOOK_DEPTH = 10  # Níveis por lado no book sintético
+MOCK_MAX_BURST = 1000  # Ticks gerados de uma vez por ticker (quando o loop atrasa)
+MOCK_MIN_SLEEP_SECONDS = 0.001
+MOCK_SEND_QUEUE_MAX = 100000  # Registros pendentes por conexão (acima disso o cliente é desconectado)
+
+# SignalR
+MESSAGE_INVOCATION = 1
+MESSAGE_COMPLETION = 3
+MESSAGE_PING = 6
+MESSAGE_CLOSE = 7
+
+
+class MockSettings:
+    """Parâmetros do servidor; podem ser alterados com ele rodando (atributos ou POST /mock/settings)"""
+    def __init__(self, **overrides):
+        self.tick_rate = 10.0  # Ticks por segundo, por ticker assinado (0 = parado)
+        self.latency_ms = 0.0  # Atraso fixo das respostas REST e das mensagens do WebSocket
+        self.jitter_ms = 0.0  # Atraso adicional aleatório (0 a jitter_ms)
+        self.records_per_frame = 1  # Registros SignalR agrupados por frame, quando há fila
+        self.error_rate = 0.0  # Fração das requisições REST respondidas com 500
+        self.slow_rate = 0.0  # Fração das requisições REST atrasadas em slow_ms
+        self.slow_ms = 2000.0
+        self.disconnect_after = 0.0  # Segundos (±50%) até derrubar cada conexão WebSocket (0 = nunca)
+        self.ping_interval = 15.0  # Segundos entre pings SignalR
+        self.token_ttl = 3600  # Validade dos tokens emitidos
+        self.require_auth = True  # Exige Bearer válido no REST e no WebSocket
+        self.update(**overrides)
+
+    def update(self, **values):
+        for name, value in values.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Parâmetro desconhecido: {name}")
+            current = getattr(self, name)
+            setattr(self, name, type(current)(value))
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class _TickerState:
+    __slots__ = ('ticker', 'tick', 'bid_ticks', 'last', 'open', 'high', 'low', 'close', 'volume', 'trades',
+                 'bids', 'asks', 'sequence')
+
+    def __init__(self, ticker: str, price: float, tick: float):
+        self.ticker = ticker
+        self.tick = tick
+        self.bid_ticks = int(round(price / tick))
+        self.last = self.open = self.high = self.low = self.close = price
+        self.volume = 0
+        self.trades = 0
+        self.bids: Dict[int, int] = {}  # preço em ticks -> quantidade
+        self.asks: Dict[int, int] = {}
+        self.sequence = 0
+
+
+class SyntheticMarket:
+    """
+    Passeio aleatório por ticker com spread de um tick: cada step move o
+    book (às vezes), gera um negócio no bid ou no ask e retorna o Quote e a
+    atualização incremental do Book (níveis alterados, quantidade 0 remove).
+    """
+    def __init__(self, tickers: Optional[Dict[str, tuple]] = None, seed: Optional[int] = None,
+                 book_depth: int = MOCK_BOOK_DEPTH):
+        self.tickers = dict(MOCK_TICKERS if tickers is None else tickers)
+        self.book_depth = book_depth
+        self._rng = random.Random(seed)
+        self._states: Dict[str, _TickerState] = {}
+
+    def _state(self, ticker: str) -> _TickerState:
+        state = self._states.get(ticker)
+        if state is None:
+            price, tick = self.tickers.get(ticker, MOCK_DEFAULT_TICKER)
+            state = self._states[ticker] = _TickerState(ticker, price, tick)
+            self._reshape_book(state)
+        return state
+
+    def _price(self, state: _TickerState, ticks: int) -> float:
+        return round(ticks * state.tick, 8)
+
+    def _reshape_book(self, state: _TickerState) -> List[dict]:
+        """Ajusta os níveis à nova melhor oferta; retorna os níveis alterados"""
+        rng = self._rng
+        changes = []
+        best_bid = state.bid_ticks
+        best_ask = best_bid + 1
+        wanted_bids = set(range(best_bid - self.book_depth + 1, best_bid + 1))
+        wanted_asks = set(range(best_ask, best_ask + self.book_depth))
+        for levels, wanted, side in ((state.bids, wanted_bids, 'bid'), (state.asks, wanted_asks, 'ask')):
+            for price in [p for p in levels if p not in wanted]:
+                del levels[price]
+                changes.append({'side': side, 'price': self._price(state, price), 'quantity': 0})
+            for price in wanted:
+                if price not in levels:
+                    levels[price] = rng.randint(1, 50) * 5
+                    changes.append({'side': side, 'price': self._price(state, price), 'quantity': levels[price]})
+        return changes
+
+    def step(self, ticker: str):
+        """Avança um tick; retorna (quote, atualização do book)"""
+        rng = self._rng
+        state = self._state(ticker)
+        move = rng.random()
+        if move < 0.2:
+            state.bid_ticks -= 1
+        elif move > 0.8:
+            state.bid_ticks += 1
+        changes = self._reshape_book(state)
+        # Negócio no bid ou no ask consome parte do nível
+        if rng.random() < 0.5:
+            side, levels, price_ticks = 'bid', state.bids, state.bid_ticks
+        else:
+            side, levels, price_ticks = 'ask', state.asks, state.bid_ticks + 1
+        size = min(levels[price_ticks] - 1, rng.randint(1, 10)) if levels[price_ticks] > 1 else 0
+        if size > 0:
+            levels[price_ticks] -= size
+            changes.append({'side': side, 'price': self._price(state, price_ticks), 'quantity': levels[price_ticks]})
+        state.last = self._price(state, price_ticks)
+        state.high = max(state.high, state.last)
+        state.low = min(state.low, state.last)
+        state.volume += max(size, 1)
+        state.trades += 1
+        state.sequence += 1
+        update = {'ticker': ticker, 'sequence': state.sequence, 'updates': changes}
+        return self.quote(ticker), update
+
+    def quote(self, ticker: str) -> dict:
+        state = self._state(ticker)
+        change = state.last - state.close
+        return {
+            'ticker': ticker,
+            'lastPrice': state.last,
+            'bid': self._price(state, state.bid_ticks),
+            'ask': self._price(state, state.bid_ticks + 1),
+            'volume': state.volume,
+            'trades': state.trades,
+            'open': state.open,
+            'high': state.high,
+            'low': state.low,
+            'close': state.close,
+            'change': round(change, 8),
+            'changePercent': round(change / state.close * 100, 4) if state.close else 0.0,
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }
+
+    def book(self, ticker: str, depth: int = MOCK_BOOK_DEPTH) -> dict:
+        state = self._state(ticker)
+        bids = sorted(state.bids.items(), reverse=True)[:depth]
+        asks = sorted(state.asks.items())[:depth]
+        return {
+            'ticker': ticker,
+            'sequence': state.sequence,
+            'bids': [{'price': self._price(state, p), 'quantity': q} for p, q in bids],
+            'asks': [{'price': self._price(state, p), 'quantity': q} for p, q in asks]
+        }
+
+
+class _Connection:
+    """Uma conexão WebSocket: assinaturas e fila de saída com latência simulada"""
+    def __init__(self, websocket: WebSocket, route: str, server: "MockClearServer"):
+        self.websocket = websocket
+        self.route = route
+        self.server = server
+        self.quotes: Set[str] = set()
+        self.books: Set[str] = set()
+        self.orders = False
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_due = 0.0
+        self.closed = False
+
+    def send(self, record: str):
+        """Enfileira um registro já terminado em RECORD_SEPARATOR"""
+        if self.closed:
+            return
+        if self._queue.qsize() >= MOCK_SEND_QUEUE_MAX:
+            self.server.stats['slow_consumers'] += 1
+            self.closed = True
+            return
+        settings = self.server.settings
+        delay = (settings.latency_ms + random.uniform(0, settings.jitter_ms)) / 1000 if (
+            settings.latency_ms or settings.jitter_ms) else 0.0
+        # Não reordena: o registro sai depois do anterior, como em um socket TCP
+        due = max(self._last_due, time.monotonic() + delay)
+        self._last_due = due
+        self._queue.put_nowait((due, record))
+
+    async def writer(self):
+        queue = self._queue
+        stats = self.server.stats
+        try:
+            while not self.closed:
+                due, record = await queue.get()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                records = [record]
+                limit = self.server.settings.records_per_frame
+                while len(records) < limit and not queue.empty():
+                    due, record = queue.get_nowait()
+                    if due > time.monotonic():
+                        self._queue_front(due, record)
+                        break
+                    records.append(record)
+                await self.websocket.send_text(''.join(records))
+                stats['frames_sent'] += 1
+                stats['messages_sent'] += len(records)
+            await self.websocket.close(code=1008)  # Consumidor lento
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.closed = True  # Cliente desconectou
+
+    def _queue_front(self, due: float, record: str):
+        # asyncio.Queue não tem appendleft: reinsere na frente da deque interna
+        self._queue._queue.appendleft((due, record))
+
+
+class MockClearServer:
+    """Estado do servidor (mercado sintético, ordens, conexões) e a aplicação FastAPI"""
+    def __init__(self, settings: Optional[MockSettings] = None, tickers: Optional[Dict[str, tuple]] = None,
+                 seed: Optional[int] = None):
+        self.settings = settings or MockSettings()
+        self.market = SyntheticMarket(tickers, seed)
+        self._rng = random.Random(seed)
+        self._tokens: Dict[str, float] = {}  # token -> expiração
+        self._order_ids = itertools.count(1)
+        self.orders: Dict[str, dict] = {}
+        self._resting: Dict[str, List[dict]] = {}  # ticker -> ordens limitadas aguardando preço
+        self.connections: Set[_Connection] = set()
+        self._producers: Dict[str, asyncio.Task] = {}
+        self.tick_listeners: List[Callable[[dict], None]] = []  # Chamados com cada Quote gerado (ex.: medir latência)
+        self.stats = {
+            'rest_requests': 0,
+            'errors_injected': 0,
+            'slow_injected': 0,
+            'unauthorized': 0,
+            'ws_connections': 0,
+            'disconnects_injected': 0,
+            'slow_consumers': 0,
+            'ticks': 0,
+            'messages_sent': 0,
+            'frames_sent': 0,
+            'orders': 0
+        }
+        self.app = self._build_app()
+
+    # Autenticação ###############################################
+    def _issue_token(self) -> str:
+        now = int(time.time())
+        encode = lambda data: base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()  # noqa: E731
+        token = '.'.join((
+            encode({'alg': 'none', 'typ': 'JWT'}),
+            encode({'sub': 'mock-clear', 'iat': now, 'exp': now + self.settings.token_ttl,
+                    'jti': f"{self._rng.getrandbits(128):032x}"}),
+            base64.urlsafe_b64encode(self._rng.getrandbits(256).to_bytes(32, 'big')).rstrip(b'=').decode()
+        ))
+        self._tokens[token] = now + self.settings.token_ttl
+        return token
+
+    def _authorized(self, authorization: Optional[str]) -> bool:
+        if not self.settings.require_auth:
+            return True
+        if not authorization or not authorization.startswith('Bearer '):
+            return False
+        expires = self._tokens.get(authorization[7:])
+        return expires is not None and expires > time.time()
+
+    # Falhas e latência do REST ##################################
+    async def _rest_faults(self) -> Optional[JSONResponse]:
+        """Aplica latência e falhas configuradas; retorna a resposta de erro, se sorteada"""
+        settings = self.settings
+        self.stats['rest_requests'] += 1
+        delay = settings.latency_ms + (self._rng.uniform(0, settings.jitter_ms) if settings.jitter_ms else 0.0)
+        if settings.slow_rate and self._rng.random() < settings.slow_rate:
+            self.stats['slow_injected'] += 1
+            delay += settings.slow_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if settings.error_rate and self._rng.random() < settings.error_rate:
+            self.stats['errors_injected'] += 1
+            return JSONResponse(status_code=500, content={
+                'errorResponse': [{'code': 'MOCK-500', 'message': 'Falha simulada pelo mock_server'}]
+            })
+        return None
+
+    async def _guard(self, request: Request) -> Optional[JSONResponse]:
+        error = await self._rest_faults()
+        if error is not None:
+            return error
+        if not self._authorized(request.headers.get('Authorization')):
+            self.stats['unauthorized'] += 1
+            return JSONResponse(status_code=401, content={'message': 'Token inválido ou expirado'})
+        return None
+
+    # Ordens #####################################################
+    def _submit_order(self, kind: str, body: dict) -> dict:
+        order_id = f"MOCK-{next(self._order_ids)}"
+        order = {
+            'orderId': order_id,
+            'type': kind,
+            'module': body.get('Module'),
+            'ticker': body['Ticker'],
+            'side': body['Side'],
+            'quantity': body['Quantity'],
+            'price': body.get('Price'),
+            'timeInForce': body.get('TimeInForce'),
+            'status': 'New',
+            'filledQuantity': 0,
+            'averagePrice': None,
+            'createdAt': datetime.now(timezone.utc).isoformat()
+        }
+        self.orders[order_id] = order
+        self.stats['orders'] += 1
+        self._publish_order(order)
+        quote = self.market.quote(order['ticker'])
+        if kind == 'market':
+            self._fill(order, quote['ask'] if order['side'] == 'Buy' else quote['bid'])
+        elif self._crosses(order, quote):
+            self._fill(order, order['price'])
+        elif order['timeInForce'] in ('ImmediateOrCancel', 'FillOrKill'):
+            order['status'] = 'Cancelled'
+            self._publish_order(order)
+        else:
+            self._resting.setdefault(order['ticker'], []).append(order)
+        return order
+
+    @staticmethod
+    def _crosses(order: dict, quote: dict) -> bool:
+        if order['side'] == 'Buy':
+            return quote['ask'] <= order['price']
+        return quote['bid'] >= order['price']
+
+    def _fill(self, order: dict, price: float):
+        order['status'] = 'Filled'
+        order['filledQuantity'] = order['quantity']
+        order['averagePrice'] = price
+        self._publish_order(order)
+
+    def _publish_order(self, order: dict):
+        record = json.dumps({'type': MESSAGE_INVOCATION, 'target': 'OrderStatus', 'arguments': [dict(order)]}) \
+            + RECORD_SEPARATOR
+        for connection in self.connections:
+            if connection.orders:
+                connection.send(record)
+
+    # Market data ################################################
+    def _publish_tick(self, ticker: str):
+        quote, update = self.market.step(ticker)
+        self.stats['ticks'] += 1
+        for listener in self.tick_listeners:
+            listener(quote)
+        quote_record = book_record = None
+        for connection in self.connections:
+            if ticker in connection.quotes:
+                if quote_record is None:
+                    quote_record = json.dumps({'type': MESSAGE_INVOCATION, 'target': 'Quote',
+                                               'arguments': [quote]}) + RECORD_SEPARATOR
+                connection.send(quote_record)
+            if ticker in connection.books:
+                if book_record is None:
+                    book_record = json.dumps({'type': MESSAGE_INVOCATION, 'target': 'Book',
+                                              'arguments': [update]}) + RECORD_SEPARATOR
+                connection.send(book_record)
+        resting = self._resting.get(ticker)
+        if resting:
+            for order in [o for o in resting if self._crosses(o, quote)]:
+                resting.remove(order)
+                self._fill(order, order['price'])
+
+    def _has_subscribers(self, ticker: str) -> bool:
+        return any(ticker in c.quotes or ticker in c.books for c in self.connections)
+
+    def _ensure_producer(self, ticker: str):
+        task = self._producers.get(ticker)
+        if task is None or task.done():
+            self._producers[ticker] = asyncio.create_task(self._produce(ticker))
+
+    async def _produce(self, ticker: str):
+        """Gera tick_rate ticks por segundo enquanto houver assinantes (em rajadas se o loop atrasar)"""
+        loop = asyncio.get_running_loop()
+        rate = None
+        while self._has_subscribers(ticker):
+            if self.settings.tick_rate != rate:
+                rate = self.settings.tick_rate
+                started, produced = loop.time(), 0
+            if rate <= 0:
+                await asyncio.sleep(0.1)
+                continue
+            due = int((loop.time() - started) * rate) - produced
+            for _ in range(min(due, MOCK_MAX_BURST)):
+                self._publish_tick(ticker)
+            produced += due  # Rajada acima de MOCK_MAX_BURST é descartada, não acumulada
+            await asyncio.sleep(max(1.0 / rate, MOCK_MIN_SLEEP_SECONDS))
+        self._producers.pop(ticker, None)
+
+    # WebSocket ##################################################
+    def _on_invocation(self, connection: _Connection, message: dict):
+        target = message.get('target')
+        arguments = message.get('arguments') or []
+        ticker = arguments[0] if arguments else None
+        if target == 'SubscribeQuote' and ticker:
+            connection.quotes.add(ticker)
+            connection.send(json.dumps({'type': MESSAGE_INVOCATION, 'target': 'Quote',
+                                        'arguments': [self.market.quote(ticker)]}) + RECORD_SEPARATOR)
+            self._ensure_producer(ticker)
+        elif target == 'SubscribeBook' and ticker:
+            connection.books.add(ticker)
+            connection.send(json.dumps({'type': MESSAGE_INVOCATION, 'target': 'Book',
+                                        'arguments': [self.market.book(ticker)]}) + RECORD_SEPARATOR)
+            self._ensure_producer(ticker)
+        elif target == 'UnsubscribeQuote' and ticker:
+            connection.quotes.discard(ticker)
+        elif target == 'UnsubscribeBook' and ticker:
+            connection.books.discard(ticker)
+        elif target == 'SubscribeOrdersStatus':
+            connection.orders = True
+        elif target == 'UnsubscribeOrdersStatus':
+            connection.orders = False
+        if message.get('invocationId') is not None:
+            connection.send(json.dumps({'type': MESSAGE_COMPLETION, 'invocationId': message['invocationId'],
+                                        'result': None}) + RECORD_SEPARATOR)
+
+    async def _pinger(self, connection: _Connection):
+        ping = json.dumps({'type': MESSAGE_PING}) + RECORD_SEPARATOR
+        while not connection.closed:
+            await asyncio.sleep(self.settings.ping_interval)
+            connection.send(ping)
+
+    async def _disconnect_later(self, connection: _Connection, seconds: float):
+        await asyncio.sleep(seconds * self._rng.uniform(0.5, 1.5))
+        if not connection.closed:
+            self.stats['disconnects_injected'] += 1
+            await self._drop(connection)
+
+    async def _drop(self, connection: _Connection):
+        connection.closed = True
+        try:
+            await connection.websocket.close(code=1011)  # Queda do lado do servidor
+        except RuntimeError:
+            pass
+
+    async def handle_websocket(self, websocket: WebSocket, route: str):
+        if not self._authorized(websocket.headers.get('Authorization')):
+            self.stats['unauthorized'] += 1
+            await websocket.close(code=1008)
+            return
+        await websocket.accept()
+        connection = _Connection(websocket, route, self)
+        self.connections.add(connection)
+        self.stats['ws_connections'] += 1
+        tasks = [asyncio.create_task(connection.writer()), asyncio.create_task(self._pinger(connection))]
+        if self.settings.disconnect_after > 0:
+            tasks.append(asyncio.create_task(self._disconnect_later(connection, self.settings.disconnect_after)))
+        handshaken = False
+        try:
+            while not connection.closed:
+                data = await websocket.receive_text()
+                for raw in data.split(RECORD_SEPARATOR):
+                    if not raw.strip():
+                        continue
+                    message = json.loads(raw)
+                    if not handshaken:
+                        # Primeiro registro: {"protocol": "json", "version": 1}
+                        handshaken = True
+                        connection.send('{}' + RECORD_SEPARATOR)
+                        continue
+                    message_type = message.get('type')
+                    if message_type == MESSAGE_INVOCATION:
+                        self._on_invocation(connection, message)
+                    elif message_type == MESSAGE_CLOSE:
+                        connection.closed = True
+        except (WebSocketDisconnect, RuntimeError, ValueError):
+            pass
+        finally:
+            connection.closed = True
+            self.connections.discard(connection)
+            for task in tasks:
+                task.cancel()
+
+    async def disconnect_all(self) -> int:
+        connections = list(self.connections)
+        for connection in connections:
+            await self._drop(connection)
+        return len(connections)
+
+    # Aplicação ##################################################
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Mock ClearAPI", description="Simulador local da ClearAPI para testes e benchmarks")
+        router = APIRouter()
+
+        @router.post('/v1/auth')
+        async def auth(request: Request):
+            error = await self._rest_faults()
+            if error is not None:
+                return error
+            body = await request.json()
+            if not body.get('API_KEY') or not body.get('API_SECRET'):
+                return JSONResponse(status_code=401, content={'message': 'API_KEY e API_SECRET são obrigatórios'})
+            return {'access_token': self._issue_token(), 'token_type': 'Bearer', 'expires_in': self.settings.token_ttl}
+
+        @router.get('/v1/marketdata/quote')
+        async def quote(request: Request, Ticker: str):  # noqa: N803 (nome do parâmetro da API)
+            error = await self._guard(request)
+            if error is not None:
+                return error
+            return self.market.quote(Ticker.upper())
+
+        @router.get('/v1/marketdata/book')
+        async def book(request: Request, Ticker: str):  # noqa: N803
+            error = await self._guard(request)
+            if error is not None:
+                return error
+            return self.market.book(Ticker.upper())
+
+        @router.post('/v1/orders/send/{kind}')
+        async def send_order(request: Request, kind: str):
+            error = await self._guard(request)
+            if error is not None:
+                return error
+            if kind not in ('market', 'limited'):
+                return JSONResponse(status_code=404, content={'message': f'Tipo de ordem desconhecido: {kind}'})
+            if not request.headers.get('BODY_SIGNATURE'):
+                return JSONResponse(status_code=400, content={'message': 'BODY_SIGNATURE ausente'})
+            body = await request.json()
+            missing = [f for f in ('Ticker', 'Side', 'Quantity') + (('Price',) if kind == 'limited' else ()) if f not in body]
+            if missing or body.get('Side') not in ('Buy', 'Sell'):
+                return JSONResponse(status_code=500, content={'errorResponse': [
+                    {'code': 'INVALID-ORDER', 'message': f"Campos inválidos ou ausentes: {missing or ['Side']}"}
+                ]})
+            order = self._submit_order(kind, body)
+            return {'orderId': order['orderId']}
+
+        @router.get('/v1/orders')
+        async def list_orders(request: Request):
+            error = await self._guard(request)
+            if error is not None:
+                return error
+            return list(self.orders.values())
+
+        app.include_router(router)
+        app.include_router(router, prefix='/api')  # Mesmo caminho do API_BASE_URL do simulador
+
+        @app.websocket('/ws/v1/marketdata')
+        async def marketdata(websocket: WebSocket):
+            await self.handle_websocket(websocket, 'marketdata')
+
+        @app.websocket('/ws/v1/orders')
+        async def orders(websocket: WebSocket):
+            await self.handle_websocket(websocket, 'orders')
+
+        # Controle do mock (testes e benchmarks em outro processo)
+        @app.get('/mock/settings')
+        async def get_settings():
+            return self.settings.to_dict()
+
+        @app.post('/mock/settings')
+        async def set_settings(request: Request):
+            try:
+                self.settings.update(**(await request.json()))
+            except ValueError as e:
+                return JSONResponse(status_code=400, content={'message': str(e)})
+            return self.settings.to_dict()
+
+        @app.post('/mock/disconnect')
+        async def disconnect():
+            return {'disconnected': await self.disconnect_all()}
+
+        @app.get('/mock/stats')
+        async def stats():
+            return dict(self.stats, connections=len(self.connections), producers=len(self._producers))
+
+        return app
+
+
+class RunningMockServer:
+    """Servidor iniciado por start_mock_server (uvicorn em uma thread)"""
+    def __init__(self, mock: MockClearServer, server: uvicorn.Server, thread: threading.Thread, host: str, port: int):
+        self.mock = mock
+        self.settings = mock.settings
+        self._server = server
+        self._thread = thread
+        self.host = host
+        self.port = port
+        self.base_url = f"http://{host}:{port}"
+        self.api_base_url = f"{self.base_url}/api"
+        self.auth_url = f"{self.base_url}/v1/auth"
+        self.ws_base_url = f"ws://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam os clientes da ClearAPI para este servidor"""
+        return {
+            'CLEARAPI_API_BASE_URL': self.api_base_url,
+            'CLEARAPI_AUTH_URL': self.auth_url,
+            'CLEARAPI_WS_BASE_URL': self.ws_base_url
+        }
+
+    def stop(self, timeout: float = 5.0):
+        self._server.should_exit = True
+        self._thread.join(timeout)
+
+
+def start_mock_server(host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None,
+                      **settings) -> RunningMockServer:
+    """Inicia o mock em uma thread (port=0 escolhe uma porta livre) e espera ele aceitar conexões"""
+    mock = MockClearServer(MockSettings(**settings), seed=seed)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    config = uvicorn.Config(mock.app, log_level='warning', lifespan='off', ws_ping_interval=None)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, name='mock-clear-server', daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("mock_server não iniciou")
+        time.sleep(0.01)
+    return RunningMockServer(mock, server, thread, host, sock.getsockname()[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador local da ClearAPI (REST + WebSocket SignalR)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--seed', type=int, default=None)
+    defaults = MockSettings()
+    for name, value in defaults.to_dict().items():
+        option = '--' + name.replace('_', '-')
+        if isinstance(value, bool):
+            parser.add_argument(option, type=lambda v: v.lower() in ('1', 'true', 'sim'), default=value)
+        else:
+            parser.add_argument(option, type=type(value), default=value)
+    args = parser.parse_args()
+    settings = MockSettings(**{name: getattr(args, name) for name in defaults.to_dict()})
+    mock = MockClearServer(settings, seed=args.seed)
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Mock da ClearAPI em {base} ({settings.tick_rate:g} ticks/s por ticker)")
+    print(f"   CLEARAPI_API_BASE_URL={base}/api")
+    print(f"   CLEARAPI_AUTH_URL={base}/v1/auth")
+    print(f"   CLEARAPI_WS_BASE_URL=ws://{args.host}:{args.port}")
+    uvicorn.run(mock.app, host=args.host, port=args.port, log_level='warning', ws_ping_interval=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente REST assíncrono contra um stub ASGI local (sem rede)
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import auth  # pylint: disable=import-error # noqa: E402
+from async_client import AsyncClearClient  # pylint: disable=import-error # noqa: E402
+from send_order import SendMarketOrderRequest  # pylint: disable=import-error # noqa: E402
+
+
+def build_stub_app(state: dict) -> FastAPI:
+    stub = FastAPI()
+
+    @stub.post("/auth")
+    async def stub_auth():
+        state['auth_calls'] += 1
+        return {'access_token': 'stub-token', 'expires_in': 3600}
+
+    @stub.get("/api/v1/marketdata/quote")
+    async def stub_quote(Ticker: str, request: Request):
+        state['quote_calls'].append(Ticker)
+        if Ticker == 'ERRO':
+            return JSONResponse({'message': 'ticker inválido'}, status_code=400)
+        state['in_flight'] += 1
+        state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        await asyncio.sleep(0.01)
+        state['in_flight'] -= 1
+        assert request.headers['authorization'] == 'Bearer stub-token'
+        return {'ticker': Ticker, 'lastPrice': 10.5}
+
+    @stub.post("/api/v1/orders/send/market")
+    async def stub_market_order(request: Request):
+        assert request.headers['body_signature']
+        return {'orderId': 'abc123'}
+
+    return stub
+
+
+def test_cotacoes_e_ordens_contra_stub():
+    auth.invalidate_auth_token()
+    state = {'auth_calls': 0, 'in_flight': 0, 'max_in_flight': 0, 'quote_calls': []}
+    transport = httpx.ASGITransport(app=build_stub_app(state))
+
+    async def run():
+        async with AsyncClearClient(
+            base_url="http://stub/api",
+            auth_url="http://stub/auth",
+            max_concurrency=3,
+            transport=transport
+        ) as client:
+            quotes = await asyncio.gather(*[client.get_ticker_quote(f"T{i}") for i in range(10)])
+            order = await client.send_market_order(SendMarketOrderRequest('DayTrade', 'WDOV25', 'Buy', 1, 'Day'))
+            return quotes, order
+
+    quotes, order = asyncio.run(run())
+    auth.invalidate_auth_token()
+
+    assert [q['ticker'] for q in quotes] == [f"T{i}" for i in range(10)]
+    assert order.order_id == 'abc123'
+    assert state['auth_calls'] == 1
+    assert state['max_in_flight'] <= 3
+
+
+def test_cotacoes_em_lote_agrupam_requisicoes_identicas():
+    auth.invalidate_auth_token()
+    state = {'auth_calls': 0, 'in_flight': 0, 'max_in_flight': 0, 'quote_calls': []}
+    transport = httpx.ASGITransport(app=build_stub_app(state))
+
+    async def run():
+        async with AsyncClearClient(base_url="http://stub/api", auth_url="http://stub/auth", transport=transport) as client:
+            return await asyncio.gather(
+                client.get_ticker_quotes(["petr4", "VALE3", "PETR4", "ERRO"], return_exceptions=True),
+                client.get_ticker_quotes(["PETR4"])
+            )
+
+    batch, single = asyncio.run(run())
+    auth.invalidate_auth_token()
+
+    assert list(batch) == ["PETR4", "VALE3", "ERRO"]
+    assert batch["PETR4"]['lastPrice'] == 10.5
+    assert isinstance(batch["ERRO"], Exception)
+    assert single["PETR4"] == batch["PETR4"]
+    assert sorted(state['quote_calls']) == ["ERRO", "PETR4", "VALE3"]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente WebSocket asyncio contra um servidor websockets local (sem rede)
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+import websockets  # noqa: E402
+
+import async_websocket_client  # pylint: disable=import-error # noqa: E402
+from async_websocket_client import AsyncClearWebSocket, OVERFLOW_DROP_OLDEST  # pylint: disable=import-error # noqa: E402
+
+RS = '\u001e'
+
+
+@pytest.fixture(autouse=True)
+def sem_autenticacao_nem_espera(monkeypatch):
+    async def fake_token():
+        return 'stub-token'
+    monkeypatch.setattr(async_websocket_client, 'get_auth_token_async', fake_token)
+    monkeypatch.setattr(async_websocket_client, '_backoff_delay', lambda attempt: 0.01)
+
+
+def quote_frame(ticker, price):
+    return json.dumps({'type': 1, 'target': 'Quote', 'arguments': [{'ticker': ticker, 'lastPrice': price}]}) + RS
+
+
+def test_reconecta_e_reenvia_assinaturas():
+    received_by_connection = []
+
+    async def handler(ws):
+        records = []
+        received_by_connection.append(records)
+        assert ws.request_headers['Authorization'] == 'Bearer stub-token'
+        for _ in range(2):  # Handshake + assinatura
+            records.append(json.loads((await ws.recv()).rstrip(RS)))
+        # Dois registros no mesmo frame
+        await ws.send(quote_frame('PETR4', len(received_by_connection)) + quote_frame('VALE3', 1.0))
+        if len(received_by_connection) == 1:
+            await ws.close()  # Força a reconexão
+        else:
+            await asyncio.sleep(1)
+
+    async def run():
+        async with websockets.serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            feed = AsyncClearWebSocket('marketdata', url=f'ws://127.0.0.1:{port}')
+            await feed.subscribe_quote('PETR4')  # Antes de conectar: enviada ao abrir
+            await feed.start()
+            messages = []
+            async for message in feed:
+                messages.append(message)
+                if len(messages) == 4:
+                    break
+            stats = feed.get_stats()
+            await feed.close()
+            return messages, stats
+
+    messages, stats = asyncio.run(asyncio.wait_for(run(), 10))
+
+    assert [m['arguments'][0]['lastPrice'] for m in messages if m['arguments'][0]['ticker'] == 'PETR4'] == [1, 2]
+    assert stats['reconnects'] == 1
+    for records in received_by_connection:
+        assert records[0] == {'protocol': 'json', 'version': 1}
+        assert records[1]['target'] == 'SubscribeQuote' and records[1]['arguments'] == ['PETR4']
+
+
+def test_fila_limitada_descarta_mais_antigas():
+    async def handler(ws):
+        await ws.recv()  # Handshake
+        await ws.send(''.join(quote_frame('PETR4', i) for i in range(10)))
+        await asyncio.sleep(1)
+
+    async def run():
+        async with websockets.serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            feed = AsyncClearWebSocket('marketdata', url=f'ws://127.0.0.1:{port}', queue_size=3, overflow=OVERFLOW_DROP_OLDEST)
+            await feed.start()
+            while feed.get_stats()['received'] < 10:
+                await asyncio.sleep(0.01)
+            messages = [await feed.__anext__() for _ in range(3)]
+            stats = feed.get_stats()
+            await feed.close()
+            return messages, stats
+
+    messages, stats = asyncio.run(asyncio.wait_for(run(), 10))
+
+    assert [m['arguments'][0]['lastPrice'] for m in messages] == [7, 8, 9]
+    assert stats['dropped'] == 7
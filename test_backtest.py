@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Testes do backtest: execuções simuladas, equivalência entre o modo
+vetorizado e o por eventos e varredura de parâmetros
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config")  # send_order depende das credenciais
+
+import backtest  # pylint: disable=import-error # noqa: E402
+from candles import CandleAggregator  # pylint: disable=import-error # noqa: E402
+from rate_limiter import RateLimitExceeded  # pylint: disable=import-error # noqa: E402
+from send_order import SendLimitedOrderRequest, SendMarketOrderRequest  # pylint: disable=import-error # noqa: E402
+from strategies import MovingAverageCross  # pylint: disable=import-error # noqa: E402
+from tick_recorder import TickRecorder  # pylint: disable=import-error # noqa: E402
+from tick_store import TICK_DTYPE  # pylint: disable=import-error # noqa: E402
+
+BASE = 1792260000.0
+
+
+def make_ticks(prices, spread: float = 0.0, start: float = BASE, step: float = 1.0) -> np.ndarray:
+    prices = np.asarray(prices, dtype=float)
+    ticks = np.zeros(len(prices), dtype=TICK_DTYPE)
+    ticks['ts'] = start + np.arange(len(prices)) * step
+    ticks['last'] = prices
+    ticks['bid'] = prices - spread / 2
+    ticks['ask'] = prices + spread / 2
+    ticks['volume'] = np.arange(len(prices)) * 10
+    return ticks
+
+
+def random_ticks(count: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return make_ticks(5000.0 + np.cumsum(rng.choice([-0.5, 0.0, 0.5], size=count)), spread=0.5)
+
+
+def test_vetorizado_executa_no_tick_seguinte_no_bid_ask():
+    ticks = make_ticks([100, 101, 103, 102, 104], spread=1.0)
+    # Compra após o tick 0 (executa no ask do tick 1 = 101.5), zera após o tick 2 (bid do tick 3 = 101.5)
+    report = backtest.run_vectorized(ticks, [1, 1, 0, 0, 0], multiplier=10.0, commission=2.0, keep_equity=True)
+    assert report['fills'] == 2
+    assert report['costs'] == 4.0
+    assert report['net_pnl'] == pytest.approx((101.5 - 101.5) * 10 - 4.0)
+    assert report['round_trips'] == 1
+    assert report['final_position'] == 0
+    # Marcado no último: comprado a 101.5 e último 103 no tick 2
+    assert report['equity'][2] == pytest.approx((103 - 101.5) * 10 - 2.0)
+
+
+def test_drawdown_maximo():
+    ticks = make_ticks([100, 100, 110, 90, 95])
+    report = backtest.run_vectorized(ticks, [1, 1, 1, 1, 1])
+    assert report['net_pnl'] == pytest.approx(-5.0)
+    assert report['max_drawdown'] == pytest.approx(20.0)
+
+
+def test_vetorizado_e_eventos_dao_o_mesmo_resultado():
+    ticks = random_ticks(20000)
+    options = {'multiplier': 10.0, 'commission': 1.5, 'slippage': 0.5}
+    strategy = MovingAverageCross('WDOV25', fast=5, slow=30, quantity=2)
+    vectorized = backtest.run_vectorized(ticks, strategy.target_positions(ticks), **options)
+    events = backtest.run_events(ticks, 'WDOV25', MovingAverageCross('WDOV25', fast=5, slow=30, quantity=2).bind, **options)
+    assert vectorized['fills'] > 10
+    assert events['fills'] == vectorized['fills']
+    assert events['round_trips'] == vectorized['round_trips']
+    assert events['net_pnl'] == pytest.approx(vectorized['net_pnl'])
+    assert events['max_drawdown'] == pytest.approx(vectorized['max_drawdown'])
+    assert events['costs'] == pytest.approx(vectorized['costs'])
+
+
+def test_ordem_limitada_day_espera_o_preco():
+    ticks = make_ticks([100, 101, 99, 98, 100], spread=1.0)
+    fills = []
+
+    def make_strategy(broker):
+        def on_message(message):
+            if not fills:
+                fills.append(broker.send_limited_order(SendLimitedOrderRequest('DayTrade', 'X', 'Buy', 99.5, 1, 'Day')))
+        return on_message
+
+    report = backtest.run_events(ticks, 'X', make_strategy, keep_equity=True)
+    assert report['fills'] == 1
+    assert report['final_position'] == 1
+    # Só o ask do tick 2 (99.5) atinge o limite; executa no preço limite
+    assert report['equity'][1] == 0.0
+    assert report['equity'][4] == pytest.approx(100 - 99.5)
+
+
+def test_ordem_limitada_ioc_e_cancelada_e_day_expira_na_virada_do_dia():
+    broker = backtest.SimulatedBroker(utc_offset=0)
+    day = 86400.0 * 20000
+    broker.on_tick('X', day - 10, 100, 100.5, 99.5)
+    broker.send_limited_order(SendLimitedOrderRequest('DayTrade', 'X', 'Buy', 90, 1, 'ImmediateOrCancel'))
+    broker.send_limited_order(SendLimitedOrderRequest('DayTrade', 'X', 'Buy', 95, 1, 'Day'))
+    broker.send_limited_order(SendLimitedOrderRequest('DayTrade', 'X', 'Sell', 100, 1, 'FillOrKill'))
+    broker.on_tick('X', day - 5, 100, 100.5, 99.5)
+    assert broker.cancelled == 2  # IOC e FOK não executáveis no tick seguinte
+    assert broker.position('X') == 0
+    broker.on_tick('X', day + 5, 94, 94.5, 93.5)  # Novo dia: a ordem Day já expirou
+    assert broker.cancelled == 3
+    assert broker.position('X') == 0
+    broker.send_market_order(SendMarketOrderRequest('DayTrade', 'X', 'Sell', 2, 'Day'))
+    broker.on_tick('X', day + 6, 94, 94.5, 93.5)
+    assert broker.position('X') == -2
+    assert broker.fills[-1]['price'] == 93.5
+
+
+def test_candles_vetorizados_iguais_ao_agregador():
+    rng = np.random.default_rng(5)
+    ticks = make_ticks(5000 + np.cumsum(rng.normal(0, 1, 5000)), step=0.7)
+    candles = backtest.ticks_to_candles(ticks, 60)
+    aggregator = CandleAggregator({'1m': 60}, history=1000)
+    for tick in ticks:
+        aggregator.on_tick('X', float(tick['ts']), float(tick['last']), float(tick['volume']))
+    expected = aggregator.get_candles('X', '1m', limit=1000)
+    assert len(candles) == len(expected)
+    for candle, bar in zip(candles, expected):
+        assert (candle['ts'], candle['open'], candle['high'], candle['low'], candle['close'], candle['volume']) == \
+            pytest.approx((bar['t'], bar['o'], bar['h'], bar['l'], bar['c'], bar['v']))
+
+
+def test_carrega_ticks_da_gravacao(tmp_path):
+    recorder = TickRecorder(str(tmp_path))
+    frame = '{"type":1,"target":"Quote","arguments":[{"ticker":"%s","lastPrice":%s,"bid":%s,"ask":null,"volume":%d}]}\u001e'
+    recorder.record(frame % ('WDOV25', 5000.5, 5000.0, 10), ts=BASE)
+    recorder.record(frame % ('WINV25', 130000, 129995, 5), ts=BASE + 1)
+    recorder.record({'type': 1, 'target': 'Quote', 'arguments': [{'ticker': 'WDOV25', 'lastPrice': 5001.0, 'volume': 12}]},
+                    ts=BASE + 2)
+    recorder.stop()
+    ticks = backtest.load_ticks(str(tmp_path), 'WDOV25')
+    assert ticks['ts'].tolist() == [BASE, BASE + 2]
+    assert ticks['last'].tolist() == [5000.5, 5001.0]
+    assert ticks['bid'][0] == 5000.0 and np.isnan(ticks['bid'][1])
+    assert np.isnan(ticks['ask']).all()
+    assert ticks['volume'].tolist() == [10, 12]
+
+
+def test_varredura_em_processos_igual_a_serial():
+    ticks = random_ticks(5000)
+    grid = {'fast': [3, 5, 8], 'slow': [20, 40], 'ticker': ['WDOV25']}
+    serial = backtest.sweep(ticks, MovingAverageCross, grid, processes=1, multiplier=10.0)
+    parallel = backtest.sweep(ticks, MovingAverageCross, grid, processes=2, multiplier=10.0)
+    assert len(serial) == 6
+    assert [r['params'] for r in parallel] == [r['params'] for r in serial]
+    assert [r['net_pnl'] for r in parallel] == pytest.approx([r['net_pnl'] for r in serial])
+    assert serial[0]['net_pnl'] >= serial[-1]['net_pnl']
+    events = backtest.sweep(ticks, MovingAverageCross, {'fast': [5], 'slow': [20]}, mode='events', processes=1,
+                            multiplier=10.0)
+    vectorized = [r for r in serial if r['params']['fast'] == 5 and r['params']['slow'] == 20][0]
+    assert events[0]['net_pnl'] == pytest.approx(vectorized['net_pnl'])
+
+
+def test_falha_no_envio_nao_altera_a_posicao():
+    calls = []
+
+    def failing_send(order):
+        calls.append(order)
+        if len(calls) == 1:
+            raise RateLimitExceeded("Limite de taxa 'orders' atingido")
+
+    strategy = MovingAverageCross('WDOV25', fast=2, slow=3, send_market_order=failing_send)
+    strategy.on_price(5000.0)
+    with pytest.raises(RateLimitExceeded):
+        strategy.on_price(5010.0)
+    assert strategy.position == 0
+
+    order = strategy.on_price(5020.0)  # Tenta de novo no preço seguinte
+    assert order.Side == 'Buy' and strategy.position == 1 and len(calls) == 2
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Testes da agregação de cotações em candles OHLCV
+"""
+
+import sys
+import os
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from candles import CandleAggregator, EVENT_CLOSED, EVENT_REVISED  # pylint: disable=import-error # noqa: E402
+
+
+def test_varios_timeframes_e_volume_incremental():
+    aggregator = CandleAggregator({'1m': 60, '5m': 300}, utc_offset=0)
+    events = []
+    aggregator.add_listener(lambda ticker, timeframe, bar, event: events.append((timeframe, bar['t'], event)))
+
+    aggregator.on_tick('WINV25', 0.0, 100.0, volume=1000)
+    aggregator.on_tick('WINV25', 30.0, 103.0, volume=1010)
+    aggregator.on_tick('WINV25', 20.0, 99.0, volume=1005)  # Fora de ordem dentro do candle
+    aggregator.on_tick('WINV25', 61.0, 101.0, volume=1030)
+
+    one_minute = aggregator.get_candles('WINV25', '1m')
+    assert one_minute[0] == {'t': 0.0, 'o': 100.0, 'h': 103.0, 'l': 99.0, 'c': 103.0, 'v': 10, 'n': 3}
+    assert one_minute[1]['t'] == 60.0 and one_minute[1]['v'] == 20
+    assert aggregator.get_partial('WINV25', '5m') == {'t': 0.0, 'o': 100.0, 'h': 103.0, 'l': 99.0, 'c': 101.0, 'v': 30, 'n': 4}
+    assert events == [('1m', 0.0, EVENT_CLOSED)]
+
+
+def test_ticks_atrasados_e_fechamento_por_tempo():
+    aggregator = CandleAggregator({'1m': 60}, late_bars=1, utc_offset=0)
+    events = []
+    aggregator.add_listener(lambda ticker, timeframe, bar, event: events.append((bar['t'], bar['h'], event)))
+
+    aggregator.on_tick('PETR4', 10.0, 38.0)
+    aggregator.on_tick('PETR4', 70.0, 38.5)
+    aggregator.on_tick('PETR4', 50.0, 39.0)  # Atrasado: revisa o candle fechado
+    assert aggregator.close_expired(now=125.0) == 1
+    aggregator.on_tick('PETR4', 20.0, 40.0)  # Além de late_bars: descartado
+    aggregator.on_tick('PETR4', 100.0, 37.0)  # Candle fechado por tempo ainda aceita o atraso
+
+    assert events == [(0.0, 38.0, EVENT_CLOSED), (0.0, 39.0, EVENT_REVISED),
+                      (60.0, 38.5, EVENT_CLOSED), (60.0, 38.5, EVENT_REVISED)]
+    assert aggregator.get_partial('PETR4', '1m') is None
+    assert [bar['l'] for bar in aggregator.get_candles('PETR4', '1m')] == [38.0, 37.0]
+    assert aggregator.get_stats()['late_dropped'] == 1
+
+
+def test_ticker_sem_ticks_ha_mais_tempo_e_descartado():
+    aggregator = CandleAggregator({'1m': 60}, utc_offset=0, max_tickers=2)
+    aggregator.on_tick('PETR4', 0.0, 38.1, 100)
+    aggregator.on_tick('VALE3', 1.0, 61.5, 100)
+    aggregator.on_tick('PETR4', 2.0, 38.2, 150)
+
+    aggregator.on_tick('WINV25', 3.0, 130000.0, 10)
+
+    assert sorted(aggregator.tickers()) == ['PETR4', 'WINV25']
+    assert aggregator.get_candles('VALE3', '1m') == []
+    assert aggregator.get_candles('PETR4', '1m')[0]['v'] == 50
+    assert aggregator.get_stats()['evictions'] == 1
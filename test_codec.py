@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Testes do codec JSON das mensagens do feed
+"""
+
+import sys
+import os
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+import codec  # pylint: disable=import-error # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restaura_codec():
+    original = codec.get_codec()
+    yield
+    codec.set_codec(original)
+
+
+@pytest.mark.parametrize("name", ["json", "orjson", "msgspec"])
+def test_codecs_produzem_o_mesmo_json(name):
+    if codec.set_codec(name) != name:
+        pytest.skip(f"{name} não instalado")
+    message = {'type': 'quote_update', 'data': {'ticker': 'PETR4', 'lastPrice': 38.12, 'bid': None, 'nome': 'Petrobrás'}}
+
+    encoded = codec.dumps(message)
+
+    assert isinstance(encoded, str)
+    assert codec.loads(encoded) == message
+    assert codec.loads(codec.dumpb(message)) == message
+    assert encoded == '{"type":"quote_update","data":{"ticker":"PETR4","lastPrice":38.12,"bid":null,"nome":"Petrobrás"}}'
+
+
+def test_codec_desconhecido_usa_json_padrao():
+    assert codec.set_codec('inexistente') == 'json'
+    with pytest.raises(codec.DecodeError):
+        codec.loads('{invalido')
+
+
+def test_msgpack_codifica_os_tipos_do_protocolo_compacto():
+    frame = {'t': 'q', 'q': [['PETR4', 1, {'p': 38.5, 'v': 70000, 'n': -5, 'x': None}]]}
+
+    assert codec.packb(frame) == bytes.fromhex(
+        '82' 'a174' 'a171' 'a171' '91' '93' 'a550455452340184'
+        'a170' 'cb4043400000000000' 'a176' 'ce00011170' 'a16e' 'fb' 'a178' 'c0'
+    )
+
+
+def test_msgspec_erros_sao_capturados_pelas_classes_do_codec():
+    msgspec = pytest.importorskip("msgspec")
+    from signalr_framing import RecordDecoder  # pylint: disable=import-error
+    assert codec.set_codec('msgspec') == 'msgspec'
+    assert msgspec.DecodeError in codec.DecodeError
+    assert msgspec.EncodeError in codec.EncodeError
+
+    decoder = RecordDecoder()
+    records = decoder.feed('{"type":1,"target":"Quote","arguments":[1]}\x1e{ruim\x1e'
+                           '{"type":1,"target":"Quote","arguments":[2]}\x1e')
+
+    assert [r['arguments'] for r in records] == [[1], [2]]  # O registro inválido não derruba o frame
+    assert decoder.decode_errors == 1
+    with pytest.raises(codec.EncodeError):
+        codec.dumpb({'valor': object()})
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Testes do roteamento de cotações por assinatura no ConnectionManager
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+import web_app  # noqa: E402
+from web_app import ConnectionManager  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.messages.append(message)
+
+    async def send_bytes(self, message: bytes):
+        self.messages.append(message)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+class StuckWebSocket(FakeWebSocket):
+    async def send_text(self, message: str):
+        await asyncio.sleep(3600)
+
+
+def test_entrega_por_ticker_e_contagem_de_referencias():
+    upstream = []
+
+    async def subscribe(ticker):
+        upstream.append(('sub', ticker))
+
+    async def unsubscribe(ticker):
+        upstream.append(('unsub', ticker))
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=subscribe, unsubscribe_upstream=unsubscribe)
+        a, b = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(a)
+        await manager.connect(b)
+        await manager.subscribe_ticker(a, 'PETR4')
+        await manager.subscribe_ticker(b, 'PETR4')
+        await manager.subscribe_ticker(b, 'VALE3')
+
+        await manager.publish('VALE3', 'vale')
+        await manager.unsubscribe_ticker(a, 'PETR4')
+        await manager.publish('PETR4', 'petr')
+        await asyncio.sleep(0.01)  # Tasks de escrita
+        await manager.disconnect(b)
+        return manager, a, b
+
+    manager, a, b = asyncio.run(run())
+
+    assert a.messages == []
+    assert b.messages == ['vale', 'petr']
+    # Só o último cliente a sair desassina na ClearAPI
+    assert upstream[:2] == [('sub', 'PETR4'), ('sub', 'VALE3')]
+    assert sorted(upstream[2:]) == [('unsub', 'PETR4'), ('unsub', 'VALE3')]
+    assert manager.subscribed_tickers == set()
+
+
+def test_cliente_lento_nao_atrasa_os_demais_e_e_desconectado():
+    async def noop(ticker):
+        pass
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=noop, unsubscribe_upstream=noop, send_timeout=0.05)
+        fast, stuck = FakeWebSocket(), StuckWebSocket()
+        for ws in (fast, stuck):
+            await manager.connect(ws)
+            await manager.subscribe_ticker(ws, 'PETR4')
+            await manager.subscribe_ticker(ws, 'VALE3')
+
+        for i in range(100):
+            await manager.publish('PETR4', f'petr{i}')
+            await manager.publish('VALE3', f'vale{i}')
+            await asyncio.sleep(0)
+        stuck_stats = manager.clients[stuck].get_stats()
+        await asyncio.sleep(0.1)
+        await manager.publish('PETR4', 'petr100')  # Envio travado há mais que send_timeout
+        await asyncio.sleep(0.01)
+        return manager, fast, stuck, stuck_stats
+
+    manager, fast, stuck, stuck_stats = asyncio.run(run())
+
+    # Cliente rápido: cotações em ordem, até a última de cada ticker
+    assert 'vale99' in fast.messages and fast.messages[-1] == 'petr100'
+    assert [m for m in fast.messages if m.startswith('petr')] == sorted(
+        (m for m in fast.messages if m.startswith('petr')), key=lambda m: int(m[4:]))
+    # Cliente travado: só a última cotação de cada ticker fica pendente
+    assert stuck_stats['pending'] <= 2
+    assert stuck_stats['conflated'] >= 196
+    assert stuck not in manager.clients and stuck.close_code == 1013
+    assert manager.slow_disconnects == 1
+    assert manager.subscribed_tickers == {'PETR4', 'VALE3'}
+
+
+def test_protocolo_compacto_envia_snapshot_e_depois_so_deltas():
+    from web_app import CompactQuoteEncoder
+    import codec  # pylint: disable=import-error
+
+    now = [0.0]
+    encoder = CompactQuoteEncoder('json', snapshot_interval=5.0, clock=lambda: now[0])
+    quote = {'ticker': 'PETR4', 'lastPrice': 38.1, 'bid': 38.0, 'ask': 38.2, 'volume': 100,
+             'change': 0.1, 'changePercent': 0.26, 'timestamp': 't0'}
+
+    first = codec.loads(encoder.encode([('PETR4', quote)]))
+    second = codec.loads(encoder.encode([('PETR4', dict(quote, lastPrice=38.15, volume=200, timestamp='t1'))]))
+    unchanged = encoder.encode([('PETR4', dict(quote, lastPrice=38.15, volume=200, timestamp='t2'))])
+    now[0] = 5.0
+    snapshot = codec.loads(encoder.encode([('PETR4', dict(quote, timestamp='t3'))]))
+
+    assert first == {'t': 'q', 'ts': 't0', 'q': [['PETR4', 1, {'p': 38.1, 'b': 38.0, 'a': 38.2, 'v': 100, 'c': 0.1, 'cp': 0.26, 'h': None, 'l': None}]]}
+    assert second['q'] == [['PETR4', 0, {'p': 38.15, 'v': 200}]]
+    assert unchanged is None
+    assert snapshot['q'][0][1] == 1
+
+
+def test_voltar_ao_protocolo_completo_reserializa_as_pendentes():
+    import codec  # pylint: disable=import-error
+
+    async def noop(ticker):
+        pass
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=noop, unsubscribe_upstream=noop)
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.subscribe_ticker(ws, 'PETR4', max_rate=0)
+        manager.negotiate(ws, {'type': 'hello', 'protocol': 'compact'})
+        await manager.publish_quote('PETR4', {'type': 'quote_update', 'data': {'ticker': 'PETR4', 'lastPrice': 38.1}})
+        ack = manager.negotiate(ws, {'type': 'hello', 'protocol': 'full'})  # Antes da task de escrita enviar
+        await asyncio.sleep(0.01)
+        return ack, ws, manager
+
+    ack, ws, manager = asyncio.run(run())
+    assert ack['protocol'] == 'full'
+    assert [codec.loads(m) for m in ws.messages] == [{'type': 'quote_update', 'data': {'ticker': 'PETR4', 'lastPrice': 38.1}}]
+    assert ws in manager.clients  # Continua conectado
+
+
+def test_limite_por_ticker_conflaciona_dentro_da_janela():
+    async def noop(ticker):
+        pass
+
+    def quote(price, volume, high, low):
+        return {'type': 'quote_update', 'data': {'ticker': 'WINV25', 'lastPrice': price, 'volume': volume,
+                                                 'high': high, 'low': low}}
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=noop, unsubscribe_upstream=noop)
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.subscribe_ticker(ws, 'WINV25', max_rate=20)  # Janela de 50 ms
+        await manager.publish_quote('WINV25', quote(100, 10, 101, 99))
+        await manager.publish_quote('WINV25', quote(103, 15, 103, 99))
+        await manager.publish_quote('WINV25', quote(102, 20, None, 98))
+        await asyncio.sleep(0.01)
+        sent_in_window = len(ws.messages)
+        await asyncio.sleep(0.1)
+        return manager.clients[ws].get_stats(), sent_in_window, ws.messages
+
+    stats, sent_in_window, messages = asyncio.run(run())
+
+    import codec  # pylint: disable=import-error
+    assert sent_in_window == 1
+    assert stats['throttled'] == 2
+    released = codec.loads(messages[-1])['data']
+    assert released == {'ticker': 'WINV25', 'lastPrice': 102, 'volume': 20, 'high': 103, 'low': 98}
+
+
+def test_assinatura_de_book_por_cliente():
+    upstream = []
+
+    async def subscribe_book(ticker):
+        upstream.append(('sub_book', ticker))
+
+    async def unsubscribe_book(ticker):
+        upstream.append(('unsub_book', ticker))
+
+    async def noop(ticker):
+        pass
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=noop, unsubscribe_upstream=noop,
+                                    subscribe_book_upstream=subscribe_book, unsubscribe_book_upstream=unsubscribe_book)
+        a, b = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(a)
+        await manager.connect(b)
+        await manager.subscribe_book(a, 'WINV25')
+        await manager.subscribe_book(b, 'WINV25')
+        web_app.order_books.on_message({'type': 1, 'target': 'Book', 'arguments': [
+            {'ticker': 'WINV25', 'bids': [[130000, 5]], 'asks': [[130005, 3]], 'sequence': 1}]})
+        await manager.unsubscribe_book(a, 'WINV25')
+        await manager.publish_book('WINV25', 'book')
+        await asyncio.sleep(0.01)
+        assert web_app.order_books.snapshot('WINV25') is not None
+        await manager.disconnect(b)
+        return a, b
+
+    async def resync():
+        manager = ConnectionManager(subscribe_upstream=noop, unsubscribe_upstream=noop,
+                                    subscribe_book_upstream=subscribe_book, unsubscribe_book_upstream=unsubscribe_book)
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.resync_book('VALE3')  # Sem assinantes: nada a fazer
+        await manager.subscribe_book(ws, 'VALE3')
+        await manager.resync_book('VALE3')  # Lacuna: reassina para receber um snapshot
+        await manager.disconnect(ws)
+
+    a, b = asyncio.run(run())
+    assert a.messages == [] and b.messages == ['book']
+    assert web_app.order_books.snapshot('WINV25') is None  # Descartado com o último assinante
+    assert upstream == [('sub_book', 'WINV25'), ('unsub_book', 'WINV25')]
+
+    upstream.clear()
+    asyncio.run(resync())
+    assert upstream == [('sub_book', 'VALE3'), ('unsub_book', 'VALE3'), ('sub_book', 'VALE3'), ('unsub_book', 'VALE3')]
+
+
+def test_cotacoes_assinadas_pelos_candles_saem_com_eles():
+    upstream = []
+
+    async def subscribe(ticker):
+        upstream.append(('sub', ticker))
+
+    async def unsubscribe(ticker):
+        upstream.append(('unsub', ticker))
+
+    async def run():
+        manager = ConnectionManager(subscribe_upstream=subscribe, unsubscribe_upstream=unsubscribe)
+        a, b = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(a)
+        await manager.connect(b)
+        await manager.subscribe_candles(a, 'PETR4', '1m')
+        await manager.subscribe_candles(a, 'PETR4', '5m')
+        await manager.unsubscribe_candles(a, 'PETR4', '1m')
+        assert manager.get_client_tickers(a) == {'PETR4'}  # Ainda há candles de 5m
+        await manager.unsubscribe_candles(a, 'PETR4', '5m')
+        a_tickers = set(manager.get_client_tickers(a))
+
+        await manager.subscribe_ticker(b, 'VALE3')  # Assinatura explícita: fica após os candles
+        await manager.subscribe_candles(b, 'VALE3', '1m')
+        await manager.unsubscribe_candles(b, 'VALE3', '1m')
+        b_tickers = set(manager.get_client_tickers(b))
+        await manager.disconnect(a)
+        await manager.disconnect(b)
+        return a_tickers, b_tickers
+
+    a_tickers, b_tickers = asyncio.run(run())
+    assert a_tickers == set() and b_tickers == {'VALE3'}
+    assert upstream == [('sub', 'PETR4'), ('unsub', 'PETR4'), ('sub', 'VALE3'), ('unsub', 'VALE3')]
+
+
+def test_cliente_atrasado_antes_do_start_e_bytes_em_utf8():
+    from web_app import ClientConnection
+
+    client = ClientConnection(FakeWebSocket(), max_lag=-1.0)
+    client.enqueue('primeira')
+    client.enqueue('segunda')  # A primeira já passou de max_lag e a task de escrita ainda não existe
+    assert client.closed and client.slow
+
+    async def run():
+        ws = FakeWebSocket()
+        client = ClientConnection(ws)
+        client.start()
+        client.enqueue('{"nome":"Petrobrás"}')
+        client.enqueue(b'\x81\xa1t\xa1q')
+        await asyncio.sleep(0.01)
+        client.stop()
+        return client
+
+    assert asyncio.run(run()).bytes_sent == len('{"nome":"Petrobrás"}'.encode()) + 5
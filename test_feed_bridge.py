@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Testes da ponte entre o feed (threads) e o event loop
+"""
+
+import sys
+import os
+import asyncio
+import threading
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from feed_bridge import FeedBridge, POLICY_CONFLATE, POLICY_DROP_OLDEST  # pylint: disable=import-error # noqa: E402
+
+
+def run_bridge(policy, publish, max_size=100):
+    """Executa publish(bridge) em outra thread e devolve (entregues, métricas)"""
+    delivered = []
+
+    async def handler(item):
+        delivered.append(item)
+
+    async def run():
+        bridge = FeedBridge(handler, max_size=max_size, policy=policy)
+        await bridge.start()
+        producer = threading.Thread(target=publish, args=(bridge,))
+        producer.start()
+        await asyncio.get_running_loop().run_in_executor(None, producer.join)
+        while bridge.depth:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        await bridge.stop()
+        return bridge.get_stats()
+
+    stats = asyncio.run(run())
+    return delivered, stats
+
+
+def test_conflacao_entrega_ultimo_valor_de_cada_ticker():
+    def publish(bridge):
+        for i in range(1000):
+            bridge.publish(('PETR4', i), key='PETR4')
+            bridge.publish(('VALE3', i), key='VALE3')
+
+    delivered, stats = run_bridge(POLICY_CONFLATE, publish)
+
+    last = {}
+    for ticker, value in delivered:
+        assert value > last.get(ticker, -1)  # Nunca entrega um valor mais antigo
+        last[ticker] = value
+    assert last == {'PETR4': 999, 'VALE3': 999}
+    assert stats['published'] == 2000
+    assert stats['delivered'] + stats['conflated'] == 2000
+    assert stats['dropped'] == 0
+
+
+def test_descarta_as_mais_antigas_quando_cheia():
+    def publish(bridge):
+        bridge._scheduled = True  # Impede o despertar até publicar tudo
+        for i in range(50):
+            bridge.publish(i)
+        bridge._scheduled = False
+        bridge.publish(50)
+
+    delivered, stats = run_bridge(POLICY_DROP_OLDEST, publish, max_size=10)
+
+    assert delivered == list(range(41, 51))
+    assert stats['dropped'] == 41
+    assert stats['max_depth'] == 10
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Testes dos indicadores: a versão incremental (tick a tick) e a vetorizada
+devem dar a mesma série
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+import indicators  # pylint: disable=import-error # noqa: E402
+
+
+def random_walk(count: int, start: float = 130000.0, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return start + np.cumsum(rng.choice([-5.0, 0.0, 5.0], size=count))
+
+
+def streaming(indicator, *columns) -> np.ndarray:
+    out = []
+    for row in zip(*columns):
+        value = indicator.update(*(float(v) for v in row))
+        out.append(np.nan if value is None else value)
+    return np.array(out)
+
+
+@pytest.mark.parametrize("name, period", [('sma', 20), ('ema', 9), ('rolling_std', 20), ('rsi', 14)])
+def test_incremental_igual_ao_vetorizado(name, period):
+    prices = random_walk(50000)
+    classes = {'sma': indicators.SMA, 'ema': indicators.EMA, 'rolling_std': indicators.RollingStd, 'rsi': indicators.RSI}
+
+    expected = getattr(indicators, name)(prices, period)
+    result = streaming(classes[name](period), prices)
+
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-6)
+
+
+def test_vwap_bollinger_e_atr():
+    prices = random_walk(20000, start=38.0, seed=2) / 1000 + 38.0
+    volumes = indicators.volume_increments(np.cumsum(np.random.default_rng(3).integers(0, 500, size=len(prices))))
+    np.testing.assert_allclose(streaming(indicators.VWAP(), prices, volumes),
+                               indicators.vwap(prices, volumes), rtol=1e-12, equal_nan=True)
+
+    mid, upper, lower = indicators.bollinger(prices, 20, 2.0)
+    bands = indicators.Bollinger(20, 2.0)
+    result = np.array([v if v is not None else (np.nan,) * 3 for v in map(bands.update, prices)])
+    np.testing.assert_allclose(result, np.column_stack([mid, upper, lower]), rtol=1e-9, equal_nan=True)
+
+    high, low, close = prices + 0.05, prices - 0.05, prices[::-1].copy()
+    np.testing.assert_allclose(streaming(indicators.ATR(14), high, low, close),
+                               indicators.atr(high, low, close, 14), rtol=1e-9, equal_nan=True)
+
+
+def test_valores_conhecidos():
+    assert indicators.sma([1, 2, 3, 4], 2).tolist()[1:] == [1.5, 2.5, 3.5]
+    assert indicators.rsi([1, 2, 3, 4], 3)[-1] == 100.0
+    assert indicators.volume_increments([100, 150, 10, 30]).tolist() == [0.0, 50.0, 0.0, 20.0]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Testes do mock_server com os próprios clientes da ClearAPI (REST e WebSocket)
+"""
+
+import sys
+import os
+import asyncio
+import json
+import time
+
+import pytest
+import requests
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+import websockets  # noqa: E402
+
+import async_websocket_client  # pylint: disable=import-error # noqa: E402
+from async_websocket_client import AsyncClearWebSocket  # pylint: disable=import-error # noqa: E402
+from mock_server import MockSettings, start_mock_server  # noqa: E402
+from rest_client import RestClient  # pylint: disable=import-error # noqa: E402
+from signalr_framing import RecordDecoder  # pylint: disable=import-error # noqa: E402
+
+RS = '\u001e'
+
+
+@pytest.fixture(scope='module')
+def mock():
+    server = start_mock_server(seed=7, tick_rate=200.0)
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def configuracao_padrao(mock):
+    mock.settings.update(**MockSettings(tick_rate=200.0).to_dict())
+    yield
+
+
+def get_token(mock) -> str:
+    response = requests.post(mock.auth_url, json={'API_KEY': 'k', 'API_SECRET': 's'}, timeout=5)
+    assert response.status_code == 200
+    return response.json()['access_token']
+
+
+def test_rest_auth_cotacao_book_e_ordens(mock):
+    client = RestClient(base_url=mock.api_base_url, rate_limited=False)
+    response = client.post(mock.auth_url, json={'API_KEY': 'k', 'API_SECRET': 's'})
+    data = response.json()
+    assert data['expires_in'] == 3600
+    assert len(data['access_token']) > 100  # Mesmo critério do diagnóstico do websocket_client
+    headers = {'Authorization': f"Bearer {data['access_token']}"}
+
+    quote = client.get('/v1/marketdata/quote', params={'Ticker': 'WDOV25'}, headers=headers).json()
+    assert quote['ticker'] == 'WDOV25'
+    assert quote['ask'] - quote['bid'] == pytest.approx(0.5)
+
+    book = client.get('/v1/marketdata/book', params={'Ticker': 'WDOV25'}, headers=headers).json()
+    assert len(book['bids']) == 10 and len(book['asks']) == 10
+    assert book['bids'][0]['price'] == quote['bid'] and book['asks'][0]['price'] == quote['ask']
+
+    body = json.dumps({'Module': 'DayTrade', 'Ticker': 'WDOV25', 'Side': 'Buy', 'Quantity': 1, 'TimeInForce': 'Day'})
+    order = client.post('/v1/orders/send/market', data=body,
+                        headers=dict(headers, BODY_SIGNATURE='assinatura', **{'Content-Type': 'application/json'}))
+    assert order.json()['orderId'].startswith('MOCK-')
+
+    assert client.get('/v1/marketdata/quote', params={'Ticker': 'WDOV25'}).status_code == 401
+    assert client.post('/v1/orders/send/market', data=body, headers=headers).status_code == 400  # Sem assinatura
+    client.close()
+
+
+def test_injecao_de_erros_e_lentidao(mock):
+    token = get_token(mock)
+    headers = {'Authorization': f'Bearer {token}'}
+    mock.settings.update(error_rate=1.0)
+    response = requests.get(f'{mock.api_base_url}/v1/marketdata/quote', params={'Ticker': 'PETR4'},
+                            headers=headers, timeout=5)
+    assert response.status_code == 500
+    assert response.json()['errorResponse'][0]['code'] == 'MOCK-500'
+
+    mock.settings.update(error_rate=0.0, slow_rate=1.0, slow_ms=200.0)
+    started = time.perf_counter()
+    response = requests.get(f'{mock.api_base_url}/v1/marketdata/quote', params={'Ticker': 'PETR4'},
+                            headers=headers, timeout=5)
+    assert response.status_code == 200
+    assert time.perf_counter() - started >= 0.2
+    # Alterável também por HTTP (mock em outro processo)
+    settings = requests.post(f'{mock.base_url}/mock/settings', json={'slow_rate': 0.0}, timeout=5).json()
+    assert settings['slow_rate'] == 0.0
+
+
+def test_websocket_signalr_ticks_e_book(mock):
+    token = get_token(mock)
+
+    async def run():
+        async with websockets.connect(f'{mock.ws_base_url}/ws/v1/marketdata',
+                                      extra_headers={'Authorization': f'Bearer {token}'}) as ws:
+            await ws.send(json.dumps({'protocol': 'json', 'version': 1}) + RS)
+            assert await ws.recv() == '{}' + RS
+            await ws.send(json.dumps({'type': 1, 'target': 'SubscribeQuote', 'arguments': ['WINV25']}) + RS
+                          + json.dumps({'type': 1, 'target': 'SubscribeBook', 'arguments': ['WINV25']}) + RS)
+            decoder = RecordDecoder()
+            messages = []
+            started = time.monotonic()
+            while time.monotonic() - started < 0.5:
+                messages.extend(decoder.feed(await ws.recv()))
+            return messages
+
+    messages = asyncio.run(run())
+    quotes = [m['arguments'][0] for m in messages if m['target'] == 'Quote']
+    books = [m['arguments'][0] for m in messages if m['target'] == 'Book']
+    assert 30 <= len(quotes) <= 200  # ~200 ticks/s em 0,5 s
+    assert 'bids' in books[0] and 'updates' in books[1]  # Snapshot e depois incrementais
+    assert [b['sequence'] for b in books[1:]] == list(range(books[1]['sequence'], books[1]['sequence'] + len(books) - 1))
+    volumes = [q['volume'] for q in quotes]
+    assert volumes == sorted(volumes)
+
+
+def test_websocket_sem_token_e_recusado(mock):
+    async def run():
+        with pytest.raises(websockets.exceptions.InvalidStatusCode):
+            async with websockets.connect(f'{mock.ws_base_url}/ws/v1/marketdata'):
+                pass
+
+    asyncio.run(run())
+
+
+def test_cliente_reconecta_apos_queda_injetada(mock, monkeypatch):
+    token = get_token(mock)
+
+    async def fake_token():
+        return token
+    monkeypatch.setattr(async_websocket_client, 'get_auth_token_async', fake_token)
+    monkeypatch.setattr(async_websocket_client, 'invalidate_auth_token', lambda: None)
+    monkeypatch.setattr(async_websocket_client, '_backoff_delay', lambda attempt: 0.01)
+    mock.settings.update(disconnect_after=0.3)
+
+    async def run():
+        feed = AsyncClearWebSocket('marketdata', url=f'{mock.ws_base_url}/ws/v1/marketdata')
+        await feed.subscribe_quote('PETR4')
+        await feed.start()
+        received = 0
+        started = time.monotonic()
+        while time.monotonic() - started < 1.5:
+            try:
+                await asyncio.wait_for(feed.__anext__(), 0.5)
+                received += 1
+            except asyncio.TimeoutError:
+                pass
+        reconnects = feed.reconnects
+        await feed.close()
+        return received, reconnects
+
+    received, reconnects = asyncio.run(run())
+    assert reconnects >= 1
+    assert received > 100
+    assert mock.mock.stats['disconnects_injected'] >= 1
+
+
+def test_ordens_publicam_status_no_websocket(mock):
+    token = get_token(mock)
+    headers = {'Authorization': f'Bearer {token}', 'BODY_SIGNATURE': 'x'}
+
+    async def run():
+        async with websockets.connect(f'{mock.ws_base_url}/ws/v1/orders',
+                                      extra_headers={'Authorization': f'Bearer {token}'}) as ws:
+            await ws.send(json.dumps({'protocol': 'json', 'version': 1}) + RS)
+            await ws.recv()
+            await ws.send(json.dumps({'type': 1, 'target': 'SubscribeOrdersStatus', 'arguments': [],
+                                      'invocationId': '1'}) + RS)
+            decoder = RecordDecoder()
+            assert decoder.feed(await ws.recv()) == []  # Completion da assinatura (descartada pelo decoder)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, lambda: requests.post(
+                f'{mock.api_base_url}/v1/orders/send/limited', headers=headers, timeout=5,
+                json={'Module': 'DayTrade', 'Ticker': 'VALE3', 'Side': 'Buy', 'Price': 1.0, 'Quantity': 100,
+                      'TimeInForce': 'ImmediateOrCancel'}))
+            statuses = []
+            while len(statuses) < 2:
+                statuses.extend(m['arguments'][0]['status'] for m in decoder.feed(await ws.recv()))
+            return statuses
+
+    assert asyncio.run(run()) == ['New', 'Cancelled']  # IOC abaixo do mercado
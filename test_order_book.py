@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Testes do book de ofertas (nível 2) em memória
+"""
+
+import sys
+import os
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from order_book import OrderBook, OrderBookManager  # pylint: disable=import-error # noqa: E402
+
+
+def test_snapshot_e_atualizacoes_incrementais():
+    book = OrderBook('PETR4')
+    book.apply_message({
+        'ticker': 'PETR4',
+        'bids': [{'price': 38.10, 'quantity': 300}, {'price': 38.12, 'quantity': 100}],
+        'asks': [[38.15, 200], [38.14, 100]],
+        'sequence': 10
+    })
+
+    assert book.best_bid == 38.12 and book.best_ask == 38.14
+    assert book.spread == pytest.approx(0.02)
+    assert book.microprice == pytest.approx((38.12 * 100 + 38.14 * 100) / 200)
+    assert book.depth('bid', 2) == 400
+    assert book.imbalance(2) == pytest.approx((400 - 300) / 700)
+
+    book.apply_message({'ticker': 'PETR4', 'sequence': 11, 'updates': [
+        {'side': 'ask', 'price': 38.14, 'quantity': 0},  # Remove o nível
+        {'side': 'buy', 'price': 38.13, 'quantity': 50},
+    ]})
+    book.apply_message({'ticker': 'PETR4', 'sequence': 12, 'side': 'bid', 'price': 38.10, 'quantity': 1000})
+
+    assert book.best_bid == 38.13 and book.best_ask == 38.15
+    assert book.bids.levels() == [(38.13, 50), (38.12, 100), (38.10, 1000)]
+    assert book.bids.size_at(38.12) == 100
+    assert not book.stale
+
+    book.apply_message({'ticker': 'PETR4', 'sequence': 20, 'side': 'ask', 'price': 38.16, 'quantity': 5})
+    assert book.stale and book.gaps == 1
+
+
+def test_niveis_limitados_e_callbacks_do_gerenciador():
+    manager = OrderBookManager(max_books=2, max_levels=3)
+    seen = []
+    manager.add_listener(lambda ticker, book: seen.append((ticker, book.best_bid)))
+
+    manager.on_message({'type': 1, 'target': 'Book', 'arguments': [{
+        'ticker': 'WINV25',
+        'bids': [{'price': 100 + i * 5, 'quantity': 1} for i in range(5)],
+        'asks': []
+    }]})
+    manager.on_message({'type': 1, 'target': 'Book', 'arguments': [{'ticker': 'WINV25', 'side': 'bid', 'price': 90, 'quantity': 7}]})
+    manager.on_message({'type': 1, 'target': 'Quote', 'arguments': [{'ticker': 'WINV25'}]})
+
+    book = manager.get('WINV25')
+    assert [price for price, _ in book.bids.levels()] == [120, 115, 110]  # Só os 3 melhores
+    assert book.bids.truncated == 3
+    assert seen == [('WINV25', 120), ('WINV25', 120)]
+
+    manager.apply('WDOV25', {'bids': [], 'asks': []})
+    manager.apply('PETR4', {'bids': [], 'asks': []})
+    assert manager.get('WINV25') is None  # LRU
+    assert manager.snapshot('PETR4')['bestBid'] is None
+    assert manager.get_stats()['evictions'] == 1
+
+
+def test_lacuna_ignora_atualizacoes_ate_o_snapshot_e_pede_reassinatura():
+    manager = OrderBookManager()
+    resyncs = []
+    manager.add_stale_listener(resyncs.append)
+    manager.apply('PETR4', {'bids': [[38.10, 100]], 'asks': [[38.12, 100]], 'sequence': 1})
+    manager.apply('PETR4', {'side': 'bid', 'price': 38.11, 'quantity': 50, 'sequence': 2})
+
+    manager.apply('PETR4', {'side': 'bid', 'price': 38.115, 'quantity': 10, 'sequence': 5})  # Lacuna (3 e 4)
+    manager.apply('PETR4', {'sequence': 6, 'updates': [{'side': 'ask', 'price': 38.11, 'quantity': 1}]})
+    manager.apply('PETR4', {'side': 'ask', 'quantity': 5, 'sequence': 7})  # Sem preço: ignorada
+
+    book = manager.get('PETR4')
+    assert book.stale and resyncs == ['PETR4']  # Um pedido por lacuna
+    assert book.best_bid == 38.11 and book.best_ask == 38.12  # Nada aplicado depois da lacuna
+    assert manager.get_stats()['ignored'] == 2
+
+    manager.apply('PETR4', {'bids': [[38.13, 20]], 'asks': [[38.14, 30]], 'sequence': 10})  # Snapshot da reassinatura
+    manager.apply('PETR4', {'side': 'bid', 'price': 38.13, 'quantity': 0, 'sequence': 11})
+    assert not book.stale and book.best_bid is None and book.best_ask == 38.14
+    assert book.apply_update('bid', None, 10) is False
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de cotações (LRU com idade máxima) e do seu uso no /api/quotes
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from quote_cache import QuoteCache  # pylint: disable=import-error # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_descarta_o_menos_usado():
+    cache = QuoteCache(max_entries=2, max_age=10.0)
+    cache.put('PETR4', {'lastPrice': 38.1})
+    cache.put('VALE3', {'lastPrice': 61.5})
+    assert cache.get('PETR4') == {'lastPrice': 38.1}  # PETR4 passa a ser o mais recente
+
+    cache.put('WINV25', {'lastPrice': 130000})
+
+    assert cache.get('VALE3') is None
+    assert cache.get('PETR4') is not None and cache.get('WINV25') is not None
+    assert len(cache) == 2 and cache.evictions == 1
+
+
+def test_valor_antigo_nao_e_servido_e_metricas():
+    clock = FakeClock()
+    cache = QuoteCache(max_age=1.0, clock=clock)
+    cache.put('PETR4', {'lastPrice': 38.1})
+
+    clock.now += 0.5
+    assert cache.get('PETR4') == {'lastPrice': 38.1}
+    clock.now += 1.0
+    assert cache.get('PETR4') is None  # 1,5 s > max_age
+    assert cache.get('PETR4', max_age=2.0) == {'lastPrice': 38.1}
+    assert cache.get('VALE3') is None
+    assert cache.get_age('PETR4') == pytest.approx(1.5)
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['stale'], stats['misses'], stats['writes']) == (2, 1, 1, 1)
+    assert stats['hit_ratio'] == pytest.approx(0.5)
+
+    cache.invalidate('PETR4')
+    assert cache.get_age('PETR4') is None and len(cache) == 0
+
+
+def test_api_quotes_busca_so_o_que_falta_no_cache(monkeypatch):
+    pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+    import web_app  # noqa: E402
+
+    cache = QuoteCache(max_age=5.0)
+    cache.put('PETR4', {'ticker': 'PETR4', 'lastPrice': 38.1})
+    requested = []
+
+    class FakeAsyncClient:
+        async def get_ticker_quotes(self, tickers, return_exceptions=False):
+            requested.append(list(tickers))
+            return {ticker: ValueError('Ticker inválido') if ticker == 'XXXX3' else {'ticker': ticker, 'lastPrice': 1.0}
+                    for ticker in tickers}
+
+    monkeypatch.setattr(web_app, 'get_quote_cache', lambda: cache)
+    monkeypatch.setattr(web_app, 'get_async_client', FakeAsyncClient)
+
+    result = asyncio.run(web_app.get_quotes('petr4,VALE3,XXXX3'))
+
+    assert requested == [['VALE3', 'XXXX3']]
+    assert result['cached'] == 1
+    assert list(result['data']) == ['PETR4', 'VALE3']
+    assert result['errors'] == {'XXXX3': 'Ticker inválido'}
+    assert cache.get('VALE3') == {'ticker': 'VALE3', 'lastPrice': 1.0}  # Gravado para a próxima leitura
+
+    result = asyncio.run(web_app.get_quotes('VALE3'))
+    assert result['cached'] == 1 and requested[-1] == []
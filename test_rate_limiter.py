@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Testes do limitador de taxa (TokenBucket) - não acessam a rede
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from rate_limiter import (  # pylint: disable=import-error
+    ORDERS_BURST, ORDERS_PER_MINUTE, PRIORITY_ORDER, PRIORITY_QUOTE, REST_BURST, REST_REQUESTS_PER_MINUTE,
+    RateLimitExceeded, TokenBucket
+)
+
+
+def test_rejeicao_rapida_quando_o_bucket_esvazia():
+    bucket = TokenBucket('teste', capacity=3, refill_per_second=0.001)
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert not bucket.try_acquire()
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(block=False)
+
+    stats = bucket.get_stats()
+    assert stats['acquired'] == 3
+    assert stats['rejected'] == 2
+
+
+def test_timeout_aguardando_token():
+    bucket = TokenBucket('teste', capacity=1, refill_per_second=0.01)
+    bucket.acquire()
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(timeout=0.05)
+    assert bucket.get_stats()['queue_depth'] == 0
+
+
+def test_ordens_tem_prioridade_sobre_cotacoes():
+    bucket = TokenBucket('teste', capacity=1, refill_per_second=20)
+    bucket.acquire()
+    served = []
+
+    def worker(name, priority):
+        bucket.acquire(priority=priority, timeout=5)
+        served.append(name)
+
+    quotes = [threading.Thread(target=worker, args=(f"quote-{i}", PRIORITY_QUOTE)) for i in range(3)]
+    for thread in quotes:
+        thread.start()
+    time.sleep(0.01)
+    order = threading.Thread(target=worker, args=("order", PRIORITY_ORDER))
+    order.start()
+
+    for thread in quotes + [order]:
+        thread.join()
+
+    # A ordem chegou depois, mas passa na frente das cotações que ainda aguardavam
+    assert served.index("order") <= 1
+    assert bucket.get_stats()['throttled'] == 4
+
+
+def test_acquire_async_e_bucket_de_conexoes():
+    bucket = TokenBucket('ws', capacity=1, refill_per_second=0)
+
+    async def run():
+        await bucket.acquire_async()
+        waiter = asyncio.ensure_future(bucket.acquire_async(timeout=2))
+        await asyncio.sleep(0.01)
+        assert bucket.get_stats()['queue_depth'] == 1
+        bucket.release()
+        await waiter
+
+    asyncio.run(run())
+    stats = bucket.get_stats()
+    assert stats['acquired'] == 2
+    assert stats['throttled_seconds'] > 0
+
+
+@pytest.mark.parametrize("limit, burst", [(REST_REQUESTS_PER_MINUTE, REST_BURST), (ORDERS_PER_MINUTE, ORDERS_BURST)])
+def test_nenhuma_janela_de_60s_passa_do_limite(limit, burst):
+    now = [0.0]
+    bucket = TokenBucket('teste', burst, (limit - burst) / 60.0, clock=lambda: now[0])
+    acquired_at = []
+    for step in range(3000):  # 5 minutos de um cliente que tenta a cada 100 ms
+        now[0] = step * 0.1
+        while bucket.try_acquire():
+            acquired_at.append(now[0])
+
+    busiest = max(sum(1 for t in acquired_at if start <= t < start + 60.0) for start in acquired_at)
+    assert busiest <= limit
+    assert busiest >= limit * 0.9  # Sem desperdiçar a cota
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Testes da reprodução de gravações do feed
+"""
+
+import sys
+import os
+import asyncio
+import time
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from replay import FeedReplayer  # pylint: disable=import-error # noqa: E402
+from tick_recorder import TickRecorder  # pylint: disable=import-error # noqa: E402
+from quote_cache import QuoteCache  # pylint: disable=import-error # noqa: E402
+from tick_store import TickStore  # pylint: disable=import-error # noqa: E402
+from candles import CandleAggregator  # pylint: disable=import-error # noqa: E402
+
+RS = '\u001e'
+BASE = 1792260000.0
+
+
+def quote_frame(ticker: str, price: float) -> str:
+    return '{"type":1,"target":"Quote","arguments":[{"ticker":"%s","lastPrice":%s,"volume":10}]}' % (ticker, price) + RS
+
+
+def record(directory, entries):
+    recorder = TickRecorder(str(directory))
+    for ts, message in entries:
+        recorder.record(message, ts=ts)
+    recorder.stop()
+
+
+def test_reproducao_deterministica_com_os_callbacks(tmp_path):
+    frame = quote_frame('PETR4', 38.1)
+    record(tmp_path, [
+        (BASE, frame[:20]),  # Registro dividido entre dois frames
+        (BASE + 0.1, frame[20:] + '{"type":6}' + RS),
+        (BASE + 0.2, {'type': 1, 'target': 'Quote', 'arguments': [{'ticker': 'VALE3', 'lastPrice': 61.5}]}),
+    ])
+
+    runs = []
+    for _ in range(2):
+        replayer = FeedReplayer(str(tmp_path), speed=0)
+        received, opened = [], []
+        replayer.run(lambda message: received.append((replayer.clock(), message)), lambda: opened.append(True))
+        runs.append(received)
+
+    assert opened == [True]
+    assert runs[0] == runs[1]
+    assert [(ts - BASE, m['arguments'][0]['ticker']) for ts, m in runs[0]] == [(pytest.approx(0.1), 'PETR4'),
+                                                                              (pytest.approx(0.2), 'VALE3')]
+
+
+def test_velocidade_e_repeticao(tmp_path):
+    record(tmp_path, [(BASE + i * 0.1, quote_frame('WINV25', 100 + i)) for i in range(4)])
+
+    replayer = FeedReplayer(str(tmp_path), speed=3.0)
+    started = time.monotonic()
+    replayer.run(lambda message: None)
+    assert time.monotonic() - started == pytest.approx(0.1, abs=0.05)  # 0,3 s gravados a 3x
+
+    replayer = FeedReplayer(str(tmp_path), speed=0, loop=True)
+    clocks = []
+
+    def on_message(message):
+        clocks.append(replayer.clock())
+        if len(clocks) == 10:
+            replayer.stop()
+
+    replayer.run(on_message)
+    assert clocks == sorted(clocks) and len(clocks) == 10
+    assert replayer.get_stats()['laps'] == 2
+
+
+def test_reproducao_alimenta_o_web_app(tmp_path, monkeypatch):
+    pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+    import web_app  # noqa: E402
+
+    record(tmp_path, [(BASE + i, quote_frame('WDOV25', 5000 + i)) for i in range(5)])
+    replayer = FeedReplayer(str(tmp_path), speed=0)
+    subscribed = []
+
+    async def subscribe(ticker):
+        subscribed.append(ticker)
+
+    async def unsubscribe(ticker):
+        subscribed.remove(ticker)
+
+    # Instâncias novas no lugar dos globais do módulo: nada vaza para o feed real nem para outros testes
+    cache = QuoteCache()
+    monkeypatch.setattr(web_app, 'feed_time', replayer.clock)
+    monkeypatch.setattr(web_app, 'manager', web_app.ConnectionManager(subscribe_upstream=subscribe,
+                                                                       unsubscribe_upstream=unsubscribe))
+    monkeypatch.setattr(web_app, 'quote_bridge', web_app.FeedBridge(web_app.deliver_quote))
+    monkeypatch.setattr(web_app, 'tick_store', TickStore())
+    monkeypatch.setattr(web_app, 'candles', CandleAggregator())
+    monkeypatch.setattr(web_app, 'get_quote_cache', lambda: cache)
+
+    class FakeWebSocket:
+        def __init__(self):
+            self.messages = []
+
+        async def accept(self):
+            pass
+
+        async def send_text(self, message):
+            self.messages.append(message)
+
+    async def run():
+        await web_app.quote_bridge.start()
+        ws = FakeWebSocket()
+        await web_app.manager.connect(ws)
+        await web_app.manager.subscribe_ticker(ws, 'WDOV25', max_rate=web_app.CLIENT_MAX_RATE_LIMIT_HZ)
+        await replayer.run_async(web_app.on_clear_message, web_app.on_clear_open)
+        await asyncio.sleep(0.05)
+        await web_app.manager.disconnect(ws)
+        await web_app.quote_bridge.stop()
+        return ws
+
+    ws = asyncio.run(run())
+    assert any('"WDOV25"' in message for message in ws.messages)
+    assert subscribed == [] and not web_app.manager.subscribers
+    assert cache.get('WDOV25')['lastPrice'] == 5004
+    assert web_app.tick_store.window('WDOV25', BASE, BASE + 10)['last'].tolist() == [5000, 5001, 5002, 5003, 5004]
+    recent = asyncio.run(web_app.get_ticks('WDOV25', seconds=10))['data']  # Janela no relógio da gravação
+    assert recent['count'] == 5 and recent['ticks']['last'] == [5000, 5001, 5002, 5003, 5004]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Testes do decodificador incremental de registros SignalR
+"""
+
+import sys
+import os
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from signalr_framing import RecordDecoder  # pylint: disable=import-error # noqa: E402
+
+RS = '\u001e'
+
+
+def test_registros_divididos_entre_frames():
+    decoder = RecordDecoder()
+    stream = ('{"type":1,"target":"Quote","arguments":[{"ticker":"PETR4","lastPrice":38.1}]}' + RS +
+              '{"type":1,"target":"Quote","arguments":[{"ticker":"VALE3","lastPrice":61.5}]}' + RS)
+
+    records = []
+    for i in range(0, len(stream), 7):  # Frames cortados em pontos arbitrários
+        records.extend(decoder.feed(stream[i:i + 7]))
+
+    assert [r['arguments'][0]['ticker'] for r in records] == ['PETR4', 'VALE3']
+    assert decoder.pending == 0
+    assert decoder.get_stats()['split_records'] > 0
+
+
+def test_descarta_por_tipo_e_target_sem_decodificar():
+    decoder = RecordDecoder(skip_targets=('Book',))
+    frame = RS.join([
+        '{"type":6}',
+        '{"type": 3, "invocationId": "1"}',
+        '{"type":1,"target":"Book","arguments":[{"bids":[]}]}',
+        '{"type":1,"target":"Quote","arguments":[{"ticker":"WINV25","type":6,"target":"Book"}]}',
+        '{"arguments":[{"target":"Quote"}],"type":1,"target":"Book"}',  # Cabeçalho depois dos argumentos
+        '   ',
+        '{invalido',
+        ''
+    ])
+
+    records = decoder.feed(frame)
+
+    assert [r['target'] for r in records] == ['Quote', 'Book']
+    assert records[0]['arguments'][0]['ticker'] == 'WINV25'
+    assert decoder.get_stats()['skipped'] == 3
+    assert decoder.get_stats()['decode_errors'] == 1
+
+
+def test_registro_truncado_conta_como_erro():
+    decoder = RecordDecoder()
+
+    records = decoder.feed('{"type":' + RS + '{"type":1,"target":"Quote","arguments":[1]}' + RS)
+
+    assert [r['arguments'] for r in records] == [[1]]
+    assert decoder.decode_errors == 1
+
+
+def test_registro_dividido_seguido_de_outros_no_mesmo_frame():
+    decoder = RecordDecoder()
+    first = '{"type":1,"target":"Quote","arguments":[1]}'
+
+    assert decoder.feed(first[:10]) == [] and decoder.feed(first[10:20]) == []
+    records = decoder.feed(first[20:] + RS + '{"type":1,"target":"Quote","arguments":[2]}' + RS + '{"type":1,')
+
+    assert [r['arguments'] for r in records] == [[1], [2]]
+    assert decoder.pending == len('{"type":1,')
+    assert decoder.get_stats()['split_records'] == 1
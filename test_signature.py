@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Testes do assinador de corpos (recarga da chave pelo mtime e assinatura em lote)
+"""
+
+import sys
+import os
+import base64
+
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+from signature import BodySigner  # pylint: disable=import-error # noqa: E402
+
+
+def write_key(path, mtime):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                       serialization.NoEncryption()))
+    os.utime(path, (mtime, mtime))
+    return key.public_key()
+
+
+def verify(public_key, signature: str, body: str) -> bool:
+    try:
+        public_key.verify(base64.b64decode(signature), body.encode(), padding.PKCS1v15(), hashes.SHA256())
+        return True
+    except Exception:
+        return False
+
+
+def test_chave_recarregada_quando_o_arquivo_muda(tmp_path):
+    key_path = tmp_path / 'private.pem'
+    first_key = write_key(key_path, 1000000)
+    signer = BodySigner(str(key_path), check_interval=0)
+
+    assert verify(first_key, signer.sign('{"a":1}'), '{"a":1}')
+    signer.sign('{"a":2}')
+    assert signer.loads == 1  # Arquivo não mudou: chave em memória
+
+    second_key = write_key(key_path, 1000010)
+    signature = signer.sign('{"a":1}')
+
+    assert verify(second_key, signature, '{"a":1}') and not verify(first_key, signature, '{"a":1}')
+    assert signer.loads == 2
+
+
+def test_assinatura_em_lote_igual_a_individual(tmp_path):
+    key_path = tmp_path / 'private.pem'
+    write_key(key_path, 1000000)
+    signer = BodySigner(str(key_path))
+    bodies = ['{"Ticker":"PETR4"}', {'Ticker': 'VALE3', 'Quantity': 100}, '']
+
+    assert signer.sign_batch(bodies) == [signer.sign(body) for body in bodies]
+    assert signer.sign_batch([]) == []
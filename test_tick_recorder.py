@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Testes do gravador de mensagens do feed (segmentos gzip com índice de tempo)
+"""
+
+import sys
+import os
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+import tick_recorder  # pylint: disable=import-error # noqa: E402
+from tick_recorder import TickRecorder, list_segments, read_index, read_recordings, read_segment  # pylint: disable=import-error # noqa: E402
+
+DAY_START = 1792206000.0  # 2026-10-17 00:00 em Brasília
+
+
+def test_rotacao_por_tamanho_e_dia_com_busca_pelo_indice(tmp_path):
+    recorder = TickRecorder(str(tmp_path), segment_max_bytes=1500, index_interval=0.0, utc_offset=-3 * 3600)
+    recorder.start()
+    for i in range(2000):
+        recorder.record({'type': 1, 'target': 'Quote', 'arguments': [{'ticker': 'WINV25', 'lastPrice': i}]},
+                        ts=DAY_START + 86400 - 1000 + i)  # Atravessa a meia-noite
+        if i % 200 == 199:
+            recorder.flush()
+    recorder.record_raw(b'{"type":6}\x1e', ts=DAY_START + 86400 + 2000)
+    recorder.stop()
+
+    segments = list_segments(str(tmp_path))
+    assert {day for day, _, _ in segments} == {'20261017', '20261018'}
+    assert len(segments) > 2  # Também rotacionou por tamanho
+    assert recorder.get_stats()['written'] == 2001
+
+    records = list(read_recordings(str(tmp_path), DAY_START + 86400 - 10, DAY_START + 86400 + 5))
+    assert [r['msg']['arguments'][0]['lastPrice'] for r in records] == list(range(990, 1005))
+    assert list(read_recordings(str(tmp_path), DAY_START + 86400 + 1500))[0]['raw'] == '{"type":6}\x1e'
+
+
+def test_leitura_tolera_membro_incompleto(tmp_path):
+    recorder = TickRecorder(str(tmp_path), index_interval=0.0)
+    for i in range(10):
+        recorder.record({'n': i}, ts=DAY_START + i)
+        recorder.flush()
+    recorder.stop()
+    path = list_segments(str(tmp_path))[0][2]
+    assert len(read_index(path)) == 10
+
+    with open(path, 'ab') as f:
+        f.write(b'\x1f\x8b\x08\x00\x00')  # Gravação interrompida no meio de um membro
+
+    assert [r['msg']['n'] for r in read_segment(path, start=DAY_START + 7)] == [7, 8, 9]
+
+
+def test_fila_cheia_descarta_sem_bloquear(tmp_path):
+    recorder = TickRecorder(str(tmp_path), max_queue=3)
+    for i in range(5):
+        recorder.record({'n': i})
+    assert recorder.depth == 3 and recorder.dropped == 2
+    assert tick_recorder.KIND_MESSAGE in recorder._queue[0]
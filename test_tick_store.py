@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Testes do histórico de ticks em buffers circulares
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from tick_store import TickRing, TickStore, to_columns  # pylint: disable=import-error # noqa: E402
+
+
+def test_buffer_circular_com_views_sem_copia():
+    ring = TickRing(capacity=4)
+    for i in range(10):
+        ring.append(float(i), 100.0 + i, 99.0 + i, 101.0 + i, i * 10)
+
+    data = ring.view()
+    assert data['ts'].tolist() == [6.0, 7.0, 8.0, 9.0]  # Só os 4 mais recentes, em ordem
+    assert np.shares_memory(data, ring._buffer)
+
+    window = ring.window(7.0, 9.0)
+    assert window['last'].tolist() == [107.0, 108.0]
+    assert np.shares_memory(window, ring._buffer)
+    assert ring.last(1)['volume'].tolist() == [90]
+    assert ring.nbytes == 2 * 4 * ring._buffer.dtype.itemsize  # Memória fixa
+
+    ring.append(5.0, 1.0)  # Fora de ordem: grava com o timestamp anterior
+    assert ring.view()['ts'][-1] == 9.0 and ring.out_of_order == 1
+
+
+def test_store_por_ticker_e_colunas_json():
+    store = TickStore(capacity=8, max_tickers=1)
+    store.append_quote('PETR4', {'lastPrice': 38.1, 'bid': None, 'ask': 38.2, 'volume': 500}, ts=1.0)
+    store.append_quote('PETR4', {'bid': 38.0}, ts=2.0)  # Sem lastPrice: ignorado
+
+    columns = to_columns(store.window('PETR4', start=0.0))
+    assert columns == {'ts': [1.0], 'last': [38.1], 'bid': [None], 'ask': [38.2], 'volume': [500]}
+
+
+def test_ticker_parado_ha_mais_tempo_da_lugar_ao_novo():
+    store = TickStore(capacity=8, max_tickers=2)
+    store.append('PETR4', 1.0, 38.1)
+    store.append('VALE3', 2.0, 61.5)
+    store.append('PETR4', 3.0, 38.2)
+
+    store.append('WINV25', 4.0, 130000.0)  # Além de max_tickers: VALE3 está parado há mais tempo
+
+    assert sorted(store.tickers()) == ['PETR4', 'WINV25']
+    assert len(store.window('VALE3')) == 0 and len(store.window('PETR4')) == 2
+    assert store.get_stats()['evictions'] == 1
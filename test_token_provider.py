@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de token (TokenProvider) - não acessam a rede
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+from token_provider import TokenProvider  # pylint: disable=import-error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_em_cache_ate_a_margem_de_renovacao():
+    clock = FakeClock()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return f"token-{len(calls)}", 300
+
+    provider = TokenProvider(fetch, refresh_margin=60, clock=clock)
+    assert provider.get_token() == "token-1"
+    clock.now += 100
+    assert provider.get_token() == "token-1"
+    assert len(calls) == 1
+
+    stats = provider.get_stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert stats['refreshes'] == 1
+
+
+def test_renovacao_em_segundo_plano_retorna_token_atual():
+    clock = FakeClock()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return f"token-{len(calls)}", 300
+
+    provider = TokenProvider(fetch, refresh_margin=60, clock=clock)
+    provider.get_token()
+
+    clock.now += 250  # Dentro da margem, mas ainda válido
+    assert provider.get_token() == "token-1"
+    assert provider.get_stats()['refresh_in_flight']
+    release.set()
+
+    for _ in range(100):
+        if not provider.get_stats()['refresh_in_flight']:
+            break
+        time.sleep(0.01)
+    assert provider.get_token() == "token-2"
+    assert provider.get_stats()['background_refreshes'] == 1
+
+
+def test_chamadas_concorrentes_compartilham_uma_requisicao():
+    calls = []
+    started = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "token", 300
+
+    provider = TokenProvider(fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider.get_token())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["token"] * 10
+    assert len(calls) == 1
+
+
+def test_get_token_async_compartilha_requisicao():
+    calls = []
+
+    async def fetch_async():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "token-async", 300
+
+    provider = TokenProvider(lambda: ("token-sync", 300))
+
+    async def run():
+        return await asyncio.gather(*[provider.get_token_async(fetch_async) for _ in range(20)])
+
+    assert asyncio.run(run()) == ["token-async"] * 20
+    assert len(calls) == 1
+
+
+def test_erro_na_busca_e_propagado_e_nao_fica_em_cache():
+    attempts = []
+
+    def fetch():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("falha")
+        return "token", 300
+
+    provider = TokenProvider(fetch)
+    try:
+        provider.get_token()
+        assert False, "Deveria ter levantado RuntimeError"
+    except RuntimeError:
+        pass
+
+    assert provider.get_token() == "token"
+    assert provider.get_stats()['errors'] == 1
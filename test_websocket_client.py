@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Testes do supervisor de reconexão do websocket_client com um WebSocketApp falso
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+
+import pytest
+
+# Adiciona o diretório ClearAPI ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
+
+pytest.importorskip("config", reason="ClearAPI/config.py não configurado")
+
+import websocket_client  # pylint: disable=import-error # noqa: E402
+
+RS = '\u001e'
+ROUTE = websocket_client.MARKETDATA_ROUTE
+
+
+class FakeSock:
+    connected = False
+
+
+class FakeWebSocketApp:
+    """Conecta na hora, guarda o que foi enviado e fica aberto até close()"""
+    instances = []
+    on_first_send = None  # Chamado antes do primeiro envio (simula outra thread no meio do on_open)
+
+    def __init__(self, url, header=None, on_open=None, on_message=None, on_error=None, on_close=None):
+        self.url = url
+        self.header = header
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_close = on_close
+        self.sock = FakeSock()
+        self.sent = []
+        self._closed = threading.Event()
+        FakeWebSocketApp.instances.append(self)
+
+    def send(self, message):
+        hook, FakeWebSocketApp.on_first_send = FakeWebSocketApp.on_first_send, None
+        if hook is not None:
+            hook()
+        self.sent.append(json.loads(message.rstrip(RS)))
+
+    def run_forever(self, **kwargs):
+        self.sock.connected = True
+        self.on_open(self)
+        self.on_message(self, '{"type":1,"target":"Quote","arguments":[{"ticker":"PETR4"}]}' + RS)
+        self._closed.wait(5)
+        self.sock.connected = False
+        self.on_close(self, 1000, 'fechada')
+
+    def close(self):
+        self._closed.set()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Condição não atingida a tempo"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def fake_ws(monkeypatch):
+    tokens = iter(f'token-{i}' for i in range(1, 100))
+    invalidations = []
+    FakeWebSocketApp.instances = []
+    FakeWebSocketApp.on_first_send = None
+    monkeypatch.setattr(websocket_client.websocket, 'WebSocketApp', FakeWebSocketApp)
+    monkeypatch.setattr(websocket_client, 'get_auth_token', lambda: next(tokens))
+    monkeypatch.setattr(websocket_client, 'invalidate_auth_token', lambda: invalidations.append(True))
+    monkeypatch.setattr(websocket_client, '_backoff_delay', lambda attempt: 0.01)
+    yield invalidations
+    supervisor = websocket_client._supervisors.get(ROUTE)
+    websocket_client.close_websocket(ROUTE)
+    if supervisor is not None:
+        supervisor._thread.join(2)
+    for registry in (websocket_client._active_subscriptions, websocket_client._sent_subscriptions,
+                     websocket_client._connection_status, websocket_client._ws_connections):
+        registry.pop(ROUTE, None)
+    websocket_client._ready_routes.discard(ROUTE)
+
+
+def targets(app):
+    return [(m.get('target'), m.get('arguments')) if 'target' in m else 'handshake' for m in app.sent]
+
+
+def test_backoff_exponencial_com_jitter_e_teto(monkeypatch):
+    monkeypatch.setattr(websocket_client.random, 'uniform', lambda low, high: high)
+    assert [websocket_client._backoff_delay(n) for n in (1, 2, 3)] == [2, 4, 8]
+    assert websocket_client._backoff_delay(20) == websocket_client.RETRY_MAX_DELAY_SECONDS
+
+    monkeypatch.setattr(websocket_client.random, 'uniform', lambda low, high: low)
+    assert websocket_client._backoff_delay(3) == 4  # Metade fixa
+    assert websocket_client._backoff_delay(0) == websocket_client._backoff_delay(1)
+
+
+def test_reconexao_com_token_novo_e_reassinaturas(fake_ws):
+    invalidations = fake_ws
+    received = []
+    websocket_client.sign_ticker_quote('PETR4')  # Antes de conectar: só registrada
+
+    assert websocket_client._start_supervisor(ROUTE, received.append, lambda: None)
+    wait_for(lambda: len(FakeWebSocketApp.instances) == 1 and len(FakeWebSocketApp.instances[0].sent) == 2)
+    first = FakeWebSocketApp.instances[0]
+    websocket_client.sign_ticker_book('PETR4')  # Conectado: enviada na hora
+    assert targets(first) == ['handshake', ('SubscribeQuote', ['PETR4']), ('SubscribeBook', ['PETR4'])]
+    assert first.header['Authorization'] == 'Bearer token-1'
+    assert received[0]['target'] == 'Quote'
+
+    first.close()  # Queda: o supervisor espera o backoff, troca o token e reconecta
+    wait_for(lambda: len(FakeWebSocketApp.instances) == 2 and len(FakeWebSocketApp.instances[1].sent) == 3)
+    second = FakeWebSocketApp.instances[1]
+    assert targets(second) == ['handshake', ('SubscribeQuote', ['PETR4']), ('SubscribeBook', ['PETR4'])]
+    assert second.header['Authorization'] == 'Bearer token-2'
+    assert invalidations == [True]
+
+    wait_for(lambda: websocket_client.get_reconnect_stats(ROUTE)['connected'])
+    stats = websocket_client.get_reconnect_stats(ROUTE)
+    assert stats['connects'] == 2 and stats['reconnects'] == 1 and stats['retry_attempt'] == 0
+    assert stats['last_reconnect_seconds'] >= 0.0
+
+    websocket_client.unsign_ticker_book('PETR4')
+    assert targets(second)[-1] == ('UnsubscribeBook', ['PETR4'])
+    assert [m['target'] for m in websocket_client.get_active_subscriptions(ROUTE)] == ['SubscribeQuote']
+
+
+def test_assinatura_durante_a_abertura_sai_depois_do_handshake_uma_vez(fake_ws):
+    FakeWebSocketApp.on_first_send = lambda: websocket_client.sign_ticker_quote('VALE3')
+
+    assert websocket_client._start_supervisor(ROUTE, lambda message: None, lambda: None)
+    wait_for(lambda: FakeWebSocketApp.instances and websocket_client.get_connection_status(ROUTE)['connected'])
+
+    assert targets(FakeWebSocketApp.instances[0]) == ['handshake', ('SubscribeQuote', ['VALE3'])]
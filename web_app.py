@@ -4,10 +4,13 @@ Integra com a ClearAPI para dados de mercado via WebSocket
 """
 
 import asyncio
+import itertools
 import json
 import sys
 import os
-from typing import Dict, Set, List
+import time
+from collections import OrderedDict
+from typing import Dict, Set, List, Optional
 from datetime import datetime
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
@@ -17,9 +20,21 @@ from fastapi.responses import HTMLResponse
 
 # Adiciona o diretório ClearAPI ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'ClearAPI'))
-from websocket_client import initialize_market_data_websocket, sign_ticker_quote, send_message_to_websocket, unsign_ticker_quote  # pylint: disable=import-error
-from get_ticker_quote import get_ticker_quote  # pylint: disable=import-error
-from send_order import SendMarketOrderRequest, send_market_order  # pylint: disable=import-error
+from websocket_client import MARKETDATA_ROUTE  # pylint: disable=import-error
+from async_websocket_client import AsyncClearWebSocket, run_with_callbacks  # pylint: disable=import-error
+from feed_bridge import FeedBridge  # pylint: disable=import-error
+from tick_recorder import TickRecorder, TICK_RECORDER_DIR  # pylint: disable=import-error
+from replay import FeedReplayer, REPLAY_DIR, REPLAY_SPEED, REPLAY_LOOP  # pylint: disable=import-error
+import codec  # pylint: disable=import-error
+from send_order import SendMarketOrderRequest  # pylint: disable=import-error
+from async_client import get_async_client, close_async_client  # pylint: disable=import-error
+from auth import get_auth_token_stats  # pylint: disable=import-error
+from rate_limiter import get_rate_limit_stats  # pylint: disable=import-error
+from get_ticker_quote import normalize_tickers  # pylint: disable=import-error
+from quote_cache import get_quote_cache, QUOTE_CACHE_MAX_AGE_SECONDS  # pylint: disable=import-error
+from order_book import get_order_book_manager, ORDER_BOOK_SNAPSHOT_DEPTH  # pylint: disable=import-error
+from tick_store import get_tick_store, to_columns  # pylint: disable=import-error
+from candles import get_candle_aggregator, CANDLE_HISTORY  # pylint: disable=import-error
 
 # Configuração da aplicação FastAPI
 app = FastAPI(
@@ -28,67 +43,686 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configuração de arquivos estáticos e templates
-app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
-templates = Jinja2Templates(directory="frontend/templates")
+# Máximo de tickers aceitos por /api/quotes
+MAX_BATCH_TICKERS = 50
+
+# Fila de saída por cliente do frontend
+CLIENT_QUEUE_MAX = 256  # Mensagens pendentes por cliente (cotações conflacionadas por ticker)
+CLIENT_MAX_LAG_SECONDS = 5.0  # Cliente com mensagem pendente há mais tempo é desconectado
+CLIENT_SEND_TIMEOUT_SECONDS = 5.0  # Tempo máximo de um send_text
+CLIENT_MAX_RATE_HZ = 10.0  # Atualizações por segundo, por cliente e ticker (0 = sem limite)
+CLIENT_MAX_RATE_LIMIT_HZ = 50.0  # Maior maxRate aceito no subscribe
+
+# Loga cada mensagem do feed (caro em regime de muitos ticks por segundo)
+DEBUG_FEED_MESSAGES = False
+
+CANDLE_PUSH_INTERVAL_SECONDS = 1.0  # Intervalo de envio do candle aberto aos clientes
+
+# Protocolo compacto do /ws (negociado com {"type": "hello", "protocol": "compact"})
+COMPACT_FIELDS = (  # campo da cotação -> id curto
+    ('lastPrice', 'p'),
+    ('bid', 'b'),
+    ('ask', 'a'),
+    ('volume', 'v'),
+    ('change', 'c'),
+    ('changePercent', 'cp'),
+    ('high', 'h'),
+    ('low', 'l')
+)
+COMPACT_SNAPSHOT_SECONDS = 5.0  # Intervalo entre snapshots completos de cada ticker
+COMPACT_BATCH_MAX = 64  # Máximo de tickers por frame
+COMPACT_ENCODINGS = ('json', 'msgpack')
+
+# Configuração de arquivos estáticos e templates (relativos a este arquivo, não ao diretório atual)
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend')
+app.mount("/static", StaticFiles(directory=os.path.join(FRONTEND_DIR, 'static')), name="static")
+templates = Jinja2Templates(directory=os.path.join(FRONTEND_DIR, 'templates'))
+
+# Gravação dos frames do feed (ligada com TICK_RECORDER_DIR / CLEARAPI_RECORD_DIR)
+feed_recorder = TickRecorder(TICK_RECORDER_DIR) if TICK_RECORDER_DIR else None
+
+# Feed de market data da ClearAPI, executado no event loop da aplicação
+clear_feed = AsyncClearWebSocket(MARKETDATA_ROUTE, recorder=feed_recorder)
+_clear_feed_task = None
+
+# Com CLEARAPI_REPLAY_DIR o feed vem de uma gravação (sem rede), com o relógio gravado
+feed_replayer = FeedReplayer(REPLAY_DIR, REPLAY_SPEED, loop=REPLAY_LOOP) if REPLAY_DIR else None
+feed_time = feed_replayer.clock if feed_replayer is not None else time.time
 
 # Gerenciamento de conexões WebSocket
+def merge_quote_data(held: dict, new: dict) -> dict:
+    """
+    Conflaciona duas cotações do mesmo ticker: vale o valor mais novo de cada
+    campo (volume é acumulado no feed), campos ausentes mantêm o anterior e
+    máxima/mínima nunca regridem dentro da janela.
+    """
+    merged = dict(held)
+    for field, value in new.items():
+        if value is not None:
+            merged[field] = value
+    for field, pick in (('high', max), ('low', min)):
+        values = [v for v in (held.get(field), new.get(field)) if v is not None]
+        if values:
+            merged[field] = pick(values)
+    return merged
+
+class CompactQuoteEncoder:
+    """
+    Codifica lotes de cotações de um cliente no protocolo compacto:
+
+        {"t": "q", "ts": "<timestamp>", "q": [[ticker, snapshot, {id: valor}], ...]}
+
+    Só os campos alterados desde o último frame do ticker são enviados
+    (snapshot = 0); a cada snapshot_interval segundos o ticker vai completo
+    (snapshot = 1). Com encoding 'msgpack' o frame é binário.
+    """
+    def __init__(self, encoding: str = 'json', snapshot_interval: float = COMPACT_SNAPSHOT_SECONDS, clock=time.monotonic):
+        self.encoding = encoding
+        self.snapshot_interval = snapshot_interval
+        self._clock = clock
+        self._state: Dict[str, list] = {}  # ticker -> [instante do snapshot, últimos valores]
+
+    def forget(self, ticker: str):
+        """Descarta o estado do ticker (o próximo frame será um snapshot)"""
+        self._state.pop(ticker, None)
+
+    def encode(self, batch: list):
+        """Codifica [(ticker, dados), ...]; retorna None se nada mudou"""
+        now = self._clock()
+        quotes = []
+        for ticker, data in batch:
+            state = self._state.get(ticker)
+            if state is None or now - state[0] >= self.snapshot_interval:
+                values = {short: data.get(name) for name, short in COMPACT_FIELDS}
+                self._state[ticker] = [now, dict(values)]
+                quotes.append([ticker, 1, values])
+                continue
+            last = state[1]
+            delta = {}
+            for name, short in COMPACT_FIELDS:
+                value = data.get(name)
+                if last.get(short) != value:
+                    delta[short] = value
+                    last[short] = value
+            if delta:
+                quotes.append([ticker, 0, delta])
+
+        if not quotes:
+            return None
+        frame = {'t': 'q', 'ts': batch[-1][1].get('timestamp'), 'q': quotes}
+        return codec.packb(frame) if self.encoding == 'msgpack' else codec.dumps(frame)
+
+class ClientConnection:
+    """
+    Cliente do frontend com fila de saída própria e uma task de escrita.
+
+    Cotações pendentes do mesmo ticker são conflacionadas (fica só a última),
+    então um cliente lento recebe menos atualizações sem atrasar os demais.
+    Se a mensagem mais antiga da fila passar de max_lag segundos, ou um envio
+    durar mais que send_timeout, o cliente é desconectado no próximo enqueue.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_closed=None,
+        max_pending: int = CLIENT_QUEUE_MAX,
+        max_lag: float = CLIENT_MAX_LAG_SECONDS,
+        send_timeout: float = CLIENT_SEND_TIMEOUT_SECONDS,
+        max_rate: float = CLIENT_MAX_RATE_HZ
+    ):
+        self.id = next(self._ids)
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self._on_closed = on_closed
+        self._pending: "OrderedDict[object, tuple]" = OrderedDict()  # chave -> (enfileirada_em, mensagem)
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sending_since: Optional[float] = None
+        self.encoder: Optional[CompactQuoteEncoder] = None  # None = protocolo JSON completo
+        self.max_rate = max_rate
+        self._rates: Dict[str, float] = {}  # ticker -> atualizações/s pedidas no subscribe
+        self._last_release: Dict[str, float] = {}  # ticker -> instante da última cotação liberada
+        self._held: Dict[str, dict] = {}  # ticker -> cotação retida até o fim da janela
+        self._release_timers: Dict[str, asyncio.TimerHandle] = {}
+        self.closed = False
+        self.slow = False
+
+        # Métricas
+        self.enqueued = 0
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.throttled = 0
+        self.last_lag = 0.0
+        self.max_lag_seen = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._writer())
+
+    def stop(self):
+        self.closed = True
+        for timer in self._release_timers.values():
+            timer.cancel()
+        self._release_timers.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    # Limite de atualizações por ticker ##########################
+    def set_rate(self, ticker: str, max_rate: Optional[float]):
+        """Define o limite do ticker (None = padrão do cliente)"""
+        if max_rate is None:
+            self._rates.pop(ticker, None)
+        else:
+            self._rates[ticker] = max_rate
+
+    def get_rate(self, ticker: str) -> float:
+        return self._rates.get(ticker, self.max_rate)
+
+    def forget_ticker(self, ticker: str):
+        """Descarta o estado do ticker ao cancelar a assinatura"""
+        self._rates.pop(ticker, None)
+        self._last_release.pop(ticker, None)
+        self._held.pop(ticker, None)
+        timer = self._release_timers.pop(ticker, None)
+        if timer is not None:
+            timer.cancel()
+        if self.encoder is not None:
+            self.encoder.forget(ticker)
+
+    def offer_quote(self, ticker: str, quote_message: dict, payload: Optional[str] = None) -> bool:
+        """
+        Entrega a cotação respeitando o limite do ticker. Dentro da janela
+        (1 / max_rate) as cotações ficam retidas e conflacionadas, e a última
+        é liberada ao fim da janela. Retorna False se a cotação foi retida.
+        """
+        rate = self.get_rate(ticker)
+        if rate <= 0:
+            self.enqueue_quote(ticker, quote_message, payload)
+            return True
+
+        held = self._held.get(ticker)
+        if held is not None:
+            self._held[ticker] = {'type': quote_message['type'], 'data': merge_quote_data(held['data'], quote_message['data'])}
+            self.throttled += 1
+            return False
+
+        now = time.monotonic()
+        wait = self._last_release.get(ticker, float('-inf')) + 1.0 / rate - now
+        if wait <= 0:
+            self._last_release[ticker] = now
+            self.enqueue_quote(ticker, quote_message, payload)
+            return True
+
+        self._held[ticker] = quote_message
+        self.throttled += 1
+        self._release_timers[ticker] = asyncio.get_running_loop().call_later(wait, self._release_held, ticker)
+        return False
+
+    def _release_held(self, ticker: str):
+        self._release_timers.pop(ticker, None)
+        quote_message = self._held.pop(ticker, None)
+        if quote_message is not None:
+            self._last_release[ticker] = time.monotonic()
+            self.enqueue_quote(ticker, quote_message)
+
+    def enqueue_quote(self, ticker: str, quote_message: dict, payload: Optional[str] = None):
+        """Enfileira a cotação no protocolo do cliente (payload = texto já serializado, se houver)"""
+        if self.encoder is not None:
+            self.enqueue(quote_message['data'], ticker)
+        else:
+            self.enqueue(payload if payload is not None else codec.dumps(quote_message), ticker)
+
+    def set_encoder(self, encoder: Optional[CompactQuoteEncoder]):
+        """
+        Troca o protocolo das cotações. Ao voltar para o completo, as cotações
+        ainda pendentes no formato compacto (dados crus) são serializadas agora.
+        """
+        if encoder is None and self.encoder is not None:
+            for key, (enqueued_at, message) in list(self._pending.items()):
+                if isinstance(message, dict):
+                    self._pending[key] = (enqueued_at, codec.dumps({'type': 'quote_update', 'data': message}))
+        self.encoder = encoder
+
+    def _is_lagging(self, now: float) -> bool:
+        if self._sending_since is not None and now - self._sending_since > self.send_timeout:
+            return True
+        return bool(self._pending) and now - next(iter(self._pending.values()))[0] > self.max_lag
+
+    def enqueue(self, message, key: Optional[str] = None):
+        """
+        Enfileira sem bloquear; key (ticker) conflaciona com a mensagem pendente de mesma chave.
+        message é o texto a enviar, ou os dados da cotação (dict) no protocolo compacto.
+        """
+        if self.closed:
+            return
+        now = time.monotonic()
+        if self._is_lagging(now):
+            # Interrompe a task de escrita, que pode estar presa em um send_text
+            self.slow = True
+            self.closed = True
+            if self._task is not None:
+                self._task.cancel()
+            return
+
+        self.enqueued += 1
+        if key is None:
+            key = ('msg', next(self._seq))  # Mensagens pessoais nunca são conflacionadas
+        entry = self._pending.get(key)
+        if entry is not None:
+            # Mantém a posição (e o instante) original, com o valor mais novo
+            self._pending[key] = (entry[0], message)
+            self.conflated += 1
+            return
+        if len(self._pending) >= self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = (now, message)
+        self._wakeup.set()
+
+    async def _writer(self):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    key, (enqueued_at, message) = self._pending.popitem(last=False)
+                    if isinstance(message, dict):
+                        message = self._encode_batch(key, message)
+                        if message is None:
+                            continue
+                    self._sending_since = time.monotonic()
+                    if isinstance(message, bytes):
+                        await self.websocket.send_bytes(message)
+                    else:
+                        await self.websocket.send_text(message)
+                    self._sending_since = None
+                    self.sent += 1
+                    # Bytes no fio: texto é enviado em UTF-8 (isascii é O(1), só não-ASCII paga o encode)
+                    if isinstance(message, bytes) or message.isascii():
+                        self.bytes_sent += len(message)
+                    else:
+                        self.bytes_sent += len(message.encode())
+                    self.last_lag = time.monotonic() - enqueued_at
+                    if self.last_lag > self.max_lag_seen:
+                        self.max_lag_seen = self.last_lag
+        except asyncio.CancelledError:
+            if not self.slow:
+                raise
+            print(f"🐢 Cliente {self.id} não acompanha o fluxo de cotações, desconectando")
+            try:
+                await self.websocket.close(code=1013)  # Try again later
+            except Exception:
+                pass
+        except Exception as e:
+            print(f"⚠️ Conexão morta detectada: {e}")
+        self.closed = True
+        if self._on_closed is not None:
+            await self._on_closed(self.websocket)
+
+    def _encode_batch(self, ticker: str, data: dict):
+        # Agrupa as cotações seguintes da fila no mesmo frame
+        batch = [(ticker, data)]
+        while self._pending and len(batch) < COMPACT_BATCH_MAX:
+            key = next(iter(self._pending))
+            message = self._pending[key][1]
+            if not isinstance(message, dict):
+                break
+            del self._pending[key]
+            batch.append((key, message))
+        return self.encoder.encode(batch)
+
+    def get_stats(self) -> dict:
+        pending_age = time.monotonic() - next(iter(self._pending.values()))[0] if self._pending else 0.0
+        return {
+            'id': self.id,
+            'pending': len(self._pending),
+            'oldest_pending_ms': pending_age * 1000,
+            'enqueued': self.enqueued,
+            'sent': self.sent,
+            'bytes_sent': self.bytes_sent,
+            'protocol': self.encoder.encoding if self.encoder else 'full',
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'throttled': self.throttled,
+            'last_lag_ms': self.last_lag * 1000,
+            'max_lag_ms': self.max_lag_seen * 1000,
+            'slow': self.slow
+        }
+
 class ConnectionManager:
-    def __init__(self):
+    """
+    Conexões do frontend e índice de assinaturas por ticker.
+
+    Cada cotação é enviada apenas aos clientes que assinaram o ticker, e a
+    assinatura na ClearAPI é feita pelo primeiro interessado e desfeita
+    quando o último cliente sai (contagem de referências). Os envios não
+    bloqueiam: cada cliente tem sua fila e sua task de escrita (ClientConnection).
+    """
+    def __init__(
+        self,
+        subscribe_upstream=None,
+        unsubscribe_upstream=None,
+        subscribe_book_upstream=None,
+        unsubscribe_book_upstream=None,
+        **client_options
+    ):
         self.active_connections: List[WebSocket] = []
-        self.subscribed_tickers: Set[str] = set()
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.subscribers: Dict[str, Set[WebSocket]] = {}  # ticker -> clientes
+        self.client_tickers: Dict[WebSocket, Set[str]] = {}  # cliente -> tickers
+        self.book_subscribers: Dict[str, Set[WebSocket]] = {}  # ticker -> clientes do book
+        self.client_books: Dict[WebSocket, Set[str]] = {}  # cliente -> books
+        self.candle_subscribers: Dict[tuple, Set[WebSocket]] = {}  # (ticker, timeframe) -> clientes
+        self.client_candles: Dict[WebSocket, Set[tuple]] = {}  # cliente -> (ticker, timeframe)
+        self.candle_only_tickers: Dict[WebSocket, Set[str]] = {}  # cliente -> tickers assinados só pelos candles
         self.clear_ws_connected = False
-        
+        self.slow_disconnects = 0
+        self._client_options = client_options  # max_pending, max_lag, send_timeout
+        self._subscribe_upstream = subscribe_upstream or clear_feed.subscribe_quote
+        self._unsubscribe_upstream = unsubscribe_upstream or clear_feed.unsubscribe_quote
+        self._subscribe_book_upstream = subscribe_book_upstream or clear_feed.subscribe_book
+        self._unsubscribe_book_upstream = unsubscribe_book_upstream or clear_feed.unsubscribe_book
+
+    @property
+    def subscribed_tickers(self) -> Set[str]:
+        """Tickers assinados na ClearAPI (por pelo menos um cliente)"""
+        return set(self.subscribers)
+
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
-        
-    def disconnect(self, websocket: WebSocket):
+        self.client_tickers[websocket] = set()
+        client = ClientConnection(websocket, on_closed=self.disconnect, **self._client_options)
+        self.clients[websocket] = client
+        client.start()
+
+    async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-            
+        client = self.clients.pop(websocket, None)
+        if client is not None:
+            client.stop()
+            if client.slow:
+                self.slow_disconnects += 1
+        for ticker in self.client_tickers.pop(websocket, set()):
+            await self._remove_subscriber(ticker, websocket)
+        for ticker in self.client_books.pop(websocket, set()):
+            await self._remove_book_subscriber(ticker, websocket)
+        for key in self.client_candles.pop(websocket, set()):
+            self._remove_candle_subscriber(key, websocket)
+        self.candle_only_tickers.pop(websocket, None)
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-        
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.enqueue(message)
+
     async def broadcast(self, message: str):
-        # Cria uma cópia da lista para evitar modificação durante iteração
-        connections_copy = self.active_connections.copy()
-        dead_connections = []
-        
-        for connection in connections_copy:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"⚠️ Conexão morta detectada: {e}")
-                # Marca para remoção posterior
-                dead_connections.append(connection)
-        
-        # Remove conexões mortas após a iteração
-        for dead_conn in dead_connections:
-            if dead_conn in self.active_connections:
-                self.active_connections.remove(dead_conn)
-                
-    async def subscribe_ticker(self, ticker: str):
-        """Adiciona um ticker à lista de monitoramento"""
-        if ticker not in self.subscribed_tickers:
-            self.subscribed_tickers.add(ticker)
-            if self.clear_ws_connected:
-                # Assina o ticker na ClearAPI usando a função do websocket_client
-                sign_ticker_quote(ticker)
-                
-    async def unsubscribe_ticker(self, ticker: str):
-        """Remove um ticker da lista de monitoramento"""
-        if ticker in self.subscribed_tickers:
-            self.subscribed_tickers.discard(ticker)
-            if self.clear_ws_connected:
-                # Desassina o ticker na ClearAPI usando a função do websocket_client
-                unsign_ticker_quote(ticker)
+        """Envia para todos os clientes conectados"""
+        for client in self.clients.values():
+            client.enqueue(message)
+
+    async def publish(self, ticker: str, message: str):
+        """Envia apenas para os clientes que assinaram o ticker (conflacionando por ticker)"""
+        subscribers = self.subscribers.get(ticker)
+        if subscribers:
+            clients = self.clients
+            for websocket in subscribers:
+                client = clients.get(websocket)
+                if client is not None:
+                    client.enqueue(message, ticker)
+
+    async def publish_quote(self, ticker: str, quote_message: dict):
+        """
+        Envia uma cotação aos assinantes do ticker: clientes no protocolo completo
+        compartilham o mesmo texto (serializado uma vez); clientes no protocolo
+        compacto recebem os dados e codificam os próprios deltas. Cada cliente
+        aplica o próprio limite de atualizações por ticker.
+        """
+        subscribers = self.subscribers.get(ticker)
+        if not subscribers:
+            return
+        payload = None
+        clients = self.clients
+        for websocket in subscribers:
+            client = clients.get(websocket)
+            if client is None:
+                continue
+            if payload is None and client.encoder is None:
+                payload = codec.dumps(quote_message)
+            client.offer_quote(ticker, quote_message, payload)
+
+    async def publish_book(self, ticker: str, message: str):
+        """Envia o book aos clientes que o assinaram (conflacionando por ticker)"""
+        subscribers = self.book_subscribers.get(ticker)
+        if subscribers:
+            clients = self.clients
+            for websocket in subscribers:
+                client = clients.get(websocket)
+                if client is not None:
+                    client.enqueue(message, ('book', ticker))
+
+    async def publish_candle(self, ticker: str, timeframe: str, start: float, message: str):
+        """Envia um candle aos clientes que assinaram o timeframe (conflaciona as versões do mesmo candle)"""
+        subscribers = self.candle_subscribers.get((ticker, timeframe))
+        if subscribers:
+            clients = self.clients
+            for websocket in subscribers:
+                client = clients.get(websocket)
+                if client is not None:
+                    client.enqueue(message, ('candle', ticker, timeframe, start))
+
+    def negotiate(self, websocket: WebSocket, hello: dict) -> dict:
+        """Configura o protocolo pedido pelo cliente e retorna a resposta hello_ack"""
+        client = self.clients.get(websocket)
+        if client is None or hello.get('protocol') != 'compact':
+            if client is not None:
+                client.set_encoder(None)
+            return {'type': 'hello_ack', 'protocol': 'full'}
+        encoding = hello.get('encoding', 'json')
+        if encoding not in COMPACT_ENCODINGS:
+            encoding = 'json'
+        client.set_encoder(CompactQuoteEncoder(encoding))
+        return {
+            'type': 'hello_ack',
+            'protocol': 'compact',
+            'encoding': encoding,
+            'fields': {short: name for name, short in COMPACT_FIELDS},
+            'snapshotInterval': COMPACT_SNAPSHOT_SECONDS
+        }
+
+    def get_stats(self) -> dict:
+        clients = [client.get_stats() for client in self.clients.values()]
+        return {
+            'connections': len(clients),
+            'tickers': len(self.subscribers),
+            'books': len(self.book_subscribers),
+            'slow_disconnects': self.slow_disconnects,
+            'pending': sum(c['pending'] for c in clients),
+            'dropped': sum(c['dropped'] for c in clients),
+            'conflated': sum(c['conflated'] for c in clients),
+            'throttled': sum(c['throttled'] for c in clients),
+            'bytes_sent': sum(c['bytes_sent'] for c in clients),
+            'max_lag_ms': max((c['max_lag_ms'] for c in clients), default=0.0),
+            'clients': clients
+        }
+
+    def get_client_tickers(self, websocket: WebSocket) -> Set[str]:
+        return self.client_tickers.get(websocket, set())
+
+    async def subscribe_ticker(self, websocket: WebSocket, ticker: str, max_rate: Optional[float] = None):
+        """Inscreve um cliente em um ticker (max_rate = atualizações/s; None = padrão)"""
+        self.client_tickers.setdefault(websocket, set()).add(ticker)
+        self.candle_only_tickers.get(websocket, set()).discard(ticker)  # Agora pedido explicitamente
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.set_rate(ticker, max_rate)
+        subscribers = self.subscribers.get(ticker)
+        if subscribers is None:
+            self.subscribers[ticker] = {websocket}
+            # Primeiro interessado: assina o ticker na ClearAPI
+            # (se ainda não estiver conectado, a assinatura é enviada ao conectar/reconectar)
+            await self._subscribe_upstream(ticker)
+        else:
+            subscribers.add(websocket)
+
+    async def unsubscribe_ticker(self, websocket: WebSocket, ticker: str):
+        """Cancela a inscrição de um cliente em um ticker (e nos candles dele)"""
+        self.client_tickers.get(websocket, set()).discard(ticker)
+        self.candle_only_tickers.get(websocket, set()).discard(ticker)
+        for key in [key for key in self.client_candles.get(websocket, ()) if key[0] == ticker]:
+            self.client_candles[websocket].discard(key)
+            self._remove_candle_subscriber(key, websocket)
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.forget_ticker(ticker)
+        await self._remove_subscriber(ticker, websocket)
+
+    async def _remove_subscriber(self, ticker: str, websocket: WebSocket):
+        subscribers = self.subscribers.get(ticker)
+        if subscribers is None or websocket not in subscribers:
+            return
+        subscribers.discard(websocket)
+        if not subscribers:
+            del self.subscribers[ticker]
+            # Último interessado saiu: desassina o ticker na ClearAPI
+            await self._unsubscribe_upstream(ticker)
+
+    async def subscribe_book(self, websocket: WebSocket, ticker: str):
+        """Inscreve um cliente no book de um ticker (SubscribeBook feito pelo primeiro interessado)"""
+        self.client_books.setdefault(websocket, set()).add(ticker)
+        subscribers = self.book_subscribers.get(ticker)
+        if subscribers is None:
+            self.book_subscribers[ticker] = {websocket}
+            await self._subscribe_book_upstream(ticker)
+        else:
+            subscribers.add(websocket)
+
+    async def unsubscribe_book(self, websocket: WebSocket, ticker: str):
+        self.client_books.get(websocket, set()).discard(ticker)
+        await self._remove_book_subscriber(ticker, websocket)
+
+    async def subscribe_candles(self, websocket: WebSocket, ticker: str, timeframe: str):
+        """Inscreve um cliente nos candles de um ticker (os candles vêm das cotações, que são assinadas junto)"""
+        if ticker not in self.get_client_tickers(websocket):
+            await self.subscribe_ticker(websocket, ticker)
+            self.candle_only_tickers.setdefault(websocket, set()).add(ticker)
+        key = (ticker, timeframe)
+        self.client_candles.setdefault(websocket, set()).add(key)
+        self.candle_subscribers.setdefault(key, set()).add(websocket)
+
+    async def unsubscribe_candles(self, websocket: WebSocket, ticker: str, timeframe: str):
+        """Cancela os candles; as cotações assinadas só por causa deles são canceladas com o último timeframe"""
+        key = (ticker, timeframe)
+        candles_keys = self.client_candles.get(websocket, set())
+        candles_keys.discard(key)
+        self._remove_candle_subscriber(key, websocket)
+        if ticker in self.candle_only_tickers.get(websocket, ()) and not any(k[0] == ticker for k in candles_keys):
+            await self.unsubscribe_ticker(websocket, ticker)
+
+    def _remove_candle_subscriber(self, key: tuple, websocket: WebSocket):
+        subscribers = self.candle_subscribers.get(key)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.candle_subscribers[key]
+
+    async def resync_book(self, ticker: str):
+        """Reassina o book na ClearAPI para receber um snapshot novo (após lacuna na sequência)"""
+        if ticker in self.book_subscribers:
+            await self._unsubscribe_book_upstream(ticker)
+            await self._subscribe_book_upstream(ticker)
+
+    async def _remove_book_subscriber(self, ticker: str, websocket: WebSocket):
+        subscribers = self.book_subscribers.get(ticker)
+        if subscribers is None or websocket not in subscribers:
+            return
+        subscribers.discard(websocket)
+        if not subscribers:
+            del self.book_subscribers[ticker]
+            await self._unsubscribe_book_upstream(ticker)
+            order_books.discard(ticker)  # Sem assinatura o book congelaria; a próxima começa do snapshot novo
 
 manager = ConnectionManager()
 
+async def deliver_quote(quote_message: dict):
+    """Consumidor único da ponte: envia a cotação aos clientes que assinaram o ticker"""
+    await manager.publish_quote(quote_message['data']['ticker'], quote_message)
+
+# Ponte entre o feed (qualquer thread) e o event loop; conflaciona por ticker
+quote_bridge = FeedBridge(deliver_quote)
+
+# Books de ofertas (nível 2) alimentados pelo SubscribeBook
+order_books = get_order_book_manager()
+
+async def deliver_book(ticker: str):
+    """Envia o estado atual do book (lido na entrega, então atualizações seguidas viram um envio)"""
+    snapshot = order_books.snapshot(ticker, ORDER_BOOK_SNAPSHOT_DEPTH)
+    if snapshot is not None:
+        await manager.publish_book(ticker, codec.dumps({'type': 'book_update', 'data': snapshot}))
+
+book_bridge = FeedBridge(deliver_book)
+
+# Book com lacuna na sequência: reassina para receber um snapshot (pedidos seguidos viram um)
+book_resync_bridge = FeedBridge(manager.resync_book)
+order_books.add_stale_listener(lambda ticker: book_resync_bridge.publish(ticker, key=ticker))
+
+# Histórico de ticks por ticker (buffers de tamanho fixo)
+tick_store = get_tick_store()
+
+# Candles OHLCV de vários timeframes, montados a partir das cotações
+candles = get_candle_aggregator()
+_candle_task = None
+
+def candle_message(ticker: str, timeframe: str, bar: dict, closed: bool) -> str:
+    return codec.dumps({'type': 'candle', 'ticker': ticker, 'timeframe': timeframe, 'closed': closed, 'bar': bar})
+
+async def deliver_candle(item: tuple):
+    ticker, timeframe, bar, closed = item
+    await manager.publish_candle(ticker, timeframe, bar['t'], candle_message(ticker, timeframe, bar, closed))
+
+candle_bridge = FeedBridge(deliver_candle)
+
+def on_candle(ticker: str, timeframe: str, bar: dict, event: str):
+    """Candle fechado (ou revisado por tick atrasado): entrega aos clientes que assinaram"""
+    if (ticker, timeframe) in manager.candle_subscribers:
+        candle_bridge.publish((ticker, timeframe, bar, True), key=(ticker, timeframe, bar['t']))
+
+candles.add_listener(on_candle)
+
+async def candle_clock():
+    """Fecha os candles vencidos e envia o candle aberto que mudou, uma vez por intervalo"""
+    sent = {}  # (ticker, timeframe) -> (início, ticks) do último candle aberto enviado
+    while True:
+        await asyncio.sleep(CANDLE_PUSH_INTERVAL_SECONDS)
+        candles.close_expired(feed_time())
+        for key in list(manager.candle_subscribers):
+            bar = candles.get_partial(*key)
+            if bar is None or sent.get(key) == (bar['t'], bar['n']):
+                continue
+            sent[key] = (bar['t'], bar['n'])
+            await manager.publish_candle(key[0], key[1], bar['t'], candle_message(key[0], key[1], bar, False))
+        for key in [key for key in sent if key not in manager.candle_subscribers]:
+            del sent[key]
+
+_timestamp_second = None
+_timestamp_prefix = ''
+
 def format_timestamp():
-    """Formata o timestamp atual"""
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    """Formata o timestamp atual (o strftime só é refeito quando o segundo muda)"""
+    global _timestamp_second, _timestamp_prefix
+    now = time.time()
+    second = int(now)
+    if second != _timestamp_second:
+        _timestamp_prefix = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+        _timestamp_second = second
+    return f"{_timestamp_prefix}.{int((now - second) * 1000):03d}"
 
 def on_clear_message(message):
     """Processa mensagens recebidas do WebSocket da ClearAPI"""
@@ -99,8 +733,9 @@ def on_clear_message(message):
         elif isinstance(message, str):
             if not message.strip():
                 return
-            print(f"📨 Mensagem recebida da ClearAPI: {message[:100]}...")  # Debug
-            data = json.loads(message)
+            if DEBUG_FEED_MESSAGES:
+                print(f"📨 Mensagem recebida da ClearAPI: {message[:100]}...")
+            data = codec.loads(message)
         else:
             print(f"⚠️ Tipo de mensagem desconhecido: {type(message)}")
             return
@@ -116,15 +751,15 @@ def on_clear_message(message):
                 print(f"📝 Dados recebidos: {data.get('arguments', 'N/A')}")
                 return
             
-            print(f"💰 Cotação recebida: {ticker} = {last_price}")  # Debug
+            if DEBUG_FEED_MESSAGES:
+                print(f"💰 Cotação recebida: {ticker} = {last_price}")
             
             if ticker and last_price is not None:
-                # Sempre processa a cotação, mesmo se não estiver na lista de subscritos
-                # Isso permite receber dados mesmo antes da subscrição ser confirmada
-                
-                # Adiciona à lista de subscritos se não estiver
-                if ticker not in manager.subscribed_tickers:
-                    manager.subscribed_tickers.add(ticker)
+                # Atualiza o cache usado pelas leituras REST e o histórico de ticks
+                get_quote_cache().put(ticker, quote_data)
+                received_at = feed_time()
+                tick_store.append_quote(ticker, quote_data, ts=received_at)
+                candles.on_quote(ticker, quote_data, ts=received_at)
                 
                 # Prepara dados para enviar ao frontend
                 quote_message = {
@@ -137,38 +772,22 @@ def on_clear_message(message):
                         'ask': quote_data.get('ask'),
                         'volume': quote_data.get('volume'),
                         'change': quote_data.get('change', 0),
-                        'changePercent': quote_data.get('changePercent', 0)
+                        'changePercent': quote_data.get('changePercent', 0),
+                        'high': quote_data.get('high'),
+                        'low': quote_data.get('low')
                     }
                 }
                 
-                print(f"📤 Enviando dados para frontend: {ticker}")  # Debug
-                
-                # Envia para todos os clientes conectados usando thread-safe approach
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        asyncio.create_task(manager.broadcast(json.dumps(quote_message)))
-                    else:
-                        # Se não há loop rodando, agenda para execução
-                        asyncio.run_coroutine_threadsafe(
-                            manager.broadcast(json.dumps(quote_message)), 
-                            loop
-                        )
-                except RuntimeError:
-                    # Se não há event loop, cria um novo
-                    import threading
-                    def broadcast_in_thread():
-                        try:
-                            asyncio.run(manager.broadcast(json.dumps(quote_message)))
-                        except Exception as e:
-                            print(f"❌ Erro ao enviar broadcast: {e}")
-                    
-                    thread = threading.Thread(target=broadcast_in_thread, daemon=True)
-                    thread.start()
-        else:
-            print(f"📋 Mensagem não é Quote: {data.get('target', 'unknown')}")  # Debug
-                
-    except json.JSONDecodeError as e:
+                # Entrega pela ponte (seguro a partir de qualquer thread)
+                quote_bridge.publish(quote_message, key=ticker)
+        elif data.get('target') == 'Book':
+            book = order_books.on_message(data)
+            if book is not None:
+                book_bridge.publish(book.ticker, key=book.ticker)
+        elif DEBUG_FEED_MESSAGES:
+            print(f"📋 Mensagem não é Quote: {data.get('target', 'unknown')}")
+
+    except codec.DecodeError as e:
         print(f"⚠️ Erro JSON: {e}")
         if isinstance(message, str):
             print(f"📝 Mensagem: {message[:100]}...")
@@ -184,42 +803,52 @@ def on_clear_message(message):
         traceback.print_exc()
 
 def on_clear_open():
-    """Executado quando a conexão WebSocket da ClearAPI é aberta"""
+    """Executado quando a conexão WebSocket da ClearAPI é aberta (ou reaberta)"""
     manager.clear_ws_connected = True
     print("🎉 Conexão com ClearAPI WebSocket estabelecida com sucesso!")
-    
-    # Assina todos os tickers já cadastrados
-    if manager.subscribed_tickers:
-        print(f"📝 Resubscrevendo {len(manager.subscribed_tickers)} tickers...")
-        for ticker in manager.subscribed_tickers:
-            try:
-                sign_ticker_quote(ticker)
-                print(f"✅ Subscrito: {ticker}")
-            except Exception as e:
-                print(f"❌ Erro ao subscrever {ticker}: {e}")
-    else:
-        print("📋 Nenhum ticker para subscrever no momento")
+    # As assinaturas ativas são refeitas automaticamente pelo feed
+    print(f"📋 {len(manager.subscribed_tickers)} ticker(s) monitorado(s)")
 
 # Inicializa conexão com ClearAPI ao iniciar a aplicação
 @app.on_event("startup")
 async def startup_event():
     """Conecta ao WebSocket da ClearAPI quando a aplicação inicia"""
-    import asyncio
-    import threading
-    
-    def start_clear_websocket():
-        """Inicia a conexão WebSocket da ClearAPI em thread separada"""
-        try:
-            initialize_market_data_websocket(on_clear_message, on_clear_open)
-            print("✅ Conexão com ClearAPI WebSocket iniciada com sucesso")
-        except Exception as e:
-            print(f"❌ Erro ao conectar com ClearAPI: {e}")
-    
-    # Executa a conexão em thread separada para não bloquear o startup
-    thread = threading.Thread(target=start_clear_websocket, daemon=True)
-    thread.start()
+    global _clear_feed_task, _candle_task
+    await quote_bridge.start()
+    await book_bridge.start()
+    await book_resync_bridge.start()
+    await candle_bridge.start()
+    _candle_task = asyncio.create_task(candle_clock())
+    if feed_recorder is not None:
+        feed_recorder.start()
+        print(f"💾 Gravando o feed em {feed_recorder.directory}")
+    if feed_replayer is not None:
+        _clear_feed_task = asyncio.create_task(feed_replayer.run_async(on_clear_message, on_clear_open))
+        speed = 'máxima velocidade' if feed_replayer.speed <= 0 else f'{feed_replayer.speed:g}x'
+        print(f"⏯️ Reproduzindo a gravação {feed_replayer.directory} ({speed})")
+        return
+    # A conexão (e as reconexões) roda em uma task, sem bloquear o startup
+    _clear_feed_task = asyncio.create_task(run_with_callbacks(clear_feed, on_clear_message, on_clear_open))
     print("🔄 Iniciando conexão com ClearAPI WebSocket...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Fecha o feed da ClearAPI e o pool de conexões do cliente REST assíncrono"""
+    await clear_feed.close()
+    if feed_replayer is not None:
+        feed_replayer.stop()
+    if _clear_feed_task is not None:
+        _clear_feed_task.cancel()
+    await quote_bridge.stop()
+    await book_bridge.stop()
+    await book_resync_bridge.stop()
+    if _candle_task is not None:
+        _candle_task.cancel()
+    await candle_bridge.stop()
+    if feed_recorder is not None:
+        await asyncio.get_running_loop().run_in_executor(None, feed_recorder.stop)
+    await close_async_client()
+
 # Rotas da aplicação
 @app.get("/", response_class=HTMLResponse)
 async def get_dashboard(request: Request):
@@ -227,13 +856,27 @@ async def get_dashboard(request: Request):
     return templates.TemplateResponse("dashboard.html", {"request": request})
 
 @app.get("/api/quote/{ticker}")
-async def get_quote(ticker: str):
-    """Endpoint para obter cotação atual de um ticker"""
+async def get_quote(ticker: str, max_age: float = QUOTE_CACHE_MAX_AGE_SECONDS):
+    """
+    Endpoint para obter cotação atual de um ticker.
+    Usa o último valor do WebSocket se tiver no máximo max_age segundos.
+    """
+    ticker = ticker.upper()
+    cached = get_quote_cache().get(ticker, max_age)
+    if cached is not None:
+        return {
+            "success": True,
+            "data": cached,
+            "cached": True
+        }
+
     try:
-        quote = get_ticker_quote(ticker)
+        quote = await get_async_client().get_ticker_quote(ticker)
+        get_quote_cache().put(ticker, quote)
         return {
             "success": True,
-            "data": quote
+            "data": quote,
+            "cached": False
         }
     except Exception as e:
         return {
@@ -241,6 +884,81 @@ async def get_quote(ticker: str):
             "error": str(e)
         }
 
+@app.get("/api/quotes")
+async def get_quotes(tickers: str, max_age: float = QUOTE_CACHE_MAX_AGE_SECONDS):
+    """Endpoint para obter a cotação atual de vários tickers (ex.: /api/quotes?tickers=PETR4,VALE3)"""
+    ticker_list = normalize_tickers(tickers.split(','))
+    if not ticker_list:
+        return {
+            "success": False,
+            "error": "Nenhum ticker informado"
+        }
+    if len(ticker_list) > MAX_BATCH_TICKERS:
+        return {
+            "success": False,
+            "error": f"Máximo de {MAX_BATCH_TICKERS} tickers por requisição"
+        }
+
+    # Tickers com valor recente no cache não vão à API
+    cache = get_quote_cache()
+    data = {}
+    for ticker in ticker_list:
+        cached = cache.get(ticker, max_age)
+        if cached is not None:
+            data[ticker] = cached
+    missing = [ticker for ticker in ticker_list if ticker not in data]
+
+    results = await get_async_client().get_ticker_quotes(missing, return_exceptions=True)
+    errors = {}
+    for ticker, quote in results.items():
+        if isinstance(quote, Exception):
+            errors[ticker] = str(quote)
+        else:
+            cache.put(ticker, quote)
+            data[ticker] = quote
+
+    return {
+        "success": bool(data),
+        "data": {ticker: data[ticker] for ticker in ticker_list if ticker in data},
+        "errors": errors,
+        "cached": len(ticker_list) - len(missing)
+    }
+
+@app.get("/api/book/{ticker}")
+async def get_book(ticker: str, depth: int = ORDER_BOOK_SNAPSHOT_DEPTH):
+    """Book de ofertas mantido pelo feed (requer um cliente inscrito no book do ticker)"""
+    snapshot = order_books.snapshot(ticker.upper(), max(1, depth))
+    if snapshot is None:
+        return {
+            "success": False,
+            "error": f"Book de {ticker.upper()} não disponível (assine com subscribe_book)"
+        }
+    return {"success": True, "data": snapshot}
+
+@app.get("/api/ticks/{ticker}")
+async def get_ticks(ticker: str, seconds: float = 300.0, limit: int = 5000):
+    """Ticks recebidos nos últimos `seconds` segundos (no máximo `limit`, os mais recentes)"""
+    ticks = tick_store.window(ticker.upper(), start=feed_time() - seconds)  # Relógio gravado no replay
+    ticks = ticks[max(0, len(ticks) - max(1, limit)):]
+    return {"success": True, "data": {"ticker": ticker.upper(), "count": len(ticks), "ticks": to_columns(ticks)}}
+
+@app.get("/api/candles/{ticker}")
+async def get_candles(ticker: str, timeframe: str = '1m', limit: int = CANDLE_HISTORY):
+    """Candles do ticker (o último é o candle ainda aberto)"""
+    if timeframe not in candles.timeframes:
+        return {
+            "success": False,
+            "error": f"Timeframe inválido: {timeframe} (use {', '.join(candles.timeframes)})"
+        }
+    return {
+        "success": True,
+        "data": {
+            "ticker": ticker.upper(),
+            "timeframe": timeframe,
+            "candles": candles.get_candles(ticker.upper(), timeframe, limit)
+        }
+    }
+
 @app.post("/api/order/market")
 async def send_order_market(request: Request):
     """Endpoint para enviar ordem a mercado"""
@@ -266,7 +984,7 @@ async def send_order_market(request: Request):
         )
         
         # Envia a ordem
-        response = send_market_order(order_request)
+        response = await get_async_client().send_market_order(order_request)
         
         return {
             "success": True,
@@ -287,6 +1005,38 @@ async def send_order_market(request: Request):
             "error": f"Erro ao enviar ordem: {str(e)}"
         }
 
+@app.get("/api/stats")
+async def get_stats():
+    """Endpoint com métricas internas (caches e limites de taxa)"""
+    return {
+        "success": True,
+        "data": {
+            "auth_token": get_auth_token_stats(),
+            "rate_limits": get_rate_limit_stats(),
+            "quote_cache": get_quote_cache().get_stats(),
+            "clear_websocket": clear_feed.get_stats(),
+            "feed_bridge": quote_bridge.get_stats(),
+            "order_books": order_books.get_stats(),
+            "tick_store": tick_store.get_stats(),
+            "candles": candles.get_stats(),
+            "recorder": feed_recorder.get_stats() if feed_recorder is not None else None,
+            "replay": feed_replayer.get_stats() if feed_replayer is not None else None,
+            "frontend": manager.get_stats()
+        }
+    }
+
+def parse_max_rate(value) -> Optional[float]:
+    """Valida o maxRate pedido no subscribe (limitado a CLIENT_MAX_RATE_LIMIT_HZ)"""
+    if value is None:
+        return None
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        return None
+    if rate <= 0:
+        return CLIENT_MAX_RATE_LIMIT_HZ
+    return min(rate, CLIENT_MAX_RATE_LIMIT_HZ)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """Endpoint WebSocket para comunicação em tempo real com o frontend"""
@@ -298,16 +1048,25 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             message = json.loads(data)
             
-            if message['type'] == 'subscribe':
+            if message['type'] == 'hello':
+                # Negociação do protocolo (compacto/delta, JSON ou MessagePack)
+                await manager.send_personal_message(
+                    json.dumps(manager.negotiate(websocket, message)),
+                    websocket
+                )
+
+            elif message['type'] == 'subscribe':
                 # Cliente quer se inscrever em um ticker
                 ticker = message['ticker'].upper()
-                await manager.subscribe_ticker(ticker)
+                max_rate = parse_max_rate(message.get('maxRate'))
+                await manager.subscribe_ticker(websocket, ticker, max_rate)
                 
                 # Envia confirmação
                 await manager.send_personal_message(
                     json.dumps({
                         'type': 'subscription_confirmed',
-                        'ticker': ticker
+                        'ticker': ticker,
+                        'maxRate': manager.clients[websocket].get_rate(ticker)
                     }),
                     websocket
                 )
@@ -315,7 +1074,7 @@ async def websocket_endpoint(websocket: WebSocket):
             elif message['type'] == 'unsubscribe':
                 # Cliente quer cancelar inscrição de um ticker
                 ticker = message['ticker'].upper()
-                await manager.unsubscribe_ticker(ticker)
+                await manager.unsubscribe_ticker(websocket, ticker)
                 
                 # Envia confirmação
                 await manager.send_personal_message(
@@ -326,21 +1085,68 @@ async def websocket_endpoint(websocket: WebSocket):
                     websocket
                 )
                 
+            elif message['type'] in ('subscribe_book', 'unsubscribe_book'):
+                # Book de ofertas (nível 2) do ticker
+                ticker = message['ticker'].upper()
+                if message['type'] == 'subscribe_book':
+                    await manager.subscribe_book(websocket, ticker)
+                    # Estado atual, se o book já estiver sendo mantido
+                    snapshot = order_books.snapshot(ticker, ORDER_BOOK_SNAPSHOT_DEPTH)
+                    client = manager.clients.get(websocket)
+                    if snapshot is not None and client is not None:
+                        client.enqueue(codec.dumps({'type': 'book_update', 'data': snapshot}), ('book', ticker))
+                else:
+                    await manager.unsubscribe_book(websocket, ticker)
+                await manager.send_personal_message(
+                    json.dumps({
+                        'type': f"{message['type']}_confirmed",
+                        'ticker': ticker
+                    }),
+                    websocket
+                )
+
+            elif message['type'] in ('subscribe_candles', 'unsubscribe_candles'):
+                # Candles de um timeframe; a assinatura responde com o histórico atual
+                ticker = message['ticker'].upper()
+                timeframe = message.get('timeframe', '1m')
+                if timeframe not in candles.timeframes:
+                    await manager.send_personal_message(
+                        json.dumps({'type': 'error', 'message': f"Timeframe inválido: {timeframe}"}),
+                        websocket
+                    )
+                elif message['type'] == 'subscribe_candles':
+                    await manager.subscribe_candles(websocket, ticker, timeframe)
+                    await manager.send_personal_message(
+                        codec.dumps({
+                            'type': 'candles',
+                            'ticker': ticker,
+                            'timeframe': timeframe,
+                            'candles': candles.get_candles(ticker, timeframe, int(message.get('limit', CANDLE_HISTORY)))
+                        }),
+                        websocket
+                    )
+                else:
+                    await manager.unsubscribe_candles(websocket, ticker, timeframe)
+                    await manager.send_personal_message(
+                        json.dumps({'type': 'unsubscribe_candles_confirmed', 'ticker': ticker, 'timeframe': timeframe}),
+                        websocket
+                    )
+
             elif message['type'] == 'get_subscribed':
                 # Cliente quer saber quais tickers estão sendo monitorados
                 await manager.send_personal_message(
                     json.dumps({
                         'type': 'subscribed_tickers',
-                        'tickers': list(manager.subscribed_tickers)
+                        'tickers': list(manager.get_client_tickers(websocket))
                     }),
                     websocket
                 )
                 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        await manager.disconnect(websocket)
     except Exception as e:
         print(f"Erro no WebSocket: {e}")
-        manager.disconnect(websocket)
+        await manager.disconnect(websocket)
 
 if __name__ == "__main__":
     import uvicorn